@@ -3,11 +3,17 @@ import streamlit as st
 from modules.data_loader import DataLoader
 from modules.sidebar import Sidebar
 from modules.engine import HydrologyEngine
+from modules.stations import MultiStationEngine
+from modules.ensemble import EnsembleSimulator
+from modules.thresholds import ThresholdEngine
+from modules.cache import ResultCache, clave_escenario
+from modules.events import umbrales_escenario
 from modules.dashboard import DashboardUI
 from modules.reporter import ReportGenerator
 from modules.chatbot import LegalAssistant
 from modules.economics import EconomicModule
 from modules.governance import GovernanceModule
+from modules.tracing import TRACER, span
 
 # --- 1. CONFIGURACIÓN INICIAL ---
 st.set_page_config(page_title="RH-PARGIRH Core", page_icon="💧", layout="wide", initial_sidebar_state="expanded")
@@ -37,27 +43,116 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- 2. ORQUESTACIÓN DE LA APP ---
+@st.cache_resource
+def get_engine(_df, _modelo, firma):
+    """Un motor (índice por año + modelo activo) por dataset y modelo; la firma evita reconstruirlo en cada rerun"""
+    return HydrologyEngine(_df, modelo=_modelo)
+
+@st.cache_resource
+def get_ensemble(_df, _modelo, firma):
+    """Anomalías y predicciones por árbol se precalculan una sola vez"""
+    return EnsembleSimulator(_df, modelo=_modelo)
+
+@st.cache_resource
+def get_thresholds(_df, firma):
+    """P10/P90 históricos y por mes calendario; los meses nuevos se agregan con update()"""
+    return ThresholdEngine().update(_df['Caudal_IA'].to_numpy(), _df['Mes'].to_numpy())
+
+@st.cache_resource
+def get_station_engine(_df, _meta, firma):
+    return MultiStationEngine(_df, metadatos=_meta)
+
+@st.cache_resource
+def get_result_cache():
+    """Escenarios ya calculados (compartidos entre sesiones), con expulsión LRU"""
+    return ResultCache(maxsize=32)
+
+def calcular_escenario(df, firma, engine, loader, config):
+    """Simulación -> KPIs -> figuras; solo se ejecuta cuando la clave del escenario no está en caché"""
+    if config["delta_lluvia"] != 0 or config["delta_temp"] != 0:
+        st.toast(f"🔄 Recalculando modelo: Lluvia {config['delta_lluvia']}% | Temp +{config['delta_temp']}°C", icon="🧮")
+
+    with span("escenario.simulacion"):
+        df_simulated = engine.run_simulation(config)
+    with span("escenario.kpis"):
+        kpis = engine.kpis_for_range(config)
+    with span("escenario.eventos"):
+        # Sequías bajo los tramos MOPE e inundaciones sobre el P90 histórico
+        eventos = engine.eventos(df_simulated, umbrales_escenario(get_thresholds(df, firma).umbrales()[1]))
+
+    # Ensamble Monte Carlo (bandas de incertidumbre)
+    ensemble = None
+    if config.get("ensamble"):
+        with span("escenario.ensamble"):
+            lo, hi = engine.index.filas([config["rango"]])
+            modelo = engine.simulador.modelo if engine.simulador is not None else None # el mismo del motor
+            ensemble = get_ensemble(df, modelo, firma).run(lo[0], hi[0], config["delta_lluvia"], config["delta_temp"])
+
+    # Estaciones GRDC (si el dataset multi-estación está construido)
+    df_estaciones, meta_estaciones = loader.load_stations()
+    kpis_estaciones = None
+    if df_estaciones is not None:
+        with span("escenario.estaciones"):
+            stations = get_station_engine(df_estaciones, meta_estaciones, loader.version_estaciones())
+            kpis_estaciones = stations.calculate_kpis(config)
+
+    dashboard = DashboardUI()
+    figuras = {
+        "principal": dashboard.figura_principal(df_simulated, config, ensemble, clave=(firma, tuple(config["rango"]))),
+        "mapa": dashboard.figura_mapa(kpis, kpis_estaciones),
+        "xai": dashboard.figura_xai(df_simulated),
+    }
+    return {"df_simulated": df_simulated, "kpis": kpis, "ensemble": ensemble, "eventos": eventos,
+            "kpis_estaciones": kpis_estaciones, "figuras": figuras}
+
+def render_panel_trazas():
+    """Panel de desarrollo: tiempos de cada etapa del último rerun (solo con PARGIRH_TRACING=1)"""
+    with st.sidebar:
+        if not st.toggle("🛠️ Tiempos del último rerun", value=False, key="panel_trazas"):
+            return
+        spans = TRACER.ultimo_rerun()
+        if spans:
+            st.dataframe(
+                [{"Etapa": "· " * s["nivel"] + s["span"], "ms": s["ms"]} for s in spans],
+                hide_index=True, use_container_width=True,
+            )
+        resumen = TRACER.resumen()
+        st.caption(f"{sum(r['n'] for r in resumen.values())} spans acumulados en {len(resumen)} etapas"
+                   + (f" · exportando a {TRACER.archivo}" if TRACER.archivo else ""))
+
 def main():
+    TRACER.iniciar_rerun()
     # A. Cargar Datos
-    loader = DataLoader()
-    df = loader.load_data()
+    with span("app.carga_datos"):
+        loader = DataLoader()
+        df = loader.load_data()
     
     if df is None:
         st.error("🚨 No se encuentran los datos. Revisa la conexión.")
         st.stop()
 
-    # B. Renderizar Sidebar y Obtener Configuración
+    # B. Motor (cacheado por dataset) y Sidebar con la Configuración
+    with span("app.motor"):
+        # Versión del dataset y modelo activo del registro: un update del gold o un modelo nuevo
+        # invalidan motor, umbrales y escenarios cacheados
+        modelo, metricas_modelo = loader.load_model()
+        firma = (loader.version(), loader.version_modelo(), len(df), str(df['Fecha'].iloc[-1]))
+        engine = get_engine(df, modelo, firma)
     sidebar = Sidebar()
-    config = sidebar.render(df)
+    config = sidebar.render(df, modelo_disponible=engine.simulador is not None, metricas_modelo=metricas_modelo)
 
-    # C. Ejecutar Motor Lógico (Simulación Hídrica)
-    engine = HydrologyEngine(df)
-    
-    if config["delta_lluvia"] != 0 or config["delta_temp"] != 0:
-        st.toast(f"🔄 Recalculando modelo: Lluvia {config['delta_lluvia']}% | Temp +{config['delta_temp']}°C", icon="🧮")
-        
-    df_simulated = engine.run_simulation(config)
-    kpis = engine.calculate_kpis(df_simulated)
+    # C. Ejecutar Motor Lógico (Simulación Hídrica), cacheado por escenario
+    cache = get_result_cache()
+    with span("app.escenario"):
+        escenario = cache.get_or_compute(
+            # El escenario incluye los KPIs por estación: su almacén también versiona la clave
+            clave_escenario((*firma, loader.version_estaciones()), config),
+            lambda: calcular_escenario(df, firma, engine, loader, config),
+        )
+    df_simulated, kpis = escenario["df_simulated"], escenario["kpis"]
+    ensemble, figuras, eventos = escenario["ensemble"], escenario["figuras"], escenario["eventos"]
+    stats = cache.stats()
+    st.sidebar.caption(f"⚡ Caché de escenarios: {stats['hits']} aciertos / {stats['misses']} fallos ({stats['size']}/{stats['maxsize']})")
 
     # --- D. INTERFAZ PRINCIPAL CON PESTAÑAS ---
     st.title("RH-PARGIRH: Sistema de Gestión Integrada")
@@ -66,31 +161,39 @@ def main():
     tab_hidrica, tab_economica, tab_gobernabilidad = st.tabs(["💧 Inteligencia Hídrica", "💰 Impacto Económico", "⚖️ Gobernabilidad"])
 
     # Pestaña 1
-    with tab_hidrica:
+    with tab_hidrica, span("app.tab_hidrica"):
         dashboard = DashboardUI()
         # dashboard.render_header() # Opcional
         dashboard.render_kpis(kpis)
-        dashboard.render_main_chart(df_simulated, config)
-        dashboard.render_geo_xai(df_simulated, kpis)
+        if ensemble is not None:
+            dashboard.render_ensemble_kpis(ensemble)
+        dashboard.render_main_chart(df_simulated, config, ensemble, fig=figuras["principal"])
+        dashboard.render_eventos(eventos)
+        dashboard.render_geo_xai(df_simulated, kpis, figuras=figuras)
 
         st.markdown("---")
         reporter = ReportGenerator()
-        reporter.render_button(df_simulated, kpis)
+        reporter.render_button(df_simulated, kpis, eventos)
 
     # Pestaña 2
-    with tab_economica:
-        economy = EconomicModule()
-        economy.render()
+    with tab_economica, span("app.tab_economica"):
+        economy = EconomicModule(umbrales=get_thresholds(df, firma))
+        economy.render(df_simulated, config, firma)
         
     # Pestaña 3
-    with tab_gobernabilidad:
+    with tab_gobernabilidad, span("app.tab_gobernabilidad"):
         gov = GovernanceModule()
-        gov.render(kpis)
+        gov.render(kpis, df_simulated)
 
     # E. Chatbot en Sidebar 
     with st.sidebar:
         bot = LegalAssistant()
         bot.render()
 
+    # F. Trazas: exportación del rerun y panel de desarrollo opcional
+    TRACER.finalizar_rerun()
+    if TRACER.activo:
+        render_panel_trazas()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+Datasets sintéticos con la forma del gold (Fecha, Precipitacion, Temperatura, Caudal_Real,
+Inercia_3meses, Mes, Caudal_IA), de una serie o multi-estación (grdc_no, Fecha, ...).
+"""
+import numpy as np
+import pandas as pd
+
+from modules.pipeline import media_movil
+
+MES_INICIAL = 1950 * 12 # enero de 1950 como índice de mes
+
+
+def _fechas(n_meses):
+    # Resolución en segundos: 10^7 meses superan el rango de datetime64[ns]
+    meses = np.arange(MES_INICIAL, MES_INICIAL + n_meses)
+    return (meses - 1970 * 12).astype("datetime64[M]").astype("datetime64[s]"), meses % 12 + 1
+
+
+def gold_sintetico(n, seed=0):
+    """Una serie mensual de n filas con estacionalidad y ruido"""
+    rng = np.random.default_rng(seed)
+    fechas, mes = _fechas(n)
+    estacion = 1 + 0.5 * np.sin(2 * np.pi * (mes - 5) / 12)
+    precipitacion = rng.gamma(2.0, 40.0, size=n) * estacion
+    temperatura = 25 + 2 * np.sin(2 * np.pi * (mes - 7) / 12) + rng.normal(0, 0.5, size=n)
+    inercia = media_movil(precipitacion, 3)
+    inercia[:2] = precipitacion[:2]
+    caudal_ia = np.maximum(0.35 * inercia + rng.normal(0, 5, size=n), 0.0)
+    caudal_real = np.where(rng.random(n) < 0.7, caudal_ia + rng.normal(0, 3, size=n), np.nan)
+    return pd.DataFrame({
+        'Fecha': fechas,
+        'Precipitacion': precipitacion,
+        'Temperatura': temperatura,
+        'Caudal_Real': caudal_real,
+        'Inercia_3meses': inercia,
+        'Mes': mes.astype(np.int64),
+        'Caudal_IA': caudal_ia,
+    })
+
+
+def estaciones_sintetico(n, meses_por_estacion=888, seed=0):
+    """Variante multi-estación: n filas repartidas en estaciones de `meses_por_estacion` meses"""
+    n_estaciones = max(1, n // meses_por_estacion)
+    serie = gold_sintetico(meses_por_estacion, seed)
+    escala = np.random.default_rng(seed + 1).uniform(0.3, 2.0, size=n_estaciones)
+    df = pd.concat([serie] * n_estaciones, ignore_index=True)
+    factores = np.repeat(escala, meses_por_estacion)
+    for columna in ('Caudal_IA', 'Caudal_Real'):
+        df[columna] = df[columna].to_numpy() * factores
+    df.insert(0, 'grdc_no', np.repeat(4_000_000 + np.arange(n_estaciones), meses_por_estacion))
+    return df
+
+
+def metadatos_sinteticos(df):
+    codigos = np.unique(df['grdc_no'].to_numpy())
+    return pd.DataFrame({
+        'grdc_no': codigos,
+        'Estacion': [f"ESTACION {c}" for c in codigos],
+        'Rio': "YAQUE DEL NORTE",
+        'lat': 19.5,
+        'lon': -71.0,
+        'area': 1000.0,
+    })
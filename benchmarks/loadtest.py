@@ -0,0 +1,135 @@
+"""
+Prueba de carga del servicio HTTP local (core/server.py): latencias p50/p99 y throughput.
+
+    python -m core.server --port 8765 &
+    python -m benchmarks.loadtest --url http://127.0.0.1:8765 --requests 2000 --concurrency 16
+    python -m benchmarks.loadtest --local --requests 500      # levanta una instancia en este proceso
+
+La mezcla de peticiones repite escenarios a propósito (--escenarios distintos), de modo que se
+ejercitan la caché, la coalescencia de peticiones en vuelo y los cálculos en frío.
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit, urlencode
+
+import numpy as np
+
+
+def peticiones(n, escenarios=50, semilla=0):
+    """Rutas GET: KPIs (con y sin pérdidas), series simuladas y clasificaciones"""
+    rng = random.Random(semilla)
+    base = []
+    for _ in range(escenarios):
+        desde = rng.randint(1950, 2015)
+        params = {"desde": desde, "hasta": min(desde + rng.randint(0, 10), 2023),
+                  "lluvia": rng.choice(range(-50, 51, 10)), "temp": rng.choice([0, 0.5, 1.0, 1.5, 2.0])}
+        base.append(f"/kpis?{urlencode(params)}")
+        base.append(f"/kpis?{urlencode({**params, 'perdidas': 1})}")
+        base.append(f"/simulate?{urlencode(params)}")
+        base.append(f"/classify?{urlencode(params)}")
+    base.append("/classify?caudal=18&caudal=32&caudal=55")
+    return [rng.choice(base) for _ in range(n)]
+
+
+def _cliente(url, rutas, latencias, errores, lock):
+    partes = urlsplit(url)
+    conexion = http.client.HTTPConnection(partes.hostname, partes.port, timeout=60)
+    propias, fallos = [], 0
+    for ruta in rutas:
+        inicio = time.perf_counter()
+        try:
+            conexion.request("GET", ruta)
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            if respuesta.status != 200:
+                fallos += 1
+        except (OSError, http.client.HTTPException):
+            fallos += 1
+            conexion.close()
+            conexion = http.client.HTTPConnection(partes.hostname, partes.port, timeout=60)
+        propias.append((time.perf_counter() - inicio) * 1000)
+    conexion.close()
+    with lock:
+        latencias.extend(propias)
+        errores[0] += fallos
+
+
+def ejecutar(url, n=1000, concurrencia=8, escenarios=50, semilla=0):
+    """Reparte n peticiones entre `concurrencia` clientes keep-alive y resume las latencias"""
+    rutas = peticiones(n, escenarios, semilla)
+    latencias, errores, lock = [], [0], threading.Lock()
+    hilos = [threading.Thread(target=_cliente, args=(url, rutas[i::concurrencia], latencias, errores, lock))
+             for i in range(concurrencia)]
+    inicio = time.perf_counter()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    duracion = time.perf_counter() - inicio
+
+    lat = np.array(latencias)
+    return {
+        "peticiones": n,
+        "concurrencia": concurrencia,
+        "errores": errores[0],
+        "segundos": round(duracion, 3),
+        "rps": round(n / duracion, 1),
+        "p50_ms": round(float(np.percentile(lat, 50)), 3),
+        "p90_ms": round(float(np.percentile(lat, 90)), 3),
+        "p99_ms": round(float(np.percentile(lat, 99)), 3),
+        "max_ms": round(float(lat.max()), 3),
+    }
+
+
+def stats_servicio(url):
+    partes = urlsplit(url)
+    conexion = http.client.HTTPConnection(partes.hostname, partes.port, timeout=10)
+    conexion.request("GET", "/stats")
+    datos = json.loads(conexion.getresponse().read())
+    conexion.close()
+    return datos
+
+
+def instancia_local(workers=4, maxsize=256):
+    """Servicio en un hilo de este proceso, en un puerto libre: (url, servidor, servicio)"""
+    from core.data import cargar_gold
+    from core.server import SimulationService, crear_servidor
+
+    servicio = SimulationService(cargar_gold(), workers=workers, maxsize=maxsize)
+    servidor = crear_servidor(servicio, port=0)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.server_address[1]}", servidor, servicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description="Carga sobre el servicio HTTP")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--local", action="store_true", help="Levanta una instancia en este proceso")
+    parser.add_argument("--workers", type=int, default=4, help="Workers de la instancia local")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--escenarios", type=int, default=50, help="Escenarios distintos en la mezcla")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    servidor = servicio = None
+    url = args.url
+    if args.local:
+        url, servidor, servicio = instancia_local(args.workers)
+    try:
+        resultado = ejecutar(url, args.requests, args.concurrency, args.escenarios, args.seed)
+        resultado["servicio"] = stats_servicio(url)
+        print(json.dumps(resultado, indent=2))
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+            servidor.server_close()
+            servicio.close()
+
+
+if __name__ == "__main__":
+    main()
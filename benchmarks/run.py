@@ -0,0 +1,190 @@
+"""
+Suite de benchmarks de los caminos críticos (carga, motor, economía, umbrales, features)
+y del tiempo de importación del núcleo sin interfaz.
+
+    python -m benchmarks.run                              # tamaños 1e3..1e5
+    python -m benchmarks.run --sizes 1e3 1e5 1e7 --save   # guarda la línea base
+    python -m benchmarks.run --check --tolerance 0.25     # falla si algo se vuelve más lento
+
+Cada caso se mide con perf_counter (mejor de `repeticiones`) y, en una ejecución aparte,
+con tracemalloc para el pico de memoria.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datasets import gold_sintetico, estaciones_sintetico, metadatos_sinteticos
+from core.economics import EconomicCore
+from modules.chunked import ChunkedEngine
+from modules.engine import HydrologyEngine
+from modules.gold_store import write_gold_store, read_gold_store
+from modules.pipeline import media_movil
+from modules.stations import MultiStationEngine
+from modules.thresholds import ThresholdEngine
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "baseline.json")
+TAMANOS = (1_000, 10_000, 100_000)
+# El CSV y el índice por cuantiles son órdenes de magnitud más lentos: se acotan
+LIMITES = {"loader.csv": 1_000_000, "thresholds.update": 1_000_000}
+PISO_MS = 5.0 # por debajo de esta diferencia absoluta no se considera regresión
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tiempo de importación en un intérprete nuevo: el núcleo sin interfaz debe seguir siendo ligero
+IMPORTACIONES = {
+    "import.core": "import core",
+    "import.core_engine": "import core; core.HydrologyEngine; core.EconomicCore; core.evaluar_escenario",
+    "import.ui": "import modules.dashboard, modules.economics, modules.governance",
+}
+
+
+def medir(funcion, repeticiones=3, memoria=True):
+    """Mejor tiempo (ms) de varias ejecuciones y pico de memoria (MB) de una ejecución extra"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        funcion()
+        pico = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return {"ms": round(min(tiempos), 3), "pico_mb": None if pico is None else round(pico, 3)}
+
+
+def medir_importacion(codigo, repeticiones=3):
+    """Mejor tiempo (ms) de `codigo` en un subproceso limpio (sin contar el arranque de Python)"""
+    script = f"import time; t = time.perf_counter(); {codigo}; print((time.perf_counter() - t) * 1000)"
+    tiempos = [float(subprocess.run([sys.executable, "-c", script], cwd=RAIZ, capture_output=True,
+                                    text=True, check=True).stdout) for _ in range(repeticiones)]
+    return {"ms": round(min(tiempos), 3), "pico_mb": None}
+
+
+def casos(n, directorio):
+    """Casos de benchmark para n filas: {nombre: función sin argumentos}"""
+    df = gold_sintetico(n)
+    anos = df['Fecha'].dt.year
+    rango = (int(anos.iloc[0]), int(anos.iloc[-1]))
+    config = {"rango": rango, "delta_lluvia": -20, "delta_temp": 1.0}
+    engine = HydrologyEngine(df)
+    df_sim = engine.run_simulation(config)
+    eco = EconomicCore()
+    costos = {c: {'Sequia': v['s'], 'Inundacion': v['i']} for c, v in eco.cultivos_default.items()}
+
+    store = os.path.join(directorio, f"gold_{n}")
+    write_gold_store(df, store)
+    chunked = ChunkedEngine(store, presupuesto_mb=16)
+    casos = {
+        "loader.npy_mmap": lambda: read_gold_store(store)['Caudal_IA'].to_numpy().sum(),
+        "engine.index": lambda: HydrologyEngine(df).index,
+        # La vista es perezosa: se lee Caudal_Simulado para medir la simulación y no solo la vista
+        "engine.run_simulation": lambda: engine.run_simulation(config).caudal_simulado,
+        "engine.calculate_kpis": lambda: engine.calculate_kpis(df_sim),
+        "engine.kpis_for_range": lambda: engine.kpis_for_range(config),
+        "engine.run_batch_5x5x5": lambda: engine.run_batch(
+            [rango] * 5, np.linspace(-50, 50, 5), np.linspace(0, 3, 5)),
+        "chunked.calculate_kpis": lambda: chunked.calculate_kpis({**config, "rango": None}),
+        "economics.calcular_perdidas": lambda: eco.calcular_perdidas(df_sim, costos),
+        "features.media_movil": lambda: media_movil(df['Precipitacion'].to_numpy(), 3),
+        "quantiles.numpy": lambda: np.quantile(df['Caudal_IA'].to_numpy(), [0.10, 0.90]),
+    }
+    if n <= LIMITES["loader.csv"]:
+        csv = os.path.join(directorio, f"gold_{n}.csv")
+        df.to_csv(csv, index=False)
+        casos["loader.csv"] = lambda: pd.read_csv(csv, parse_dates=['Fecha'])
+    if n <= LIMITES["thresholds.update"]:
+        casos["thresholds.update"] = lambda: ThresholdEngine().update(df['Caudal_IA'].to_numpy(), df['Mes'].to_numpy())
+
+    # Variante multi-estación (888 meses por estación)
+    df_est = estaciones_sintetico(n)
+    multi = MultiStationEngine(df_est, metadatos_sinteticos(df_est))
+    config_est = {"rango": (1950, 2023), "delta_lluvia": -20, "delta_temp": 1.0}
+    casos["stations.calculate_kpis"] = lambda: multi.calculate_kpis(config_est)
+    return casos
+
+
+def ejecutar(tamanos=TAMANOS, repeticiones=3, memoria=True, filtro=None, verbose=True):
+    resultados = {}
+    for nombre, codigo in IMPORTACIONES.items():
+        if filtro and filtro not in nombre:
+            continue
+        resultados[nombre] = medida = medir_importacion(codigo, repeticiones)
+        if verbose:
+            print(f"{nombre:32s} {'-':>10s} {medida['ms']:12.3f} ms")
+    with tempfile.TemporaryDirectory() as directorio:
+        for n in tamanos:
+            for nombre, funcion in casos(n, directorio).items():
+                if filtro and filtro not in nombre:
+                    continue
+                medida = medir(funcion, repeticiones, memoria)
+                resultados[f"{nombre}@{n}"] = medida
+                if verbose:
+                    pico = "" if medida["pico_mb"] is None else f"{medida['pico_mb']:10.2f} MB"
+                    print(f"{nombre:32s} {n:>10,d} {medida['ms']:12.3f} ms {pico}")
+    return resultados
+
+
+def comparar(resultados, base, tolerancia=0.25, piso_ms=PISO_MS):
+    """Regresiones: casos cuyo tiempo supera la base en más de `tolerancia` (y del piso absoluto)"""
+    regresiones = []
+    for clave, medida in resultados.items():
+        if clave not in base:
+            continue
+        antes, ahora = base[clave]["ms"], medida["ms"]
+        if ahora > antes * (1 + tolerancia) and ahora - antes > piso_ms:
+            regresiones.append((clave, antes, ahora))
+    return regresiones
+
+
+def guardar(resultados, ruta=BASELINE_PATH):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    base = leer(ruta) if os.path.exists(ruta) else {}
+    base.update(resultados)
+    with open(ruta, "w") as f:
+        json.dump({"entorno": {"python": platform.python_version(), "numpy": np.__version__,
+                               "pandas": pd.__version__, "maquina": platform.machine()},
+                   "resultados": dict(sorted(base.items()))}, f, indent=2)
+
+
+def leer(ruta=BASELINE_PATH):
+    with open(ruta) as f:
+        return json.load(f)["resultados"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Benchmarks de RH-PARGIRH")
+    parser.add_argument("--sizes", nargs="+", type=float, default=list(TAMANOS), help="Filas por dataset (1e3..1e7)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por caso (se toma la mejor)")
+    parser.add_argument("--filter", default=None, help="Solo los casos cuyo nombre contenga este texto")
+    parser.add_argument("--no-memory", action="store_true", help="No medir el pico de memoria")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Archivo JSON de línea base")
+    parser.add_argument("--save", action="store_true", help="Guarda los resultados como línea base")
+    parser.add_argument("--check", action="store_true", help="Compara con la línea base y falla si hay regresiones")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Tolerancia relativa (0.25 = +25%%)")
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar([int(n) for n in args.sizes], args.repeat, not args.no_memory, args.filter)
+    if args.save:
+        guardar(resultados, args.baseline)
+        print(f"Línea base guardada en {args.baseline}")
+    if args.check:
+        regresiones = comparar(resultados, leer(args.baseline), args.tolerance)
+        for clave, antes, ahora in regresiones:
+            print(f"REGRESIÓN {clave}: {antes:.3f} ms -> {ahora:.3f} ms (+{(ahora / antes - 1) * 100:.0f}%)")
+        if regresiones:
+            sys.exit(1)
+        print(f"Sin regresiones (tolerancia {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
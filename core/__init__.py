@@ -0,0 +1,38 @@
+"""
+Núcleo sin interfaz de RH-PARGIRH: datos, motor hidrológico, economía y gobernanza.
+Solo depende de NumPy y pandas (que también se importan bajo demanda), de modo que
+tareas cron y workers por lotes no cargan Streamlit, Plotly ni scikit-learn.
+
+    python -m core kpis --desde 2015 --hasta 2023 --lluvia -20 --temp 1.5
+    python -m core simulate --desde 2020 --hasta 2023 --formato csv > escenario.csv
+    python -m core classify --caudal 18 32 55
+"""
+import importlib
+
+# Nombre público -> módulo que lo define (se importa en el primer acceso)
+_PEREZOSOS = {
+    "cargar_gold": "core.data",
+    "cargar_estaciones": "core.data",
+    "HydrologyEngine": "modules.engine",
+    "ChunkedEngine": "modules.chunked",
+    "MOPE": "modules.rules",
+    "ThresholdEngine": "modules.thresholds",
+    "EconomicCore": "core.economics",
+    "CULTIVOS_DEFAULT": "core.economics",
+    "evaluar_escenario": "core.governance",
+    "decisiones": "core.governance",
+}
+
+__all__ = sorted(_PEREZOSOS)
+
+
+def __getattr__(nombre):
+    if nombre not in _PEREZOSOS:
+        raise AttributeError(f"module 'core' has no attribute '{nombre}'")
+    valor = getattr(importlib.import_module(_PEREZOSOS[nombre]), nombre)
+    globals()[nombre] = valor # los siguientes accesos no pasan por aquí
+    return valor
+
+
+def __dir__():
+    return __all__
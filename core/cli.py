@@ -0,0 +1,158 @@
+"""
+CLI sin interfaz del núcleo: simulación, KPIs y clasificación MOPE en JSON o CSV.
+
+    python -m core simulate --desde 2020 --hasta 2023 --lluvia -20 --formato csv
+    python -m core kpis --desde 1975 --hasta 1985 --temp 1.5 --perdidas
+    python -m core classify --caudal 18 32 55
+    python -m core classify --desde 2015 --hasta 2023 --lluvia -30 --formato csv   # mes a mes
+    python -m core kpis --presupuesto-mb 64          # fuera de memoria, por bloques del almacén gold
+"""
+import argparse
+import json
+import sys
+
+
+def a_json(valor):
+    # Escalares NumPy y fechas de pandas
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    if hasattr(valor, "item"):
+        return valor.item()
+    raise TypeError(f"No serializable: {type(valor).__name__}")
+
+
+def escribir(datos, formato, salida):
+    """dict, DataFrame o iterador de DataFrames (solo CSV) -> JSON / CSV en el archivo (o stdout)"""
+    import pandas as pd
+
+    destino = open(salida, "w", newline="") if salida else sys.stdout
+    try:
+        if formato == "csv" and not isinstance(datos, (dict, pd.DataFrame)):
+            for i, bloque in enumerate(datos):
+                bloque.to_csv(destino, index=False, header=i == 0, date_format="%Y-%m-%d")
+        elif formato == "csv":
+            tabla = datos if isinstance(datos, pd.DataFrame) else pd.DataFrame([datos])
+            tabla.to_csv(destino, index=False, date_format="%Y-%m-%d")
+        else:
+            if isinstance(datos, pd.DataFrame):
+                datos = datos.to_dict(orient="records")
+            json.dump(datos, destino, default=a_json, ensure_ascii=False, indent=2)
+            destino.write("\n")
+    finally:
+        if salida:
+            destino.close()
+
+
+def _motor(args):
+    from core.data import cargar_gold
+    from modules.engine import HydrologyEngine
+
+    if args.presupuesto_mb:
+        return _motor_por_bloques(args)
+    df = cargar_gold(args.datos)
+    if df is None:
+        raise SystemExit("No se encuentra el dataset gold (python -m modules.pipeline build)")
+    modelo = None
+    if args.motor == "ia":
+        from modules.model import cargar_modelo
+        modelo = cargar_modelo()
+        if modelo is None:
+            raise SystemExit("Motor 'ia' sin modelo entrenado en models/")
+    anos = df['Fecha'].dt.year
+    config = {
+        "rango": (args.desde or int(anos.iloc[0]), args.hasta or int(anos.iloc[-1])),
+        "delta_lluvia": args.lluvia,
+        "delta_temp": args.temp,
+        "motor": args.motor,
+    }
+    return HydrologyEngine(df, modelo=modelo), config
+
+
+def _motor_por_bloques(args):
+    from core.data import STORE_PATH, tiene_store
+    from modules.chunked import ChunkedEngine
+
+    if not tiene_store(STORE_PATH):
+        raise SystemExit("El modo por bloques necesita el almacén columnar (python -m modules.pipeline convert)")
+    modelo = None
+    if args.motor == "ia":
+        from modules.model import cargar_modelo
+        modelo = cargar_modelo()
+    engine = ChunkedEngine(STORE_PATH, presupuesto_mb=args.presupuesto_mb, modelo=modelo)
+    primero, ultimo = engine.anos()
+    config = {
+        "rango": (args.desde or primero, args.hasta or ultimo),
+        "delta_lluvia": args.lluvia,
+        "delta_temp": args.temp,
+        "motor": args.motor,
+    }
+    return engine, config
+
+
+def cmd_simulate(args):
+    engine, config = _motor(args)
+    if args.presupuesto_mb:
+        if args.formato != "csv":
+            raise SystemExit("La simulación por bloques se emite en CSV (--formato csv)")
+        return engine.iter_simulacion(config)
+    return engine.run_simulation(config).to_frame(['Fecha', 'Caudal_IA', 'Caudal_Simulado'])
+
+
+def cmd_kpis(args):
+    engine, config = _motor(args)
+    if args.presupuesto_mb:
+        if args.perdidas:
+            raise SystemExit("--perdidas no está disponible en el modo por bloques")
+        return {"desde": config["rango"][0], "hasta": config["rango"][1], **engine.calculate_kpis(config)}
+    kpis = {"desde": config["rango"][0], "hasta": config["rango"][1], **engine.kpis_for_range(config)}
+    if args.perdidas:
+        from core.economics import EconomicCore
+        totales = EconomicCore().totales(engine.run_simulation(config))
+        for fila in totales.itertuples():
+            kpis[f"perdida_{fila.Cultivo}"] = fila.Perdida_Escenario
+    return kpis
+
+
+def cmd_classify(args):
+    import pandas as pd
+    from core.governance import clasificar_caudales, decisiones
+
+    if args.caudal:
+        return pd.DataFrame(clasificar_caudales(args.caudal))
+    engine, config = _motor(args)
+    if args.presupuesto_mb:
+        if args.formato != "csv":
+            raise SystemExit("La clasificación por bloques se emite en CSV (--formato csv)")
+        return (decisiones(bloque) for bloque in engine.iter_simulacion(config))
+    return decisiones(engine.run_simulation(config))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core", description="Núcleo RH-PARGIRH sin interfaz")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    escenario = argparse.ArgumentParser(add_help=False)
+    escenario.add_argument("--desde", type=int, default=None, help="Año inicial (por defecto, el primero)")
+    escenario.add_argument("--hasta", type=int, default=None, help="Año final (por defecto, el último)")
+    escenario.add_argument("--lluvia", type=float, default=0.0, help="Variación de lluvia (%%)")
+    escenario.add_argument("--temp", type=float, default=0.0, help="Aumento de temperatura (°C)")
+    escenario.add_argument("--motor", choices=["factores", "ia"], default="factores")
+    escenario.add_argument("--datos", choices=["auto", "npy", "csv"], default="auto", help="Formato del dataset gold")
+    escenario.add_argument("--formato", choices=["json", "csv"], default="json")
+    escenario.add_argument("--salida", default=None, help="Archivo de salida (por defecto, stdout)")
+    escenario.add_argument("--presupuesto-mb", type=float, default=None,
+                           help="Modo fuera de memoria: recorre el almacén gold por bloques con este presupuesto")
+
+    sub.add_parser("simulate", parents=[escenario], help="Serie simulada del escenario")
+    kpis = sub.add_parser("kpis", parents=[escenario], help="KPIs del escenario")
+    kpis.add_argument("--perdidas", action="store_true", help="Incluye la pérdida FAO-33 por cultivo")
+    classify = sub.add_parser("classify", parents=[escenario], help="Clasificación MOPE")
+    classify.add_argument("--caudal", type=float, nargs="+", default=None, help="Caudales sueltos (m³/s)")
+    args = parser.parse_args(argv)
+
+    comandos = {"simulate": cmd_simulate, "kpis": cmd_kpis, "classify": cmd_classify}
+    escribir(comandos[args.comando](args), args.formato, args.salida)
+
+
+if __name__ == "__main__":
+    main()
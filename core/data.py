@@ -0,0 +1,62 @@
+"""
+Carga del dataset gold sin caché de interfaz: memory-map del almacén columnar o CSV de respaldo.
+DataLoader (modules/data_loader.py) envuelve estas funciones con la caché de Streamlit.
+"""
+import os
+
+import pandas as pd
+
+from modules.gold_store import read_gold_store, dataset_version, SCHEMA
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLD_DIR = os.path.join(BASE_DIR, "data", "gold")
+CSV_PATH = os.path.join(GOLD_DIR, "app_data_70years.csv")
+STORE_PATH = os.path.join(GOLD_DIR, "app_data_70years")
+STATIONS_PATH = os.path.join(GOLD_DIR, "estaciones")
+STATIONS_META_PATH = os.path.join(GOLD_DIR, "estaciones.csv")
+
+
+def tiene_store(directorio):
+    return os.path.exists(os.path.join(directorio, SCHEMA))
+
+
+def leer_csv(ruta, columnas=None):
+    df = pd.read_csv(ruta, usecols=list(columnas) if columnas else None)
+    if 'Fecha' in df.columns:
+        df['Fecha'] = pd.to_datetime(df['Fecha'])
+    return df
+
+
+def cargar_gold(formato="auto", columnas=None, store_path=STORE_PATH, csv_path=CSV_PATH):
+    """Dataset gold: "auto" (almacén columnar si existe), "npy" o "csv"; None si no hay datos"""
+    if formato in ("auto", "npy") and tiene_store(store_path):
+        return read_gold_store(store_path, columnas=list(columnas) if columnas else None)
+    if formato in ("auto", "csv") and os.path.exists(csv_path):
+        return leer_csv(csv_path, columnas)
+    return None
+
+
+def version_gold(formato="auto", store_path=STORE_PATH, csv_path=CSV_PATH):
+    """Versión del dataset que cargaría cargar_gold: la del esquema o, para el CSV, tamaño y fecha de modificación"""
+    if formato in ("auto", "npy") and tiene_store(store_path):
+        return dataset_version(store_path)
+    if formato in ("auto", "csv") and os.path.exists(csv_path):
+        estado = os.stat(csv_path)
+        return f"csv-{estado.st_size}-{estado.st_mtime_ns}"
+    return None
+
+
+def columnas_estaciones(columnas=None):
+    if columnas and 'grdc_no' not in columnas:
+        return ('grdc_no',) + tuple(columnas)
+    return tuple(columnas) if columnas else None
+
+
+def cargar_estaciones(columnas=None, store_path=STATIONS_PATH, meta_path=STATIONS_META_PATH):
+    """Dataset multi-estación y metadatos; (None, None) si no se ha construido"""
+    if not tiene_store(store_path):
+        return None, None
+    columnas = columnas_estaciones(columnas)
+    df = read_gold_store(store_path, columnas=list(columnas) if columnas else None)
+    meta = pd.read_csv(meta_path) if os.path.exists(meta_path) else None
+    return df, meta
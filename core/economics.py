@@ -0,0 +1,80 @@
+"""
+Pérdidas agrícolas FAO-33 sin interfaz: severidades bajo P10 / sobre P90 por costos de cultivo.
+EconomicModule (modules/economics.py) añade la pestaña de Streamlit sobre esta clase.
+"""
+import numpy as np
+import pandas as pd
+
+# Costos DOP por unidad de severidad: s = sequía, i = inundación
+CULTIVOS_DEFAULT = {
+    'Arroz': {'s': 4500, 'i': 2000},
+    'Banano': {'s': 2500, 'i': 3500},
+    'Aguacate': {'s': 1800, 'i': 5000}
+}
+
+
+def costos_por_defecto(catalogo=None):
+    """Catálogo {cultivo: {'s', 'i'}} -> {cultivo: {'Sequia', 'Inundacion'}}"""
+    return {c: {'Sequia': v['s'], 'Inundacion': v['i']} for c, v in (catalogo or CULTIVOS_DEFAULT).items()}
+
+
+class EconomicCore:
+    def __init__(self, catalogo=None, umbrales=None):
+        # Configuración por defecto de cultivos (costos DOP por unidad de severidad)
+        self.cultivos_default = catalogo or dict(CULTIVOS_DEFAULT)
+        # ThresholdEngine con la historia completa (incremental); sin él, P10/P90 del rango
+        self.umbrales = umbrales
+
+    def obtener_umbrales(self, df, estacional=False):
+        """P10/P90 de la línea base: escalares o, si es estacional, un par por fila según el mes"""
+        if self.umbrales is None or len(self.umbrales) == 0:
+            return tuple(np.quantile(df['Caudal_IA'].to_numpy(dtype=float), [0.10, 0.90]))
+        if estacional:
+            return tuple(self.umbrales.umbrales_por_fila(df['Mes'].to_numpy()))
+        return self.umbrales.umbrales()
+
+    # --- 1. KERNEL MATRICIAL ---
+    @staticmethod
+    def severidades(caudales, p10, p90):
+        """Caudales (E × N) -> severidades (E × N × 2): [sequía bajo P10, inundación sobre P90]"""
+        caudales = np.atleast_2d(np.asarray(caudales, dtype=float))
+        return np.stack([np.maximum(p10 - caudales, 0.0), np.maximum(caudales - p90, 0.0)], axis=-1)
+
+    @staticmethod
+    def matriz_costos(costos):
+        """{cultivo: {'Sequia', 'Inundacion'}} -> (nombres, matriz 2 × K)"""
+        nombres = list(costos)
+        C = np.array([[costos[c]['Sequia'] for c in nombres],
+                      [costos[c]['Inundacion'] for c in nombres]], dtype=float).reshape(2, len(nombres))
+        return nombres, C
+
+    @staticmethod
+    def perdidas(S, C):
+        """Producto severidad × costo: (E × N × 2) @ (2 × K) -> (E × N × K)"""
+        return S @ C
+
+    # --- 2. API SOBRE EL DATAFRAME SIMULADO ---
+    def calcular_perdidas(self, df, costos):
+        """Pérdidas por cultivo del escenario simulado; umbrales P10/P90 sobre la línea base (Caudal_IA)"""
+        caudal = df['Caudal_Simulado'].to_numpy(dtype=float)
+        p10, p90 = self.obtener_umbrales(df)
+
+        S = self.severidades(caudal, p10, p90)[0]
+        nombres, C = self.matriz_costos(costos)
+        L = self.perdidas(S, C)
+
+        df_sim = pd.concat([
+            df[['Fecha', 'Caudal_IA', 'Caudal_Simulado']].reset_index(drop=True),
+            pd.DataFrame({'Severidad_Sequia': S[:, 0], 'Severidad_Inundacion': S[:, 1]}),
+            pd.DataFrame(L, columns=[f'Perdida_{c}' for c in nombres]),
+        ], axis=1)
+        return df_sim, p10, p90
+
+    def totales(self, df, costos=None, estacional=False):
+        """Pérdida total por cultivo (RD$) de la línea base y del escenario"""
+        costos = costos or costos_por_defecto(self.cultivos_default)
+        caudales = np.vstack([df['Caudal_IA'].to_numpy(dtype=float), df['Caudal_Simulado'].to_numpy(dtype=float)])
+        p10, p90 = self.obtener_umbrales(df, estacional)
+        nombres, C = self.matriz_costos(costos)
+        totales = self.severidades(caudales, p10, p90).sum(axis=1) @ C # (E × K)
+        return pd.DataFrame({'Cultivo': nombres, 'Perdida_Base': totales[0], 'Perdida_Escenario': totales[1]})
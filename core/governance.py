@@ -0,0 +1,41 @@
+"""
+Decisiones MOPE sin interfaz: regla del escenario, línea de tiempo mensual y registro en el audit log.
+GovernanceModule (modules/governance.py) dibuja estos mismos resultados en Streamlit.
+"""
+from modules.rules import MOPE, SECTORES
+
+
+def evaluar_escenario(kpis):
+    """
+    Motor Híbrido: Convierte datos técnicos (Caudal) en reglas normativas (MOPE).
+    """
+    return MOPE.evaluar(kpis.get('caudal_promedio', 0))
+
+
+def clasificar_caudales(caudales):
+    """Regla MOPE resumida (código, nivel, acción, prioridad e impacto sectorial) por caudal"""
+    filas = []
+    for caudal in caudales:
+        regla = MOPE.evaluar(caudal)
+        filas.append({"caudal": float(caudal), "codigo": int(regla["codigo"]), "nivel": regla["nivel"],
+                      "accion": regla["accion"], "prioridad": regla["prioridad"],
+                      **{s: regla["impacto_social"][s] for s in SECTORES}})
+    return filas
+
+
+def decisiones(df_view, columna='Caudal_Simulado'):
+    """Nivel, acción e impacto sectorial de cada mes del escenario"""
+    return MOPE.timeline(df_view['Fecha'], df_view[columna])
+
+
+def registrar_decision(store, kpis, autoridad):
+    """Encola en el AuditStore la decisión que dicta la regla MOPE del escenario"""
+    escenario = evaluar_escenario(kpis)
+    store.append(
+        autoridad=autoridad,
+        accion=escenario['accion'],
+        nivel=escenario['nivel'],
+        causa=f"Caudal a {kpis['caudal_promedio']:.1f} m³/s ({escenario['nivel']})",
+        caudal=kpis['caudal_promedio'],
+    )
+    return escenario
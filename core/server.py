@@ -0,0 +1,206 @@
+"""
+Servicio HTTP local (solo biblioteca estándar) sobre el núcleo: caudales, KPIs, pérdidas y nivel MOPE.
+El dataset y el motor se cargan una vez y los comparten todos los hilos; las peticiones idénticas
+en vuelo se resuelven con un solo cálculo y las respuestas quedan en una caché LRU acotada.
+
+    python -m core.server --port 8765 --workers 4
+    curl "http://127.0.0.1:8765/kpis?desde=2015&hasta=2023&lluvia=-20&perdidas=1"
+    curl "http://127.0.0.1:8765/classify?caudal=18&caudal=32"
+    curl "http://127.0.0.1:8765/stats"
+"""
+import argparse
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from core.cli import a_json
+from core.data import cargar_gold
+from core.economics import EconomicCore
+from core.governance import evaluar_escenario, clasificar_caudales, decisiones
+from modules.cache import ResultCache
+from modules.engine import HydrologyEngine
+
+ENDPOINTS = ("simulate", "kpis", "classify")
+
+
+class ErrorPeticion(ValueError):
+    """Parámetros inválidos: se responde 400"""
+
+
+class SimulationService:
+    def __init__(self, df, modelo=None, workers=4, maxsize=256, timeout=30.0):
+        # 1. Estado compartido (solo lectura): el índice por año se construye antes de abrir el puerto
+        self.engine = HydrologyEngine(df, modelo=modelo)
+        self.engine.index
+        self.economia = EconomicCore()
+        anos = df['Fecha'].dt.year
+        self.rango_total = (int(anos.iloc[0]), int(anos.iloc[-1]))
+
+        # 2. Pool de cálculo, respuestas serializadas en caché y peticiones en vuelo
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pargirh")
+        self.cache = ResultCache(maxsize=maxsize)
+        self.timeout = timeout
+        self._en_vuelo = {}
+        self._lock = threading.Lock()
+        self.coalescidas = 0
+
+    # --- 1. PARÁMETROS ---
+    def config(self, params):
+        """Query string -> config del motor (mismos nombres que la CLI)"""
+        try:
+            desde = int(params.get("desde", [self.rango_total[0]])[0])
+            hasta = int(params.get("hasta", [self.rango_total[1]])[0])
+            lluvia = float(params.get("lluvia", [0])[0])
+            temp = float(params.get("temp", [0])[0])
+        except ValueError as e:
+            raise ErrorPeticion(f"Parámetro numérico inválido: {e}")
+        motor = params.get("motor", ["factores"])[0]
+        if motor not in ("factores", "ia"):
+            raise ErrorPeticion(f"Motor desconocido: {motor}")
+        if motor == "ia" and self.engine.simulador is None:
+            raise ErrorPeticion("El servicio se inició sin modelo IA (--ia)")
+        if desde > hasta:
+            raise ErrorPeticion("desde > hasta")
+        return {"rango": (desde, hasta), "delta_lluvia": lluvia, "delta_temp": temp, "motor": motor}
+
+    def clave(self, endpoint, params):
+        """Petición canónica: el orden de los parámetros no crea entradas distintas"""
+        if endpoint == "classify" and "caudal" in params:
+            try:
+                return (endpoint, tuple(float(c) for c in params["caudal"]))
+            except ValueError as e:
+                raise ErrorPeticion(f"Caudal inválido: {e}")
+        config = self.config(params)
+        extra = params.get("perdidas", ["0"])[0] not in ("", "0") if endpoint == "kpis" else False
+        return (endpoint, config["rango"], config["delta_lluvia"], config["delta_temp"], config["motor"], extra)
+
+    # --- 2. CÁLCULOS (sobre el motor compartido) ---
+    def calcular(self, endpoint, params):
+        if endpoint == "classify" and "caudal" in params:
+            return clasificar_caudales(float(c) for c in params["caudal"])
+        config = self.config(params)
+        if endpoint == "kpis":
+            kpis = {"desde": config["rango"][0], "hasta": config["rango"][1], **self.engine.kpis_for_range(config)}
+            kpis["mope"] = evaluar_escenario(kpis)["nivel"]
+            if params.get("perdidas", ["0"])[0] not in ("", "0"):
+                totales = self.economia.totales(self.engine.run_simulation(config))
+                kpis["perdidas"] = dict(zip(totales['Cultivo'], totales['Perdida_Escenario']))
+            return kpis
+        df_view = self.engine.run_simulation(config)
+        if endpoint == "classify":
+            return decisiones(df_view).to_dict(orient="records")
+        return df_view.to_frame(['Fecha', 'Caudal_IA', 'Caudal_Simulado']).to_dict(orient="records")
+
+    def _ejecutar(self, clave, endpoint, params):
+        try:
+            cuerpo = json.dumps(self.calcular(endpoint, params), default=a_json, ensure_ascii=False).encode("utf-8")
+            return self.cache.put(clave, cuerpo)
+        finally:
+            with self._lock:
+                self._en_vuelo.pop(clave, None)
+
+    # --- 3. RESOLUCIÓN: caché -> petición en vuelo -> pool ---
+    def responder(self, endpoint, params):
+        """Cuerpo JSON (bytes) de la petición"""
+        if endpoint not in ENDPOINTS:
+            raise ErrorPeticion(f"Ruta desconocida: /{endpoint}")
+        clave = self.clave(endpoint, params)
+        cuerpo = self.cache.get(clave)
+        if cuerpo is not None:
+            return cuerpo
+        with self._lock:
+            futuro = self._en_vuelo.get(clave)
+            if futuro is None:
+                futuro = self.pool.submit(self._ejecutar, clave, endpoint, params)
+                self._en_vuelo[clave] = futuro
+            else:
+                self.coalescidas += 1
+        return futuro.result(timeout=self.timeout)
+
+    def stats(self):
+        with self._lock:
+            en_vuelo = len(self._en_vuelo)
+        return {**self.cache.stats(), "coalescidas": self.coalescidas, "en_vuelo": en_vuelo,
+                "workers": self.workers, "filas": len(self.engine.df)}
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    servicio = None
+    protocol_version = "HTTP/1.1" # keep-alive para el cliente de carga
+    disable_nagle_algorithm = True # cabeceras y cuerpo van en dos escrituras: sin Nagle no esperan al ACK
+
+    def _enviar(self, estado, cuerpo):
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _error(self, estado, mensaje):
+        self._enviar(estado, json.dumps({"error": mensaje}, ensure_ascii=False).encode("utf-8"))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        endpoint = url.path.strip("/")
+        if endpoint == "health":
+            return self._enviar(200, b'{"ok": true}')
+        if endpoint == "stats":
+            return self._enviar(200, json.dumps(self.servicio.stats()).encode("utf-8"))
+        if endpoint not in ENDPOINTS:
+            return self._error(404, f"Ruta desconocida: /{endpoint}")
+        try:
+            self._enviar(200, self.servicio.responder(endpoint, parse_qs(url.query)))
+        except ErrorPeticion as e:
+            self._error(400, str(e))
+        except Exception as e: # el servicio no cae por una petición
+            self._error(500, f"{type(e).__name__}: {e}")
+
+    def log_message(self, formato, *args):
+        pass # sin una línea por petición en stderr
+
+
+def crear_servidor(servicio, host="127.0.0.1", port=8765):
+    """ThreadingHTTPServer ligado al servicio (port=0 elige un puerto libre)"""
+    handler = type("Handler", (_Handler,), {"servicio": servicio})
+    servidor = ThreadingHTTPServer((host, port), handler)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.server", description="Servicio HTTP local de RH-PARGIRH")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4, help="Hilos del pool de cálculo")
+    parser.add_argument("--cache", type=int, default=256, help="Respuestas en la caché LRU")
+    parser.add_argument("--datos", choices=["auto", "npy", "csv"], default="auto")
+    parser.add_argument("--ia", action="store_true", help="Carga el Random Forest (motor=ia)")
+    args = parser.parse_args(argv)
+
+    df = cargar_gold(args.datos)
+    if df is None:
+        raise SystemExit("No se encuentra el dataset gold (python -m modules.pipeline build)")
+    modelo = None
+    if args.ia:
+        from modules.model import cargar_modelo
+        modelo = cargar_modelo()
+    servicio = SimulationService(df, modelo=modelo, workers=args.workers, maxsize=args.cache)
+    servidor = crear_servidor(servicio, args.host, args.port)
+    print(f"Servicio en http://{args.host}:{servidor.server_address[1]} ({len(df):,} filas, {args.workers} workers)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servicio.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Notario Digital persistente: registro de decisiones append-only en SQLite (modo WAL).
+Cada registro guarda el hash del anterior (cadena SHA-256), de modo que cualquier
+modificación posterior se detecta al verificar. Las escrituras se agrupan en lotes y la
+interfaz solo lee páginas del final del registro.
+"""
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AUDIT_PATH = os.path.join(BASE_DIR, "data", "audit", "audit_log.sqlite")
+
+GENESIS = "0" * 64
+CAMPOS = ("timestamp", "autoridad", "nivel", "accion", "causa", "caudal")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS registros (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    autoridad TEXT NOT NULL,
+    nivel TEXT,
+    accion TEXT NOT NULL,
+    causa TEXT,
+    caudal REAL,
+    hash_prev TEXT NOT NULL,
+    hash TEXT NOT NULL UNIQUE
+);
+CREATE INDEX IF NOT EXISTS idx_registros_timestamp ON registros(timestamp);
+CREATE INDEX IF NOT EXISTS idx_registros_autoridad ON registros(autoridad, id);
+CREATE INDEX IF NOT EXISTS idx_registros_nivel ON registros(nivel, id);
+CREATE TRIGGER IF NOT EXISTS registros_sin_update BEFORE UPDATE ON registros
+BEGIN SELECT RAISE(ABORT, 'El registro de auditoría es append-only'); END;
+CREATE TRIGGER IF NOT EXISTS registros_sin_delete BEFORE DELETE ON registros
+BEGIN SELECT RAISE(ABORT, 'El registro de auditoría es append-only'); END;
+"""
+
+
+def hash_registro(hash_prev, registro):
+    """SHA-256 del hash anterior + los campos del registro en JSON canónico"""
+    contenido = json.dumps([registro.get(c) for c in CAMPOS], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256((hash_prev + contenido).encode("utf-8")).hexdigest()
+
+
+class AuditStore:
+    def __init__(self, ruta=AUDIT_PATH, lote=32, intervalo=5.0):
+        self.ruta = str(ruta)
+        # Se escribe al juntar `lote` registros o al pasar `intervalo` segundos desde el primero pendiente
+        self.lote = lote
+        self.intervalo = intervalo
+        self._pendientes = []
+        self._desde = None
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.ruta)), exist_ok=True)
+        self.conn = sqlite3.connect(self.ruta, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(ESQUEMA)
+
+    def __len__(self):
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM registros").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    # --- 1. ESCRITURA POR LOTES ---
+    def append(self, autoridad, accion, nivel=None, causa=None, caudal=None, timestamp=None):
+        """Encola una decisión; se persiste con el siguiente lote"""
+        registro = {
+            "timestamp": timestamp or datetime.datetime.now().isoformat(timespec="seconds"),
+            "autoridad": autoridad,
+            "nivel": nivel,
+            "accion": accion,
+            "causa": causa,
+            "caudal": None if caudal is None else float(caudal),
+        }
+        with self._lock:
+            self._pendientes.append(registro)
+            if self._desde is None:
+                self._desde = time.monotonic()
+            vencido = len(self._pendientes) >= self.lote or time.monotonic() - self._desde >= self.intervalo
+        if vencido:
+            self.flush()
+        return registro
+
+    def flush(self):
+        """Escribe los pendientes en una sola transacción, encadenando los hashes"""
+        with self._lock:
+            pendientes, self._pendientes, self._desde = self._pendientes, [], None
+            if not pendientes:
+                return 0
+            # BEGIN IMMEDIATE: el último hash no cambia mientras se escribe el lote (varios procesos)
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                fila = self.conn.execute("SELECT hash FROM registros ORDER BY id DESC LIMIT 1").fetchone()
+                hash_prev = fila[0] if fila else GENESIS
+                filas = []
+                for registro in pendientes:
+                    h = hash_registro(hash_prev, registro)
+                    filas.append(tuple(registro[c] for c in CAMPOS) + (hash_prev, h))
+                    hash_prev = h
+                self.conn.executemany(
+                    f"INSERT INTO registros ({', '.join(CAMPOS)}, hash_prev, hash) VALUES ({', '.join('?' * (len(CAMPOS) + 2))})",
+                    filas,
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                self._pendientes[:0] = pendientes
+                raise
+        return len(pendientes)
+
+    # --- 2. CONSULTAS ---
+    def _filtro(self, autoridad=None, nivel=None, desde=None, hasta=None):
+        condiciones, parametros = [], []
+        for columna, operador, valor in (("autoridad", "=", autoridad), ("nivel", "=", nivel),
+                                         ("timestamp", ">=", desde), ("timestamp", "<=", hasta)):
+            if valor is not None:
+                condiciones.append(f"{columna} {operador} ?")
+                parametros.append(valor)
+        return condiciones, parametros
+
+    def contar(self, **filtros):
+        self.flush()
+        condiciones, parametros = self._filtro(**filtros)
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        return self.conn.execute(f"SELECT COUNT(*) FROM registros {where}", parametros).fetchone()[0]
+
+    def tail(self, limite=20, antes_de=None, **filtros):
+        """Página del final del registro (más reciente primero); `antes_de` es el id del cursor"""
+        self.flush()
+        condiciones, parametros = self._filtro(**filtros)
+        if antes_de is not None:
+            condiciones.append("id < ?")
+            parametros.append(int(antes_de))
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        consulta = f"SELECT id, {', '.join(CAMPOS)}, hash FROM registros {where} ORDER BY id DESC LIMIT ?"
+        return pd.read_sql_query(consulta, self.conn, params=parametros + [int(limite)])
+
+    def pagina(self, numero, limite=20, **filtros):
+        """Página `numero` (0 = la más reciente); sin filtros se resuelve por rango de id"""
+        self.flush()
+        if all(v is None for v in filtros.values()):
+            # Registro append-only: los id son consecutivos y la página es un rango por clave primaria
+            ultimo = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM registros").fetchone()[0]
+            return self.tail(limite, antes_de=ultimo + 1 - numero * limite)
+        condiciones, parametros = self._filtro(**filtros)
+        consulta = f"SELECT id, {', '.join(CAMPOS)}, hash FROM registros WHERE {' AND '.join(condiciones)} ORDER BY id DESC LIMIT ? OFFSET ?"
+        return pd.read_sql_query(consulta, self.conn, params=parametros + [int(limite), int(numero * limite)])
+
+    # --- 3. VERIFICACIÓN DE LA CADENA ---
+    def verificar(self, bloque=10000):
+        """Recorre la cadena por bloques (memoria acotada); devuelve (ok, id del primer registro alterado)"""
+        self.flush()
+        hash_prev, ultimo_id = GENESIS, 0
+        columnas = f"id, {', '.join(CAMPOS)}, hash_prev, hash"
+        while True:
+            filas = self.conn.execute(
+                f"SELECT {columnas} FROM registros WHERE id > ? ORDER BY id LIMIT ?", (ultimo_id, bloque)
+            ).fetchall()
+            if not filas:
+                return True, None
+            for fila in filas:
+                registro = dict(zip(CAMPOS, fila[1:1 + len(CAMPOS)]))
+                guardado_prev, guardado = fila[-2], fila[-1]
+                if guardado_prev != hash_prev or hash_registro(hash_prev, registro) != guardado:
+                    return False, fila[0]
+                hash_prev = guardado
+            ultimo_id = filas[-1][0]
@@ -0,0 +1,90 @@
+"""
+Caché LRU de resultados de escenario (vista simulada, KPIs y figuras).
+La clave identifica la versión del dataset y la configuración que afecta al cálculo,
+así que las interacciones ajenas a la hidrología (chat, auditoría) no recalculan nada.
+"""
+import threading
+from collections import OrderedDict
+
+
+def clave_escenario(version, config):
+    """(versión del dataset, rango, delta_lluvia, delta_temp, motor, ensamble)"""
+    return (
+        version,
+        tuple(int(a) for a in config["rango"]),
+        float(config["delta_lluvia"]),
+        float(config["delta_temp"]),
+        config.get("motor", "factores"),
+        bool(config.get("ensamble", False)),
+    )
+
+
+class ResultCache:
+    """LRU acotada por número de entradas y, opcionalmente, por bytes (`peso(valor)` mide cada entrada)"""
+    def __init__(self, maxsize=32, maxbytes=None, peso=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._peso = peso
+        self._datos = OrderedDict()
+        self._pesos = {}
+        self.bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._datos)
+
+    def __contains__(self, clave):
+        return clave in self._datos
+
+    def get(self, clave, default=None):
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.hits += 1
+                return self._datos[clave]
+            self.misses += 1
+            return default
+
+    def put(self, clave, valor):
+        with self._lock:
+            if clave in self._datos:
+                self.bytes -= self._pesos.pop(clave, 0)
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            if self._peso is not None:
+                self._pesos[clave] = self._peso(valor)
+                self.bytes += self._pesos[clave]
+            while self._datos and (len(self._datos) > self.maxsize
+                                   or (self.maxbytes is not None and self.bytes > self.maxbytes)):
+                viejo, _ = self._datos.popitem(last=False)
+                self.bytes -= self._pesos.pop(viejo, 0)
+                self.evictions += 1
+        return valor
+
+    def get_or_compute(self, clave, funcion):
+        """Devuelve el resultado cacheado o lo calcula (fuera del candado) y lo guarda"""
+        faltante = object()
+        valor = self.get(clave, faltante)
+        if valor is faltante:
+            valor = self.put(clave, funcion())
+        return valor
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+            self._pesos.clear()
+            self.bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._datos),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
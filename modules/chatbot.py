@@ -1,29 +1,36 @@
 import streamlit as st
-import time
+from modules.legal_index import cargar_indice
+from modules.tracing import traced
+
+
+@st.cache_resource
+def _indice_legal():
+    """Índice BM25 preconstruido (data/legal/indice_bm25.npz), cargado una vez por servidor"""
+    return cargar_indice()
+
 
 class LegalAssistant:
-    def __init__(self):
-        # Base de conocimiento (Igual que antes)
-        self.knowledge_base = {
-            "roja": "🚨 **Art. 45 (Fase Roja):**\n\nEn caso de déficit >50%:\n1. Prohibición total de riego agrícola.\n2. Prioridad absoluta a consumo humano.\n3. Control militar de válvulas si es necesario.",
-            "amarilla": "⚠️ **Art. 44 (Fase Amarilla):**\n\nEn caso de déficit 30-50%:\n1. Riego restringido (2 días/sem).\n2. Prohibición de lavado de vehículos.\n3. Multas por desperdicio en zonas urbanas.",
-            "inercia": "🌱 **Inercia Hídrica (Definición):**\n\nEs la memoria del suelo. Un valor bajo (<40mm) indica que el suelo está seco y absorberá la lluvia antes de que llegue al río. Es un indicador temprano de sequía invisible.",
-            "ayuda": "Soy el **Asistente Legal PARGIRH**. Puedo citar el protocolo oficial.\n\nPregúntame sobre:\n- Protocolo Fase Roja\n- Medidas Fase Amarilla\n- ¿Qué es la Inercia?"
-        }
+    def __init__(self, indice=None):
+        # Base de conocimiento indexada (MOPE + reglamento)
+        self.indice = indice or _indice_legal()
+        self.ayuda = next(d["texto"] for d in self.indice.documentos if d["id"] == "ayuda")
 
     def _stream_text(self, text):
-        """Efecto visual de escritura 'tipo máquina de escribir'"""
+        """Efecto visual de escritura palabra por palabra (sin pausas: no bloquea el rerun)"""
         for word in text.split(" "):
             yield word + " "
-            time.sleep(0.05) # Velocidad de escritura
 
     def get_response(self, prompt):
-        prompt = prompt.lower()
-        if "roja" in prompt or "crisis" in prompt: return self.knowledge_base["roja"]
-        elif "amarilla" in prompt or "alerta" in prompt: return self.knowledge_base["amarilla"]
-        elif "inercia" in prompt or "suelo" in prompt: return self.knowledge_base["inercia"]
-        else: return "No encuentro esa referencia en el Manual. Intenta preguntar por 'Fase Roja', 'Amarilla' o 'Inercia'."
+        resultados = self.indice.search(prompt, k=3)
+        if not resultados:
+            return "No encuentro esa referencia en el Manual. Intenta preguntar por 'Fase Roja', 'Amarilla' o 'Inercia'."
+        respuesta = resultados[0][1]["texto"]
+        relacionados = [doc["titulo"] for _, doc in resultados[1:] if doc["id"] != "ayuda"]
+        if relacionados:
+            respuesta += "\n\n*Ver también: " + " · ".join(relacionados) + "*"
+        return respuesta
 
+    @traced()
     def render(self):
         st.markdown("---")
         
@@ -37,7 +44,7 @@ class LegalAssistant:
 
         # Inicializar historial
         if "messages" not in st.session_state:
-            st.session_state.messages = [{"role": "assistant", "content": self.knowledge_base["ayuda"]}]
+            st.session_state.messages = [{"role": "assistant", "content": self.ayuda}]
 
         # Contenedor del chat (Altura fija para que se vea ordenado)
         chat_container = st.sidebar.container(height=400)
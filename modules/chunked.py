@@ -0,0 +1,181 @@
+"""
+Motor fuera de memoria: recorre el almacén gold (memory-map) en bloques de filas consecutivas
+y acumula simulación y KPIs bloque a bloque. Las ventanas móviles (inercia) arrastran su estado
+entre bloques y el tamaño del bloque sale de un presupuesto de memoria, no del tamaño del dataset.
+
+    engine = ChunkedEngine("data/gold/app_data_70years", presupuesto_mb=64)
+    engine.calculate_kpis({"rango": (1950, 2023), "delta_lluvia": -20, "delta_temp": 1.0})
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from modules.engine import HydrologyEngine, kpis_estado
+from modules.gold_store import read_schema, write_gold_store, append_gold_store
+from modules.model import COLUMNAS_MODELO
+from modules.rules import UMBRAL_CRISIS
+
+PRESUPUESTO_MB = 256
+# Copias temporales por fila además de las columnas leídas (factores, máscaras, salida)
+TEMPORALES_POR_FILA = 6
+
+
+class VentanaMovil:
+    """Media móvil de `ventana` filas que continúa entre bloques (opcionalmente reiniciada por grupo)"""
+    def __init__(self, ventana=3):
+        self.ventana = ventana
+        self.cola = np.empty(0)
+        self.cola_grupo = np.empty(0, dtype=np.int64)
+
+    def aplicar(self, valores, grupos=None, respaldo=None):
+        """Media de cada fila con las (ventana - 1) anteriores; `respaldo` donde no hay historia completa"""
+        w = self.ventana
+        valores = np.asarray(valores, dtype=float)
+        serie = np.concatenate([self.cola, valores])
+        acumulado = np.concatenate([[0.0], np.cumsum(serie)])
+        n_cola = len(self.cola)
+        fin = np.arange(n_cola, len(serie)) + 1
+        salida = np.full(len(valores), np.nan)
+        valido = fin >= w
+        salida[valido] = (acumulado[fin[valido]] - acumulado[fin[valido] - w]) / w
+        if grupos is not None:
+            # Serie ordenada por grupo: la ventana es válida si su primera fila es del mismo grupo
+            g = np.concatenate([self.cola_grupo, np.asarray(grupos, dtype=np.int64)])
+            mismo = np.zeros(len(valores), dtype=bool)
+            mismo[valido] = g[fin[valido] - w] == g[fin[valido] - 1]
+            valido &= mismo
+            salida[~valido] = np.nan
+            self.cola_grupo = g[-(w - 1):] if w > 1 else g[:0]
+        if respaldo is not None:
+            salida[~valido] = np.asarray(respaldo, dtype=float)[~valido]
+        self.cola = serie[-(w - 1):] if w > 1 else serie[:0]
+        return salida
+
+
+class ChunkedEngine:
+    def __init__(self, directorio, presupuesto_mb=PRESUPUESTO_MB, modelo=None, grupo=None, filas_por_bloque=None):
+        self.directorio = str(directorio)
+        self.schema = read_schema(self.directorio)
+        self.modelo = modelo
+        self.grupo = grupo # p. ej. 'grdc_no' en el dataset multi-estación (ordenado por estación y fecha)
+        self.presupuesto_mb = presupuesto_mb
+        self._filas_por_bloque = filas_por_bloque
+
+    def __len__(self):
+        return self.schema["filas"]
+
+    def anos(self):
+        """Primer y último año del almacén (sin leer la serie)"""
+        fechas = self._columna('Fecha')
+        return tuple(int(str(f)[:4]) for f in fechas[[0, -1]].astype("datetime64[Y]"))
+
+    def _columna(self, nombre):
+        info = self.schema["columnas"][nombre]
+        return np.load(os.path.join(self.directorio, info["archivo"]), mmap_mode="r", allow_pickle=False)
+
+    def filas_por_bloque(self, columnas):
+        """Filas que caben en el presupuesto: columnas leídas + temporales en float64"""
+        if self._filas_por_bloque:
+            return self._filas_por_bloque
+        bytes_fila = sum(np.dtype(self.schema["columnas"][c]["dtype"]).itemsize for c in columnas)
+        bytes_fila += 8 * (TEMPORALES_POR_FILA + (2 * len(COLUMNAS_MODELO) if self.modelo is not None else 0))
+        return max(1, int(self.presupuesto_mb * 2**20) // bytes_fila)
+
+    # --- 1. LECTURA POR BLOQUES ---
+    def bloques(self, columnas, rango=None, previas=0):
+        """
+        Genera {columna: arreglo} por bloque, en orden. Con `rango` (años) se leen solo sus filas
+        más `previas` filas de calentamiento para las ventanas; la máscara '_en_rango' las excluye.
+        """
+        mapas = {c: self._columna(c) for c in set(columnas) | {'Fecha'}}
+        lo, hi = 0, len(self)
+        if rango is not None and self.grupo is None:
+            # Serie ordenada por fecha: el rango es un intervalo de filas
+            fechas = mapas['Fecha']
+            inicio = np.datetime64(f"{int(rango[0])}-01-01").astype(fechas.dtype)
+            fin = np.datetime64(f"{int(rango[1]) + 1}-01-01").astype(fechas.dtype)
+            lo, hi = (int(i) for i in np.searchsorted(fechas, [inicio, fin]))
+        desde = max(lo - previas, 0) if lo < hi else lo
+        paso = self.filas_por_bloque(mapas)
+        for a in range(desde, hi, paso):
+            b = min(a + paso, hi)
+            bloque = {c: np.asarray(m[a:b]) for c, m in mapas.items()}
+            if rango is not None and self.grupo is not None:
+                anos = bloque['Fecha'].astype("datetime64[Y]").astype(int) + 1970
+                bloque['_en_rango'] = (anos >= rango[0]) & (anos <= rango[1])
+            elif a < lo:
+                bloque['_en_rango'] = np.arange(a, b) >= lo
+            yield bloque
+
+    # --- 2. SIMULACIÓN ---
+    def _simular_bloque(self, bloque, config, ventana):
+        factor = float(HydrologyEngine.factores(config["delta_lluvia"], config["delta_temp"]))
+        caudal_ia = bloque['Caudal_IA'].astype(float)
+        if config.get("motor") != "ia" or self.modelo is None:
+            return caudal_ia * factor
+        # Mismas variables que ModelSimulator.features, con la inercia arrastrada entre bloques
+        f_lluvia = 1 + config["delta_lluvia"] / 100
+        precipitacion = bloque['Precipitacion'].astype(float)
+        grupos = bloque.get(self.grupo) if self.grupo else None
+        inercia_base = bloque['Inercia_3meses'].astype(float)
+        inercia = ventana.aplicar(precipitacion * f_lluvia, grupos, respaldo=inercia_base * f_lluvia)
+        columnas = [precipitacion, bloque['Temperatura'].astype(float), inercia_base, bloque['Mes'].astype(float)]
+        base = self.modelo.predict(pd.DataFrame(np.column_stack(columnas), columns=COLUMNAS_MODELO))
+        columnas = [precipitacion * f_lluvia, columnas[1] + config["delta_temp"], inercia, columnas[3]]
+        perturbado = self.modelo.predict(pd.DataFrame(np.column_stack(columnas), columns=COLUMNAS_MODELO))
+        return np.maximum(caudal_ia + perturbado - base, 0.0)
+
+    def _columnas_simulacion(self, config):
+        columnas = ['Fecha', 'Caudal_IA', 'Inercia_3meses']
+        if config.get("motor") == "ia" and self.modelo is not None:
+            columnas += ['Precipitacion', 'Temperatura', 'Mes']
+        if self.grupo:
+            columnas.append(self.grupo)
+        return columnas
+
+    def iter_simulacion(self, config):
+        """DataFrames por bloque con Fecha, Caudal_IA y Caudal_Simulado del escenario"""
+        ventana = VentanaMovil(3)
+        for bloque in self.bloques(self._columnas_simulacion(config), config.get("rango"), ventana.ventana - 1):
+            simulado = self._simular_bloque(bloque, config, ventana)
+            datos = {'Fecha': bloque['Fecha'], 'Caudal_IA': bloque['Caudal_IA'], 'Caudal_Simulado': simulado}
+            if self.grupo:
+                datos = {self.grupo: bloque[self.grupo], **datos}
+            df = pd.DataFrame(datos)
+            if '_en_rango' in bloque:
+                df = df[bloque['_en_rango']]
+            yield df
+
+    # --- 3. KPIs POR AGREGACIÓN ---
+    def calculate_kpis(self, config):
+        """Mismos KPIs que HydrologyEngine.calculate_kpis con memoria acotada por bloque"""
+        suma_sim = suma_base = suma_inercia = 0.0
+        n = criticos = 0
+        ventana = VentanaMovil(3)
+        for bloque in self.bloques(self._columnas_simulacion(config), config.get("rango"), ventana.ventana - 1):
+            simulado = self._simular_bloque(bloque, config, ventana)
+            en_rango = bloque.get('_en_rango', slice(None))
+            simulado = simulado[en_rango]
+            suma_sim += float(simulado.sum())
+            suma_base += float(bloque['Caudal_IA'][en_rango].sum(dtype=float))
+            suma_inercia += float(bloque['Inercia_3meses'][en_rango].sum(dtype=float))
+            criticos += int(np.count_nonzero(simulado < UMBRAL_CRISIS))
+            n += len(simulado)
+
+        promedio = suma_sim / n if n else np.nan
+        promedio_base = suma_base / n if n else np.nan
+        variacion = ((promedio - promedio_base) / promedio_base) * 100
+        return kpis_estado(promedio, variacion, suma_inercia / n if n else np.nan, criticos)
+
+    def simular_a_store(self, config, destino):
+        """Escribe la simulación como almacén gold en `destino`, bloque a bloque (anexando)"""
+        filas, primero = 0, True
+        for df in self.iter_simulacion(config):
+            if primero:
+                write_gold_store(df, destino)
+                primero = False
+            else:
+                append_gold_store(df, destino)
+            filas += len(df)
+        return filas
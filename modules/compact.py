@@ -0,0 +1,128 @@
+"""
+Representación compacta de la serie gold y vistas de simulación sin copia.
+
+TablaCompacta guarda las columnas una sola vez por motor: hidrología en float32, Mes en uint8 y la
+fecha como índice de mes (int32, meses desde 1970-01). run_simulation devuelve una SimulationView:
+desplazamientos [lo, hi) sobre la tabla y un Caudal_Simulado que se calcula la primera vez que se pide.
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNA_INDICE = 'Indice_Mes'
+# Unidad de las fechas decodificadas: en segundos caben los rangos de los benchmarks (10^7 meses)
+UNIDAD_FECHA = "datetime64[s]"
+
+
+def indice_mes(fechas):
+    """Fechas -> meses desde 1970-01 (int32)"""
+    return np.asarray(fechas).astype("datetime64[M]").astype(np.int32)
+
+
+def fechas_de_indice(indice):
+    """Meses desde 1970-01 -> primer día de cada mes"""
+    return np.asarray(indice).astype("datetime64[M]").astype(UNIDAD_FECHA)
+
+
+class TablaCompacta:
+    """Columnas de solo lectura de una serie mensual en tipos compactos"""
+    def __init__(self, df, orden=None):
+        self.columnas = {}
+        for nombre in df.columns:
+            valores = df[nombre].to_numpy()
+            if nombre == 'Fecha':
+                nombre, valores = COLUMNA_INDICE, indice_mes(valores)
+            elif nombre == 'Mes':
+                valores = valores.astype(np.uint8)
+            elif valores.dtype.kind == 'f':
+                valores = valores.astype(np.float32)
+            if orden is not None:
+                valores = valores[orden]
+            valores.flags.writeable = False # las vistas comparten estos arreglos entre sesiones
+            self.columnas[nombre] = valores
+
+    def __len__(self):
+        return len(self.columnas[COLUMNA_INDICE])
+
+    def __getitem__(self, nombre):
+        return self.columnas[nombre]
+
+    @property
+    def nbytes(self):
+        return sum(v.nbytes for v in self.columnas.values())
+
+    def vista(self, lo, hi, simular):
+        return SimulationView(self, lo, hi, simular)
+
+
+class SimulationView:
+    """
+    Resultado de una simulación: filas [lo, hi) de la tabla compacta (rebanadas, sin copia)
+    y Caudal_Simulado perezoso, calculado por `simular()` al primer acceso y guardado en float32.
+    """
+    def __init__(self, tabla, lo, hi, simular):
+        self.tabla = tabla
+        self.lo, self.hi = int(lo), int(hi)
+        self._simular = simular
+        self._simulado = None
+        self._rebanadas = {}
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def columns(self):
+        nombres = [c for c in self.tabla.columnas if c != COLUMNA_INDICE]
+        return ['Fecha', *nombres, 'Caudal_Simulado']
+
+    def __contains__(self, nombre):
+        return nombre in self.columns
+
+    @property
+    def caudal_simulado(self):
+        if self._simulado is None:
+            simulado = np.asarray(self._simular(), dtype=np.float32)
+            simulado.flags.writeable = False
+            self._simulado = simulado
+        return self._simulado
+
+    @property
+    def fechas(self):
+        """Fechas decodificadas del índice de mes (se generan en cada llamada, no se guardan)"""
+        return fechas_de_indice(self.tabla[COLUMNA_INDICE][self.lo:self.hi])
+
+    def arreglo(self, nombre):
+        """Arreglo NumPy de una columna: rebanada de la tabla, fechas decodificadas o la simulación"""
+        if nombre == 'Caudal_Simulado':
+            return self.caudal_simulado
+        if nombre == 'Fecha':
+            return self.fechas
+        if nombre not in self._rebanadas:
+            # Mismo objeto en cada llamada: la caché por identidad de modules/features.py lo reconoce
+            self._rebanadas[nombre] = self.tabla[nombre][self.lo:self.hi]
+        return self._rebanadas[nombre]
+
+    @property
+    def nbytes(self):
+        """Memoria propia de la vista: solo la simulación, si ya se calculó"""
+        return 0 if self._simulado is None else self._simulado.nbytes
+
+    # --- Compatibilidad con el DataFrame (exportación, núcleo económico, MOPE) ---
+    def __getitem__(self, nombre):
+        if isinstance(nombre, list):
+            return self.to_frame(nombre)
+        return pd.Series(self.arreglo(nombre), name=nombre, copy=False)
+
+    def to_frame(self, columnas=None):
+        """DataFrame materializado (copia): para exportar en la CLI o el servicio HTTP"""
+        return pd.DataFrame({c: self.arreglo(c) for c in (columnas or self.columns)})
+
+
+def columna(datos, nombre):
+    """Arreglo de una columna de una SimulationView (sin copia) o de un DataFrame"""
+    if isinstance(datos, SimulationView):
+        return datos.arreglo(nombre)
+    return datos[nombre].to_numpy()
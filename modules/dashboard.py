@@ -2,6 +2,14 @@ import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
+import numpy as np
+from modules.decimation import Decimador, tipo_traza, UMBRAL_WEBGL
+from modules.compact import columna
+from modules.events import resumen, tabla_presentacion
+from modules.tracing import traced
+
+# Índices diezmados compartidos entre reruns (por rango y columna)
+DECIMADOR = Decimador()
 
 class DashboardUI:
     def render_header(self):
@@ -11,6 +19,7 @@ class DashboardUI:
         st.markdown("**Proyecto de Resiliencia para las Cuencas Yaque del Norte y Ozama (INDRHI / BM)**")
         st.markdown("---")
 
+    @traced()
     def render_kpis(self, kpis):
         st.subheader("📊 Indicadores Clave de Desempeño")
         c1, c2, c3, c4 = st.columns(4)
@@ -19,79 +28,156 @@ class DashboardUI:
         c3.metric("Meses Críticos", f"{kpis['meses_criticos']}", delta=-kpis['meses_criticos'], delta_color="inverse")
         c4.metric("Estado", kpis['estado_texto'], kpis['estado_icono'])
 
-    def render_main_chart(self, df_view, config):
+    @traced()
+    def render_ensemble_kpis(self, ensemble):
+        c1, c2, c3 = st.columns(3)
+        p5, p95 = ensemble['promedio_p5_p95']
+        c1.metric("Probabilidad de Crisis", f"{ensemble['prob_crisis'] * 100:.1f}%")
+        c2.metric("Caudal Promedio (P5–P95)", f"{p5:.1f} – {p95:.1f} m³/s")
+        c3.metric("Meses Críticos (P50 / P95)", f"{ensemble['meses_criticos_p50']:.0f} / {ensemble['meses_criticos_p95']:.0f}")
+        st.caption(f"🎲 Ensamble de {ensemble['miembros']:,} realizaciones climáticas × árboles del Random Forest.")
+
+    @traced()
+    def render_eventos(self, eventos):
+        """Eventos de sequía e inundación (rachas bajo/sobre cada umbral) en lugar de un conteo de meses"""
+        st.markdown("### 🏜️ Eventos de Sequía e Inundación")
+        if eventos is None or eventos.empty:
+            st.success("Sin eventos bajo los umbrales MOPE ni sobre el P90 en el periodo.")
+            return
+        por_umbral = resumen(eventos).set_index("umbral")
+        cols = st.columns(len(por_umbral))
+        for col, (umbral, fila) in zip(cols, por_umbral.iterrows()):
+            col.metric(f"Eventos {umbral}", f"{int(fila['eventos'])}",
+                       f"máx. {int(fila['duracion_max'])} meses · {fila['deficit_max']:.0f} m³/s·mes", delta_color="off")
+        st.dataframe(tabla_presentacion(eventos), hide_index=True, use_container_width=True)
+        st.caption("Déficit (sequía) o exceso (inundación) acumulado respecto al umbral durante el evento. "
+                   "Retorno: periodo empírico de Weibull, (años + 1) / rango del evento en su umbral.")
+
+    @traced()
+    def render_main_chart(self, df_view, config, ensemble=None, fig=None, clave=None):
         st.markdown("### 📈 Auditoría y Simulación")
+        # La figura puede venir de la caché de escenarios (modules/cache.py)
+        if fig is None:
+            fig = self.figura_principal(df_view, config, ensemble, clave)
+        st.plotly_chart(fig, use_container_width=True)
+
+    @traced()
+    def figura_principal(self, df_view, config, ensemble=None, clave=None):
+        """Serie base, simulada, real y bandas del ensamble (diezmadas y en WebGL si son largas)"""
         fig = go.Figure()
-        
-        # IA Base (Azul)
-        fig.add_trace(go.Scatter(x=df_view['Fecha'], y=df_view['Caudal_IA'], name='Línea Base (IA)', line=dict(color='#005da4', width=2)))
+        # SimulationView: rebanadas de la tabla compacta, sin copia (también admite un DataFrame)
+        fechas = columna(df_view, 'Fecha')
+        caudal_ia = columna(df_view, 'Caudal_IA')
+
+        # Banda de incertidumbre del ensamble (P5–P95) y mediana; se conservan los bordes de la envolvente
+        if ensemble is not None:
+            bandas = ensemble['bandas']
+            idx = np.union1d(DECIMADOR.indices(ensemble['fechas'], bandas['P95'].to_numpy()),
+                             DECIMADOR.indices(ensemble['fechas'], bandas['P5'].to_numpy()))
+            Traza, x = tipo_traza(len(idx)), ensemble['fechas'][idx]
+            fig.add_trace(Traza(x=x, y=bandas['P95'].to_numpy()[idx], line=dict(width=0), showlegend=False, hoverinfo='skip'))
+            fig.add_trace(Traza(x=x, y=bandas['P5'].to_numpy()[idx], fill='tonexty', fillcolor='rgba(255,153,0,0.2)', line=dict(width=0), name='Ensamble P5–P95'))
+            fig.add_trace(Traza(x=x, y=bandas['P50'].to_numpy()[idx], name='Ensamble P50', line=dict(color='#ff9900', width=1)))
+
+        # IA Base (Azul); los índices diezmados dependen solo del rango y se cachean
+        idx_ia = DECIMADOR.indices(fechas, caudal_ia, None if clave is None else (clave, 'Caudal_IA'))
+        fig.add_trace(tipo_traza(len(idx_ia))(x=fechas[idx_ia], y=caudal_ia[idx_ia], name='Línea Base (IA)', line=dict(color='#005da4', width=2)))
         
         # Simulación (Naranja - Solo si hay cambios)
         if config["delta_lluvia"] != 0 or config["delta_temp"] != 0:
-            fig.add_trace(go.Scatter(x=df_view['Fecha'], y=df_view['Caudal_Simulado'], name='Simulación', line=dict(color='#ff9900', width=2, dash='dash')))
+            simulado = columna(df_view, 'Caudal_Simulado')
+            # Con factores físicos la simulación es la base escalada: mismos picos y mínimos
+            idx_sim = idx_ia if config.get("motor", "factores") == "factores" else DECIMADOR.indices(fechas, simulado)
+            fig.add_trace(tipo_traza(len(idx_sim))(x=fechas[idx_sim], y=simulado[idx_sim], name='Simulación', line=dict(color='#ff9900', width=2, dash='dash')))
         
         # Realidad (Rojo - Puntos)
-        df_real = df_view.dropna(subset=['Caudal_Real'])
-        if not df_real.empty:
-            fig.add_trace(go.Scatter(x=df_real['Fecha'], y=df_real['Caudal_Real'], mode='markers', name='Datos Reales', marker=dict(color='#d92b2b', size=6)))
+        real = columna(df_view, 'Caudal_Real')
+        hay_dato = ~np.isnan(real)
+        if hay_dato.any():
+            fechas_real, real = fechas[hay_dato], real[hay_dato]
+            idx_real = DECIMADOR.indices(fechas_real, real, None if clave is None else (clave, 'Caudal_Real'))
+            fig.add_trace(tipo_traza(len(idx_real))(x=fechas_real[idx_real], y=real[idx_real], mode='markers', name='Datos Reales', marker=dict(color='#d92b2b', size=6)))
         
         fig.update_layout(height=400, template="plotly_white", margin=dict(l=20, r=20, t=20, b=20), legend=dict(orientation="h", y=1.1))
-        st.plotly_chart(fig, use_container_width=True)
+        return fig
 
-    def render_geo_xai(self, df_view, kpis):
-        """Monitor Territorial Avanzado con Mapa de Riesgo"""
-        promedio = kpis['promedio']
+    @traced()
+    def render_geo_xai(self, df_view, kpis, estaciones=None, figuras=None):
+        """Monitor Territorial Avanzado con Mapa de Riesgo (caudal simulado por estación)"""
         estado = kpis['estado_texto']
+        figuras = figuras or {}
         
         c1, c2 = st.columns(2)
         
         with c1:
             st.markdown("### 📍 Monitor de Riesgo en Cuencas")
-            
-            # Lógica de Semáforo Visual
-            if "CRISIS" in estado:
-                scale_name = "Reds" # Mapa Rojo
-            elif "ALERTA" in estado:
-                scale_name = "Oranges" # Mapa Naranja
-            else:
-                scale_name = "Blues" # Mapa Azul
-
-            # Datos Simulados de Estaciones
-            map_data = pd.DataFrame({
-                'lat': [19.7642, 19.4517, 18.5912, 19.15],
-                'lon': [-71.5625, -70.6928, -69.9715, -69.82],
-                'Estacion': ['Palo Verde (Bajo Yaque)', 'Santiago (Tavera)', 'Ozama (Santo Domingo)', 'Yuna (Bonao)'],
-                'Caudal': [promedio, promedio * 1.2, promedio * 0.9, promedio * 1.5],
-                'Estado': [estado] * 4
-            })
-
-            # Mapa Interactivo (Plotly Mapbox)
-            fig_map = px.scatter_mapbox(
-                map_data, 
-                lat="lat", lon="lon",
-                size="Caudal", 
-                color="Caudal",
-                color_continuous_scale=scale_name,
-                size_max=25, 
-                zoom=7,
-                hover_name="Estacion",
-                mapbox_style="carto-positron"
-            )
-            
-            fig_map.update_layout(height=350, margin={"r":0,"t":0,"l":0,"b":0}, coloraxis_showscale=False)
+            fig_map = figuras["mapa"] if "mapa" in figuras else self.figura_mapa(kpis, estaciones)
             st.plotly_chart(fig_map, use_container_width=True)
             st.caption(f"🔵 Estaciones Hidrométricas Activas. Estado Actual: **{estado}**")
         
         with c2:
             st.markdown("### 🧠 Explicabilidad Física (XAI)")
-            fig = px.scatter(
-                df_view, 
-                x='Inercia_3meses', 
-                y='Caudal_Simulado', 
-                color='Mes', 
-                title="Evidencia: Relación Inercia vs Caudal", 
-                color_continuous_scale='Blues',
-                labels={'Inercia_3meses': 'Inercia Hídrica (mm)', 'Caudal_Simulado': 'Caudal (m³/s)'}
-            )
-            fig.update_layout(height=350)
-            st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+            fig = figuras["xai"] if "xai" in figuras else self.figura_xai(df_view)
+            st.plotly_chart(fig, use_container_width=True)
+
+    @traced()
+    def figura_mapa(self, kpis, estaciones=None):
+        """Mapa de riesgo coloreado según el estado MOPE"""
+        promedio = kpis['promedio']
+        estado = kpis['estado_texto']
+        # Lógica de Semáforo Visual
+        # Código MOPE: 2 = Crisis, 1 = Alerta, 0 = Normalidad
+        scale_name = ("Blues", "Oranges", "Reds")[kpis.get('codigo_estado') or 0]
+
+        # Datos reales por estación (MultiStationEngine); si no hay, solo la serie principal
+        if estaciones is not None:
+            # Estaciones sin datos en el rango (promedio NaN) no se dibujan
+            estaciones = estaciones.dropna(subset=['promedio'])
+        if estaciones is not None and not estaciones.empty:
+            map_data = pd.DataFrame({
+                'lat': estaciones['lat'],
+                'lon': estaciones['lon'],
+                'Estacion': estaciones['Estacion'].str.title() + " (" + estaciones['Rio'].str.title() + ")",
+                'Caudal': estaciones['promedio'].round(1),
+                'Estado': estaciones['estado_texto']
+            })
+        else:
+            map_data = pd.DataFrame({
+                'lat': [19.7642],
+                'lon': [-71.5625],
+                'Estacion': ['Palo Verde (Bajo Yaque)'],
+                'Caudal': [promedio],
+                'Estado': [estado]
+            })
+
+        # Mapa Interactivo (Plotly Mapbox)
+        fig_map = px.scatter_mapbox(
+            map_data, 
+            lat="lat", lon="lon",
+            size="Caudal", 
+            color="Caudal",
+            color_continuous_scale=scale_name,
+            size_max=25, 
+            zoom=7,
+            hover_name="Estacion",
+            hover_data={"Estado": True, "lat": False, "lon": False},
+            mapbox_style="carto-positron"
+        )
+        
+        fig_map.update_layout(height=350, margin={"r":0,"t":0,"l":0,"b":0}, coloraxis_showscale=False)
+        return fig_map
+
+    @traced()
+    def figura_xai(self, df_view):
+        """Dispersión Inercia vs Caudal simulado"""
+        fig = px.scatter(
+            x=columna(df_view, 'Inercia_3meses'), 
+            y=columna(df_view, 'Caudal_Simulado'), 
+            color=columna(df_view, 'Mes'), 
+            title="Evidencia: Relación Inercia vs Caudal", 
+            color_continuous_scale='Blues',
+            labels={'x': 'Inercia Hídrica (mm)', 'y': 'Caudal (m³/s)', 'color': 'Mes'},
+            render_mode='webgl' if len(df_view) > UMBRAL_WEBGL else 'svg'
+        )
+        fig.update_layout(height=350)
+        return fig
\ No newline at end of file
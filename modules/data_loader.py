@@ -1,22 +1,80 @@
 import streamlit as st
-import pandas as pd
 import os
+from core.data import (CSV_PATH, STORE_PATH, STATIONS_PATH, STATIONS_META_PATH,
+                       tiene_store, leer_csv, columnas_estaciones, version_gold)
+from modules.gold_store import read_gold_store
+from modules.model import ModelRegistry, REGISTRO_DIR, ruta_modelo_activo, cargar_modelo, firma_artefacto
+
+
+@st.cache_resource
+def _cargar_store(ruta, columnas, version=None):
+    """Memory-map compartido entre sesiones (solo lectura, sin parseo); una entrada por versión del dataset"""
+    return read_gold_store(ruta, columnas=list(columnas) if columnas else None)
+
+
+@st.cache_data
+def _cargar_csv(ruta, columnas, version=None):
+    return leer_csv(ruta, columnas)
+
+
+@st.cache_data
+def _cargar_meta(ruta, version=None):
+    return leer_csv(ruta)
+
 
 class DataLoader:
-    def __init__(self):
-        # rutas
-        self.relative_path = os.path.join("data", "gold", "app_data_70years.csv")
-        self.absolute_path = r"C:\Users\bourd\source\repos\RH-PARGIRH-CORE\data\gold\app_data_70years.csv"
-
-    @st.cache_data
-    def load_data(_self):
-        """Carga y cachea los datos. El _self es un truco de Streamlit para el cache."""
-        if os.path.exists(_self.relative_path):
-            df = pd.read_csv(_self.relative_path)
-        elif os.path.exists(_self.absolute_path):
-            df = pd.read_csv(_self.absolute_path)
-        else:
-            return None
-            
-        df['Fecha'] = pd.to_datetime(df['Fecha'])
-        return df
\ No newline at end of file
+    """Envoltura con caché de Streamlit sobre core.data (la versión sin interfaz)"""
+    def __init__(self, formato="auto", columnas=None):
+        # rutas (relativas al repositorio, no al directorio de trabajo)
+        self.csv_path = CSV_PATH
+        self.store_path = STORE_PATH
+        self.stations_path = STATIONS_PATH
+        self.stations_meta_path = STATIONS_META_PATH
+        self.registry_path = REGISTRO_DIR
+        # formato: "auto" (almacén columnar si existe), "npy" o "csv"
+        self.formato = formato
+        self.columnas = tuple(columnas) if columnas else None
+
+    def version(self):
+        """Versión del dataset gold (sube con cada build o update del pipeline)"""
+        return version_gold(self.formato, self.store_path, self.csv_path)
+
+    def load_data(self):
+        """Carga y cachea los datos: memory-map del almacén columnar o CSV como respaldo."""
+        # La versión entra en la clave: tras un update se abre el almacén nuevo y no el mapa anterior
+        if self.formato in ("auto", "npy") and tiene_store(self.store_path):
+            return _cargar_store(self.store_path, self.columnas, self.version())
+        if self.formato in ("auto", "csv") and os.path.exists(self.csv_path):
+            return _cargar_csv(self.csv_path, self.columnas, self.version())
+        return None
+
+    def version_modelo(self):
+        """Clave del modelo activo del registro o, con el artefacto del pipeline, su fecha de modificación"""
+        registro = ModelRegistry(self.registry_path)
+        clave = registro.clave_activa()
+        if clave:
+            return clave
+        firma = firma_artefacto(ruta_modelo_activo(registro))
+        return f"pipeline-{firma[1]}" if firma else "sin-modelo"
+
+    def load_model(self):
+        """Modelo activo del registro (o el del pipeline) y sus métricas de validación cruzada (None sin registro)"""
+        registro = ModelRegistry(self.registry_path)
+        clave = registro.clave_activa()
+        metricas = registro.metricas(clave) if clave else None
+        # cargar_modelo cachea por ruta y versión del archivo: un modelo activado o reconstruido se carga en el siguiente rerun
+        return cargar_modelo(ruta_modelo_activo(registro)), metricas
+
+    def version_estaciones(self):
+        """Versión del almacén multi-estación (None si no se ha construido)"""
+        return version_gold("npy", self.stations_path)
+
+    def load_stations(self):
+        """Dataset multi-estación (grdc_no, Fecha, ...) y metadatos; (None, None) si no se ha construido."""
+        if not tiene_store(self.stations_path):
+            return None, None
+        # Misma regla que load_data: un almacén reconstruido (aunque tenga las mismas filas) se vuelve a abrir
+        version = self.version_estaciones()
+        df = _cargar_store(self.stations_path, columnas_estaciones(self.columnas), version)
+        meta = _cargar_meta(self.stations_meta_path, version) if os.path.exists(self.stations_meta_path) else None
+        return df, meta
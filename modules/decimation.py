@@ -0,0 +1,89 @@
+"""
+Diezmado de series largas para los gráficos: min-max por columna de píxel y LTTB
+(Largest-Triangle-Three-Buckets). Ambos métodos conservan los picos y los mínimos de sequía;
+por encima de un umbral de puntos las trazas pasan a WebGL (Scattergl).
+"""
+import numpy as np
+import plotly.graph_objects as go
+
+from modules.cache import ResultCache
+
+ANCHO_GRAFICO = 1200 # píxeles de referencia del gráfico principal
+UMBRAL_WEBGL = 1000  # puntos por traza a partir de los cuales se usa Scattergl
+
+
+def _a_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def minmax_indices(y, n_buckets):
+    """Primero, último, mínimo y máximo de cada bucket (índices ordenados, sin repetir)"""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= 4 * n_buckets:
+        return np.arange(n)
+    bucket = (np.arange(n) * n_buckets) // n
+    # Orden (bucket, y): el primero de cada bucket es su mínimo y el último su máximo
+    orden = np.lexsort((y, bucket))
+    cortes = np.flatnonzero(np.diff(bucket[orden])) + 1
+    inicios = np.r_[0, cortes]
+    finales = np.r_[cortes - 1, n - 1]
+    bordes = np.flatnonzero(np.diff(bucket)) + 1
+    return np.unique(np.concatenate([orden[inicios], orden[finales], [0, n - 1], bordes, bordes - 1]))
+
+
+def lttb_indices(x, y, n_out, preservar_extremos=True):
+    """Largest-Triangle-Three-Buckets; opcionalmente fuerza el mínimo y el máximo globales"""
+    x, y = _a_float(x), np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    limites = np.linspace(1, n - 1, n_out - 1).astype(np.int64) # n_out - 2 buckets interiores
+    elegidos = np.empty(n_out, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = limites[i], max(limites[i + 1], limites[i] + 1)
+        # Punto medio del bucket siguiente (o el último punto)
+        sig_lo, sig_hi = hi, (limites[i + 2] if i + 2 < len(limites) else n)
+        sig_hi = max(sig_hi, sig_lo + 1)
+        cx, cy = x[sig_lo:sig_hi].mean(), y[sig_lo:sig_hi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        elegidos[i + 1] = a
+    if preservar_extremos:
+        elegidos = np.concatenate([elegidos, [np.nanargmin(y), np.nanargmax(y)]])
+    return np.unique(elegidos)
+
+
+def decimar_indices(x, y, ancho_px=ANCHO_GRAFICO, metodo="minmax"):
+    """Índices a dibujar para un ancho en píxeles (≈ 2 puntos por píxel)"""
+    if len(y) <= 2 * ancho_px:
+        return np.arange(len(y))
+    if metodo == "lttb":
+        return lttb_indices(x, y, 2 * ancho_px)
+    return minmax_indices(y, ancho_px // 2)
+
+
+def tipo_traza(n_puntos, umbral=UMBRAL_WEBGL):
+    """go.Scattergl por encima del umbral, go.Scatter (SVG) por debajo"""
+    return go.Scattergl if n_puntos > umbral else go.Scatter
+
+
+class Decimador:
+    """Índices diezmados cacheados por (clave de rango, columna, ancho)"""
+    def __init__(self, ancho_px=ANCHO_GRAFICO, metodo="minmax", maxsize=128):
+        self.ancho_px = ancho_px
+        self.metodo = metodo
+        self.cache = ResultCache(maxsize=maxsize)
+
+    def indices(self, x, y, clave=None):
+        if clave is None:
+            return decimar_indices(x, y, self.ancho_px, self.metodo)
+        return self.cache.get_or_compute(
+            (clave, self.ancho_px, self.metodo),
+            lambda: decimar_indices(x, y, self.ancho_px, self.metodo),
+        )
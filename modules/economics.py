@@ -1,56 +1,29 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from core.economics import EconomicCore
+from modules.compact import columna
+from modules.features import deficit_acumulado
+from modules.tracing import traced
 
-class EconomicModule:
-    def __init__(self):
-        # Configuración por defecto de cultivos
-        self.cultivos_default = {
-            'Arroz': {'s': 4500, 'i': 2000},
-            'Banano': {'s': 2500, 'i': 3500},
-            'Aguacate': {'s': 1800, 'i': 5000}
-        }
-
-    def get_dummy_data(self):
-        # Genera datos simulados solo para este módulo
-        dates = pd.date_range(start='2020-01-01', periods=60, freq='ME')
-        np.random.seed(42)
-        pr = np.random.gamma(shape=2, scale=30, size=len(dates))
-        pr[-10:] = pr[-10:] * 0.1 # Simular sequía al final
-        tmax = np.random.normal(30, 2, size=len(dates))
-        return pd.DataFrame({'Fecha': dates, 'pr': pr, 'TMAX': tmax})
-
-    def calcular_perdidas(self, df, costos):
-        df_sim = df.copy()
-        
-        # 1. Lógica Hidrológica Simplificada
-        df_sim['Recarga_pr'] = df_sim['pr'].rolling(3).mean().shift(1).fillna(0)
-        df_sim['Agotamiento'] = df_sim['TMAX'] * 1.5
-        df_sim['Caudal_Logico'] = df_sim['Recarga_pr'] - df_sim['Agotamiento']
-        
-        # 2. Umbrales Dinámicos
-        p10 = df_sim['Caudal_Logico'].quantile(0.10)
-        p90 = df_sim['Caudal_Logico'].quantile(0.90)
-        
-        # 3. Severidad
-        df_sim['Severidad_Sequia'] = np.where(df_sim['Caudal_Logico'] < p10, abs(df_sim['Caudal_Logico'] - p10), 0)
-        df_sim['Severidad_Inundacion'] = np.where(df_sim['Caudal_Logico'] > p90, abs(df_sim['Caudal_Logico'] - p90), 0)
-        
-        # 4. Cálculo Económico
-        for cult, params in costos.items():
-            perdida = (df_sim['Severidad_Sequia'] * params['Sequia']) + \
-                      (df_sim['Severidad_Inundacion'] * params['Inundacion'])
-            df_sim[f'Perdida_{cult}'] = perdida
-            
-        return df_sim, p10, p90
-
-    def render(self):
+
+@st.cache_data(max_entries=64)
+def _severidades_escenario(clave, _caudales, _p10, _p90):
+    """Severidades (E × N × 2) cacheadas por escenario; la clave identifica rango, deltas y umbrales"""
+    return EconomicModule.severidades(_caudales, _p10, _p90)
+
+
+class EconomicModule(EconomicCore):
+    """Pestaña de Streamlit sobre el núcleo económico (core/economics.py)"""
+
+    @traced()
+    def render(self, df_simulated, config, firma=None):
         st.subheader("🌾 Estimación de Impacto Agrícola (Modelo FAO 33)")
         st.markdown("---")
-        
+
         # --- A. CONTROLES (Dentro de la pestaña, para no ensuciar el Sidebar principal) ---
         col_controls, col_graphs = st.columns([1, 3])
-        
+
         costos_config = {}
         with col_controls:
             st.info("⚙️ **Calibración de Costos (DOP)**")
@@ -59,30 +32,52 @@ class EconomicModule:
                     s = st.slider(f"Sequía", 0, 10000, vals['s'], key=f"s_{cult}_eco")
                     i = st.slider(f"Inundación", 0, 10000, vals['i'], key=f"i_{cult}_eco")
                     costos_config[cult] = {'Sequia': s, 'Inundacion': i}
-        
+            estacional = st.toggle("Umbrales por mes calendario", value=False, key="umbral_estacional_eco")
+
         # --- B. CÁLCULOS ---
-        df = self.get_dummy_data() # Usamos data simulada segura
-        df_final, p10, p90 = self.calcular_perdidas(df, costos_config)
-        
+        # Escenarios: línea base (E=0) y simulación (E=1). Las severidades solo cambian con el escenario;
+        # mover los costos rehace únicamente el producto lineal.
+        base, simulado = columna(df_simulated, 'Caudal_IA'), columna(df_simulated, 'Caudal_Simulado')
+        caudales = np.vstack([base, simulado]).astype(float)
+        p10, p90 = self.obtener_umbrales(df_simulated, estacional)
+        # `firma` (versión del gold + modelo activo): la caché es compartida entre sesiones y un update o
+        # un modelo nuevo cambian caudales y umbrales con el mismo rango
+        clave = (firma, tuple(config["rango"]), config["delta_lluvia"], config["delta_temp"], config.get("motor", "factores"), len(base), estacional)
+        S = _severidades_escenario(clave, caudales, p10, p90)
+
+        nombres, C = self.matriz_costos(costos_config)
+        totales = S.sum(axis=1) @ C # (E × K)
+        fechas = columna(df_simulated, 'Fecha')
+        perdidas_sim = pd.DataFrame(self.perdidas(S[1], C), columns=nombres, index=fechas)
+        # Déficit acumulado bajo P10 de ambas series en una pasada (sin caché: p10 estacional es nuevo en cada rerun)
+        deficit = deficit_acumulado([base, simulado], p10)
+
         # --- C. VISUALIZACIÓN ---
         with col_graphs:
             # KPI Principal
-            cols_perdida = [c for c in df_final.columns if 'Perdida_' in c]
-            total_perdida = df_final[cols_perdida].sum().sum()
-            
+            total_perdida = totales[1].sum()
+
             c1, c2, c3 = st.columns(3)
-            c1.metric("Pérdida Total Estimada", f"RD$ {total_perdida:,.0f}")
-            c2.metric("Umbral Sequía (P10)", f"{p10:.1f}")
-            c3.metric("Umbral Inundación (P90)", f"{p90:.1f}")
-            
+            c1.metric("Pérdida Total Estimada", f"RD$ {total_perdida:,.0f}", f"RD$ {total_perdida - totales[0].sum():,.0f} vs. base", delta_color="inverse")
+            c2.metric("Umbral Sequía (P10)", f"{np.mean(p10):.1f} m³/s")
+            c3.metric("Umbral Inundación (P90)", f"{np.mean(p90):.1f} m³/s")
+
             # Gráficas
-            tab_g1, tab_g2 = st.tabs(["📉 Dinero Perdido", "💧 Caudal Lógico"])
-            
+            tab_g1, tab_g2, tab_g3 = st.tabs(["📉 Dinero Perdido", "💧 Caudal Simulado", "🏜️ Déficit Acumulado"])
+
             with tab_g1:
-                st.bar_chart(df_final.set_index('Fecha')[cols_perdida])
-                
+                st.bar_chart(perdidas_sim)
+
             with tab_g2:
-                st.line_chart(df_final.set_index('Fecha')['Caudal_Logico'])
-                
+                st.line_chart(pd.DataFrame({'Línea Base': caudales[0], 'Simulado': caudales[1]}, index=fechas))
+
+            with tab_g3:
+                st.line_chart(pd.DataFrame({'Línea Base': deficit[0], 'Simulado': deficit[1]}, index=fechas))
+                st.caption("Suma de los faltantes bajo el umbral P10 (m³/s·mes); vuelve a cero cuando el caudal lo supera.")
+
             with st.expander("Ver Datos Detallados"):
-                st.dataframe(df_final.tail(10))
\ No newline at end of file
+                st.dataframe(pd.DataFrame({
+                    'Cultivo': nombres,
+                    'Pérdida Base (RD$)': totales[0],
+                    'Pérdida Escenario (RD$)': totales[1],
+                }).round(0), hide_index=True)
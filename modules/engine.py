@@ -1,50 +1,187 @@
+import warnings
+import numpy as np
 import pandas as pd
+from modules.year_index import YearIndex
+from modules.compact import TablaCompacta, columna
+from modules.model import ModelSimulator
+from modules.rules import MOPE, UMBRAL_CRISIS
+from modules.events import eventos as tabla_eventos
+
+# Estados en orden de código (tabla MOPE): 0 = Normalidad, 1 = Alerta, 2 = Crisis
+ESTADOS = tuple((r["estado"], r["icono"], r["color_kpi"]) for _, r in sorted(MOPE.reglas.items()))
+
+# Rango sin caudales válidos: no se clasifica (codigo_estado = None)
+SIN_DATOS = ("SIN DATOS", "⚪", "off")
+
+# Orden de la última dimensión del cubo de escenarios
+KPIS_BATCH = ("promedio", "variacion", "inercia", "meses_criticos", "estado")
+
+
+def codigo_estado(promedio):
+    """Convierte uno o muchos caudales promedio en el código de estado (0, 1, 2)"""
+    return MOPE.clasificar(promedio)
+
+
+def kpis_estado(promedio, variacion, inercia, meses_criticos):
+    """Diccionario de KPIs; sin caudales válidos (promedio NaN) el estado es "SIN DATOS", no Normalidad"""
+    if np.isnan(promedio):
+        codigo, estado = None, SIN_DATOS
+    else:
+        # Lógica de Estado
+        codigo = int(codigo_estado(promedio))
+        estado = ESTADOS[codigo]
+
+    return {
+        "promedio": promedio,
+        "caudal_promedio": promedio,
+        "variacion": variacion,
+        "inercia": inercia,
+        "meses_criticos": meses_criticos,
+        "codigo_estado": codigo,
+        "estado_texto": estado[0],
+        "estado_icono": estado[1],
+        "color_kpi": estado[2]
+    }
+
 
 class HydrologyEngine:
-    def __init__(self, df):
+    def __init__(self, df, modelo=None):
+        # Serie en orden cronológico (orden estable, una sola vez): los rangos del índice son rebanadas
+        # contiguas y el simulador IA trabaja sobre las mismas filas
+        if not df['Fecha'].is_monotonic_increasing:
+            df = df.sort_values('Fecha', kind='stable').reset_index(drop=True)
         self.df = df
+        self._index = None
+        self._compacto = None
+        # Simulador con el Random Forest en el lazo (opcional)
+        self.simulador = ModelSimulator(df, modelo) if modelo is not None else None
+
+    @property
+    def index(self):
+        """Índice por año, construido una sola vez por motor"""
+        if self._index is None:
+            self._index = YearIndex(self.df)
+        return self._index
+
+    @property
+    def compacto(self):
+        """Tabla compacta (float32, uint8, índice de mes) ordenada por año: los rangos son rebanadas"""
+        if self._compacto is None:
+            self._compacto = TablaCompacta(self.df, None if self.index.contiguo else self.index.orden)
+        return self._compacto
+
+    @staticmethod
+    def factores(delta_lluvia, delta_temp):
+        """Factor físico combinado (admite escalares o arreglos difundibles)"""
+        factor_lluvia = 1 + (np.asarray(delta_lluvia, dtype=float) / 100)
+        factor_temp = 1 - (np.asarray(delta_temp, dtype=float) * 0.05) # Hipótesis: +1°C = -5% caudal
+        return factor_lluvia * factor_temp
 
     def run_simulation(self, config):
-        """Ejecuta la simulación física basada en los inputs del usuario"""
+        """Ejecuta la simulación física basada en los inputs del usuario (SimulationView, sin copiar la serie)"""
         start_year, end_year = config["rango"]
         delta_lluvia = config["delta_lluvia"]
         delta_temp = config["delta_temp"]
 
-        # 1. Filtrar
-        df_view = self.df[(self.df['Fecha'].dt.year >= start_year) & (self.df['Fecha'].dt.year <= end_year)].copy()
+        # 1. Filtrar: desplazamientos del rango sobre la tabla compacta (ordenada por año)
+        lo, hi = (int(i[0]) for i in self.index.filas([(start_year, end_year)]))
+        tabla = self.compacto
+
+        # Motor IA: el Random Forest re-evalúa las variables perturbadas (sin recurrir a factores en silencio)
+        if config.get("motor") == "ia":
+            if self.simulador is None:
+                raise ValueError("Motor 'ia' solicitado sin modelo cargado")
+            if not self.index.contiguo:
+                raise ValueError("Motor 'ia' requiere una serie con fechas válidas en orden cronológico")
+            simulador = self.simulador
+            return tabla.vista(lo, hi, lambda: simulador.simular(lo, hi, delta_lluvia, delta_temp))
 
         # 2. Calcular Factores Físicos
         factor_lluvia = 1 + (delta_lluvia / 100)
         factor_temp = 1 - (delta_temp * 0.05) # Hipótesis: +1°C = -5% caudal
-        
-        # 3. Generar Columna Simulada
-        df_view['Caudal_Simulado'] = df_view['Caudal_IA'] * factor_lluvia * factor_temp
-        
-        return df_view
+
+        # 3. Columna simulada, calculada al primer acceso
+        factor = factor_lluvia * factor_temp
+        return tabla.vista(lo, hi, lambda: np.multiply(tabla['Caudal_IA'][lo:hi], factor, dtype=float))
 
     def calculate_kpis(self, df_view):
-        """Calcula métricas clave para el dashboard"""
-        promedio_actual = df_view['Caudal_Simulado'].mean()
-        promedio_base = df_view['Caudal_IA'].mean()
+        """Calcula métricas clave para el dashboard (SimulationView o DataFrame)"""
+        simulado = columna(df_view, 'Caudal_Simulado')
+        with warnings.catch_warnings():
+            # Rango sin datos: las medias quedan en NaN y kpis_estado lo reporta como "SIN DATOS"
+            warnings.simplefilter("ignore", RuntimeWarning)
+            promedio_actual = float(np.nanmean(simulado, dtype=float))
+            promedio_base = float(np.nanmean(columna(df_view, 'Caudal_IA'), dtype=float))
+            inercia = float(np.nanmean(columna(df_view, 'Inercia_3meses'), dtype=float))
         variacion = ((promedio_actual - promedio_base) / promedio_base) * 100
-        inercia = df_view['Inercia_3meses'].mean()
-        meses_criticos = len(df_view[df_view['Caudal_Simulado'] < 20])
-        
-        # Lógica de Estado
-        if promedio_actual < 20:
-            estado = ("CRISIS HÍDRICA", "🔴", "inverse")
-        elif promedio_actual < 35:
-            estado = ("ALERTA PREVENTIVA", "🟡", "off")
-        else:
-            estado = ("NORMALIDAD", "🟢", "normal")
-            
-        return {
-            "promedio": promedio_actual,
-            "caudal_promedio": promedio_actual,
-            "variacion": variacion,
-            "inercia": inercia,
-            "meses_criticos": meses_criticos,
-            "estado_texto": estado[0],
-            "estado_icono": estado[1],
-            "color_kpi": estado[2]
-        }
\ No newline at end of file
+        meses_criticos = int(np.count_nonzero(simulado < UMBRAL_CRISIS))
+        return kpis_estado(promedio_actual, variacion, inercia, meses_criticos)
+
+    def eventos(self, df_view, umbrales=None):
+        """Eventos de sequía/inundación de la simulación (rachas bajo/sobre cada umbral), no solo su conteo"""
+        return tabla_eventos(columna(df_view, 'Caudal_Simulado'), umbrales, fechas=columna(df_view, 'Fecha'))
+
+    def kpis_for_range(self, config):
+        """Mismos KPIs que calculate_kpis, resueltos desde el índice sin materializar el DataFrame"""
+        if config.get("motor") == "ia":
+            # La respuesta del modelo no es un factor escalar: se calcula sobre la vista simulada
+            return self.calculate_kpis(self.run_simulation(config))
+        resultado = self.run_batch([config["rango"]], config["delta_lluvia"], config["delta_temp"])
+        return self.batch_kpis(resultado, 0, 0, 0)
+
+    def run_batch(self, rangos, deltas_lluvia, deltas_temp, incluir_series=False):
+        """
+        Evalúa una malla de escenarios (rango × lluvia × temperatura) en una sola pasada NumPy.
+        Devuelve un cubo de forma (R, L, T, len(KPIS_BATCH)) sin filtrar ni copiar el DataFrame.
+        """
+        rangos = np.asarray(rangos, dtype=int).reshape(-1, 2)
+        deltas_lluvia = np.atleast_1d(np.asarray(deltas_lluvia, dtype=float))
+        deltas_temp = np.atleast_1d(np.asarray(deltas_temp, dtype=float))
+
+        # 1. Medias base por ventana desde las sumas acumuladas del índice
+        promedio_base, inercia_media, _ = self.index.medias(rangos)
+
+        # 2. Factores físicos (L × T), misma hipótesis que run_simulation
+        factores = self.factores(deltas_lluvia[:, None], deltas_temp[None, :])
+
+        # 3. KPIs difundidos sobre (R × L × T)
+        promedio = promedio_base[:, None, None] * factores[None, :, :]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variacion = ((promedio - promedio_base[:, None, None]) / promedio_base[:, None, None]) * 100
+        # Caudal_Simulado < umbral  <=>  Caudal_IA < umbral / factor (factor > 0)
+        with np.errstate(divide="ignore"):
+            umbrales = np.where(factores > 0, UMBRAL_CRISIS / factores, np.inf)
+        meses_criticos = self.index.meses_bajo(rangos, umbrales.ravel()).reshape(promedio.shape)
+
+        cubo = np.stack([
+            promedio,
+            variacion,
+            np.broadcast_to(inercia_media[:, None, None], promedio.shape),
+            meses_criticos,
+            np.where(np.isnan(promedio), np.nan, codigo_estado(promedio)), # NaN: rango sin datos
+        ], axis=-1)
+
+        resultado = {
+            "rangos": rangos,
+            "delta_lluvia": deltas_lluvia,
+            "delta_temp": deltas_temp,
+            "kpis": KPIS_BATCH,
+            "cubo": cubo,
+        }
+        if incluir_series:
+            # Caudal_Simulado sobre toda la serie: (L × T × N)
+            caudal = self.df['Caudal_IA'].to_numpy(dtype=float)
+            resultado["caudal_simulado"] = factores[:, :, None] * caudal[None, None, :]
+        return resultado
+
+    def eventos_batch(self, resultado, umbrales=None):
+        """Eventos de todos los escenarios de run_batch(..., incluir_series=True) en una sola pasada"""
+        L, T, _ = resultado["caudal_simulado"].shape
+        series = [f"Lluvia {dl:+g}% | Temp {dt:+g}°C" for dl in resultado["delta_lluvia"] for dt in resultado["delta_temp"]]
+        return tabla_eventos(resultado["caudal_simulado"].reshape(L * T, -1), umbrales,
+                       fechas=self.df['Fecha'].to_numpy(), series=series)
+
+    def batch_kpis(self, resultado, i_rango, i_lluvia, i_temp):
+        """Extrae del cubo el diccionario de KPIs de un escenario (mismo formato que calculate_kpis)"""
+        valores = dict(zip(resultado["kpis"], resultado["cubo"][i_rango, i_lluvia, i_temp]))
+        return kpis_estado(valores["promedio"], valores["variacion"], valores["inercia"], int(valores["meses_criticos"]))
@@ -0,0 +1,80 @@
+"""
+Ensamble Monte Carlo vectorizado: realizaciones climáticas (miembros × meses) y
+dispersión del modelo mediante las predicciones de cada árbol del Random Forest.
+"""
+import numpy as np
+import pandas as pd
+
+from modules.engine import UMBRAL_CRISIS
+from modules.features import medias_moviles, anomalias_estacionales
+from modules.model import COLUMNAS_MODELO
+
+
+class EnsembleSimulator:
+    def __init__(self, df, modelo=None, dispersion=0.5, seed=42):
+        self.df = df
+        self.dispersion = dispersion
+        self.seed = seed
+        self.caudal_ia = df['Caudal_IA'].to_numpy(dtype=float)
+        pr = df['Precipitacion'].to_numpy(dtype=float)
+        tas = df['Temperatura'].to_numpy(dtype=float)
+        mes = df['Mes'].to_numpy(dtype=int)
+
+        # 1. Anomalías mensuales respecto a la climatología de cada mes calendario (biblioteca de variables)
+        self.anom_pr = np.nan_to_num(anomalias_estacionales(pr, mes, relativa=True))
+        self.anom_tas = anomalias_estacionales(tas, mes)
+
+        # 2. Bolsas de remuestreo: posiciones agrupadas por mes calendario
+        self.mes = mes
+        self.orden = np.argsort(mes, kind="stable")
+        self.tamano = np.bincount(mes, minlength=13)
+        self.inicio = np.concatenate([[0], np.cumsum(self.tamano)[:-1]])
+
+        # 3. Dispersión del modelo: predicción de cada árbol centrada en Caudal_IA
+        if modelo is not None and hasattr(modelo, "estimators_"):
+            X = df[COLUMNAS_MODELO].to_numpy(dtype=float)
+            arboles = np.stack([arbol.predict(X) for arbol in modelo.estimators_])
+            self.arboles = self.caudal_ia[None, :] + (arboles - arboles.mean(axis=0))
+        else:
+            self.arboles = self.caudal_ia[None, :]
+
+    def realizaciones(self, miembros, rng):
+        """Anomalías remuestreadas por mes calendario: dos matrices (miembros × meses)"""
+        n = len(self.mes)
+        k = (rng.random((miembros, n)) * self.tamano[self.mes]).astype(np.int64)
+        idx = self.orden[self.inicio[self.mes] + k]
+        return self.anom_pr[idx], self.anom_tas[idx]
+
+    def simular(self, lo, hi, delta_lluvia, delta_temp, miembros=1000):
+        """Matriz de caudales simulados (miembros × meses) para las filas [lo, hi)"""
+        rng = np.random.default_rng(self.seed)
+        anom_pr, anom_tas = self.realizaciones(miembros, rng)
+
+        # La lluvia actúa con la inercia de 3 meses: todos los miembros en una suma acumulada (ventanas
+        # parciales al inicio); las realizaciones son efímeras, no pasan por la caché
+        inercia = medias_moviles(anom_pr, (3,), min_periodos=1)[3]
+
+        factor_lluvia = 1 + delta_lluvia / 100 + self.dispersion * inercia[:, lo:hi]
+        factor_temp = 1 - 0.05 * (delta_temp + self.dispersion * anom_tas[:, lo:hi]) # +1°C = -5% caudal
+
+        # Un árbol del bosque por miembro
+        arbol = rng.integers(0, len(self.arboles), size=miembros)
+        return np.maximum(self.arboles[arbol, lo:hi] * factor_lluvia * factor_temp, 0.0)
+
+    def run(self, lo, hi, delta_lluvia, delta_temp, miembros=1000, percentiles=(5, 25, 50, 75, 95)):
+        """Bandas de percentiles y KPIs probabilísticos del ensamble"""
+        caudales = self.simular(lo, hi, delta_lluvia, delta_temp, miembros)
+        bandas = np.percentile(caudales, percentiles, axis=0)
+        promedio_miembro = caudales.mean(axis=1)
+        criticos_miembro = (caudales < UMBRAL_CRISIS).sum(axis=1)
+
+        return {
+            "fechas": self.df['Fecha'].iloc[lo:hi].to_numpy(),
+            "bandas": pd.DataFrame(bandas.T, columns=[f"P{p}" for p in percentiles]),
+            "prob_crisis": float((promedio_miembro < UMBRAL_CRISIS).mean()),
+            "prob_mes_critico": (caudales < UMBRAL_CRISIS).mean(axis=0),
+            "promedio_p5_p95": tuple(np.percentile(promedio_miembro, [5, 95])),
+            "meses_criticos_p50": float(np.median(criticos_miembro)),
+            "meses_criticos_p95": float(np.percentile(criticos_miembro, 95)),
+            "miembros": miembros,
+        }
@@ -0,0 +1,162 @@
+"""
+Eventos de sequía e inundación por codificación de rachas (run-length) sobre Caudal_Simulado.
+
+Una racha es un tramo de meses consecutivos por debajo (sequía) o por encima (inundación) de un
+umbral. Para cada evento: inicio, fin, duración, déficit (o exceso) acumulado, severidad pico y
+periodo de retorno empírico. Todas las series de un lote (escenarios × meses, estaciones de distinta
+longitud) se procesan juntas: un np.diff sobre la máscara y sumas acumuladas, sin bucles por mes.
+"""
+import numpy as np
+import pandas as pd
+
+from modules.rules import UMBRAL_CRISIS, UMBRAL_ALERTA
+
+TIPOS = ("sequia", "inundacion")
+COLUMNAS = ["serie", "umbral", "tipo", "inicio", "fin", "duracion", "deficit", "pico", "periodo_retorno"]
+
+# Umbrales por defecto: los tramos del MOPE (las inundaciones dependen de la serie: ver umbrales_escenario)
+UMBRALES_MOPE = {
+    "Crisis": ("sequia", UMBRAL_CRISIS),
+    "Alerta": ("sequia", UMBRAL_ALERTA),
+}
+
+
+# --- 1. RACHAS ---
+def _apilar(series):
+    """Serie, matriz o lista de series de distinta longitud -> (matriz S × N rellenada con NaN, longitudes)"""
+    if isinstance(series, (list, tuple)):
+        series = [np.asarray(s, dtype=float) for s in series]
+        longitudes = np.array([len(s) for s in series], dtype=np.int64)
+        X = np.full((len(series), int(longitudes.max(initial=0))), np.nan)
+        for i, s in enumerate(series):
+            X[i, :len(s)] = s
+        return X, longitudes
+    X = np.atleast_2d(np.asarray(series, dtype=float))
+    return X, np.full(X.shape[0], X.shape[1], dtype=np.int64)
+
+
+def rachas(mascara):
+    """Máscara booleana (S × N) -> (fila, inicio, fin) de cada racha de True (fin inclusive)"""
+    M = np.atleast_2d(np.asarray(mascara, dtype=bool))
+    borde = np.zeros((M.shape[0], 1), dtype=np.int8)
+    cambios = np.diff(np.concatenate([borde, M.astype(np.int8), borde], axis=1), axis=1)
+    # np.nonzero recorre por filas: las subidas y bajadas quedan emparejadas
+    fila, inicio = np.nonzero(cambios == 1)
+    _, fin = np.nonzero(cambios == -1)
+    return fila, inicio, fin - 1
+
+
+def periodo_retorno(severidad, fila, anos):
+    """Periodo de retorno empírico (Weibull): (años de registro + 1) / rango del evento en su serie"""
+    orden = np.lexsort((-severidad, fila))
+    fila_ordenada = fila[orden]
+    primero = np.searchsorted(fila_ordenada, fila_ordenada, side="left")
+    rango = np.empty(len(fila), dtype=float)
+    rango[orden] = np.arange(len(fila)) - primero + 1
+    return (anos[fila] + 1) / rango
+
+
+# --- 2. DETECCIÓN ---
+def detectar_eventos(caudales, umbral, tipo="sequia", fechas=None, series=None, duracion_minima=1, nombre=None):
+    """
+    Eventos de un tipo bajo (sequía) o sobre (inundación) `umbral`: escalar, por mes (N,) o matriz (S × N).
+    `caudales`: serie, matriz S × N o lista de series; `fechas` y `series` (nombres) opcionales.
+    Déficit en m³/s·mes; pico = mayor distancia mensual al umbral (m³/s). `nombre` etiqueta el umbral.
+    """
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de evento desconocido: {tipo}")
+    X, longitudes = _apilar(caudales)
+    umbral = np.broadcast_to(np.asarray(umbral, dtype=float), X.shape)
+    with np.errstate(invalid="ignore"):
+        severidad = umbral - X if tipo == "sequia" else X - umbral
+    # Los NaN (sin dato o relleno del lote) cortan la racha
+    severidad = np.where(severidad > 0, severidad, 0.0)
+
+    fila, inicio, fin = rachas(severidad > 0)
+    duracion = fin - inicio + 1
+    filtro = duracion >= duracion_minima
+    fila, inicio, fin, duracion = fila[filtro], inicio[filtro], fin[filtro], duracion[filtro]
+
+    # Déficit: suma acumulada por fila; pico: máximo por tramo (reduceat en la matriz aplanada)
+    S = np.concatenate([np.zeros((X.shape[0], 1)), np.cumsum(severidad, axis=1)], axis=1)
+    deficit = S[fila, fin + 1] - S[fila, inicio]
+    plana = np.append(severidad.ravel(), 0.0)
+    cortes = np.column_stack([fila * X.shape[1] + inicio, fila * X.shape[1] + fin + 1]).ravel()
+    pico = np.maximum.reduceat(plana, cortes)[::2] if len(cortes) else np.zeros(0)
+
+    validos = np.count_nonzero(~np.isnan(X), axis=1)
+    retorno = periodo_retorno(deficit, fila, validos / 12.0)
+
+    nombres = np.asarray(series if series is not None else np.arange(X.shape[0]), dtype=object)
+    return pd.DataFrame({
+        "serie": nombres[fila],
+        "umbral": nombre or tipo,
+        "tipo": tipo,
+        "inicio": _etiquetas(fechas, fila, inicio, longitudes),
+        "fin": _etiquetas(fechas, fila, fin, longitudes),
+        "duracion": duracion,
+        "deficit": deficit,
+        "pico": pico,
+        "periodo_retorno": retorno,
+    })
+
+
+def _etiquetas(fechas, fila, posicion, longitudes):
+    """Fecha de cada posición (fechas comunes o una lista por serie); sin fechas, el índice del mes"""
+    if fechas is None:
+        return posicion
+    if isinstance(fechas, (list, tuple)):
+        desplazamientos = np.concatenate([[0], np.cumsum(longitudes)[:-1]])
+        return np.concatenate([np.asarray(f) for f in fechas])[desplazamientos[fila] + posicion]
+    return np.asarray(fechas)[posicion]
+
+
+def eventos(caudales, umbrales=None, fechas=None, series=None, duracion_minima=1):
+    """Eventos de todos los umbrales ({nombre: (tipo, umbral)}) en una sola tabla"""
+    umbrales = UMBRALES_MOPE if umbrales is None else umbrales
+    partes = [detectar_eventos(caudales, umbral, tipo, fechas, series, duracion_minima, nombre)
+              for nombre, (tipo, umbral) in umbrales.items()]
+    if not partes:
+        return pd.DataFrame(columns=COLUMNAS)
+    return pd.concat(partes, ignore_index=True)
+
+
+def umbrales_escenario(p90=None):
+    """Tramos MOPE para sequías y, si se conoce, el P90 histórico para inundaciones"""
+    umbrales = dict(UMBRALES_MOPE)
+    if p90 is not None:
+        umbrales["Inundación (P90)"] = ("inundacion", float(p90))
+    return umbrales
+
+
+# --- 3. RESUMEN ---
+def resumen(tabla):
+    """Por serie y umbral: número de eventos, meses en evento, duración máxima, déficit máximo y pico"""
+    if tabla.empty:
+        return pd.DataFrame(columns=["serie", "umbral", "eventos", "meses", "duracion_max", "deficit_max", "pico_max"])
+    return tabla.groupby(["serie", "umbral"], sort=False).agg(
+        eventos=("duracion", "size"),
+        meses=("duracion", "sum"),
+        duracion_max=("duracion", "max"),
+        deficit_max=("deficit", "max"),
+        pico_max=("pico", "max"),
+    ).reset_index()
+
+
+ENCABEZADOS = {
+    "serie": "Serie", "umbral": "Umbral", "inicio": "Inicio", "fin": "Fin", "duracion": "Duración (meses)",
+    "deficit": "Déficit / Exceso (m³/s·mes)", "pico": "Pico (m³/s)", "periodo_retorno": "Retorno (años)",
+}
+
+
+def tabla_presentacion(tabla, max_filas=None):
+    """Eventos ordenados por déficit, con fechas AAAA-MM y encabezados en español (dashboard y memo)"""
+    tabla = tabla.sort_values("deficit", ascending=False, kind="stable")
+    if max_filas is not None:
+        tabla = tabla.head(max_filas)
+    # Una sola serie (vista del dashboard): la columna no aporta
+    tabla = tabla.drop(columns=["tipo"] + (["serie"] if tabla["serie"].nunique() <= 1 else []))
+    for col in ("inicio", "fin"):
+        if pd.api.types.is_datetime64_any_dtype(tabla[col]):
+            tabla[col] = tabla[col].dt.strftime("%Y-%m")
+    return tabla.round({"deficit": 1, "pico": 1, "periodo_retorno": 1}).rename(columns=ENCABEZADOS)
@@ -0,0 +1,212 @@
+"""
+Biblioteca de variables hidrológicas vectorizada: medias móviles de varias ventanas (3/6/12 meses),
+rezagos, déficit acumulado y anomalías estacionales, cada una con una sola suma acumulada sobre
+arreglos NumPy. Acepta una serie (N,), una matriz (S × N, una serie por fila) o una lista de series.
+
+La caché es opcional (cachear=True), para arreglos que viven todo el proceso: columnas del gold y
+rebanadas de la tabla compacta. La clave es la memoria de la entrada (dirección, forma, pasos, tipo),
+por lo que dos vistas de los mismos datos coinciden; las entradas cacheadas quedan de solo lectura y,
+si su memoria base sigue siendo escribible, el resultado se calcula sin cachear. Los resultados
+cacheados también son de solo lectura y la caché está acotada en bytes.
+"""
+import numpy as np
+import pandas as pd
+
+from modules.cache import ResultCache
+
+VENTANAS = (3, 6, 12)
+# Balance lógico del módulo de pérdidas: agotamiento (mm) por °C de temperatura máxima
+FACTOR_AGOTAMIENTO = 1.5
+
+
+# --- 1. NÚCLEO (sin caché) ---
+def _matriz(series):
+    """Serie, matriz o lista de series -> (matriz S × N en float, la entrada era 1-D)"""
+    if isinstance(series, (list, tuple)) and len(series) and np.ndim(series[0]) > 0:
+        return np.vstack([np.asarray(s, dtype=float) for s in series]), False
+    valores = np.asarray(series, dtype=float)
+    return np.atleast_2d(valores), valores.ndim == 1
+
+
+def _forma(matriz, una):
+    return matriz[0] if una else matriz
+
+
+def _medias(X, ventanas, min_periodos=None):
+    """rolling(w, min_periods).mean() de cada fila; sumas y conteos (sin NaN) de una pasada"""
+    validos = ~np.isnan(X)
+    ceros = np.zeros((X.shape[0], 1))
+    suma = np.concatenate([ceros, np.cumsum(np.where(validos, X, 0.0), axis=1)], axis=1)
+    cuenta = np.concatenate([ceros, np.cumsum(validos, axis=1)], axis=1)
+    fin = np.arange(1, X.shape[1] + 1)
+    salida = {}
+    for w in ventanas:
+        inicio = np.maximum(fin - w, 0)
+        n = cuenta[:, fin] - cuenta[:, inicio]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            media = (suma[:, fin] - suma[:, inicio]) / n
+        media[n < (w if min_periodos is None else min_periodos)] = np.nan
+        salida[w] = media
+    return salida
+
+
+def _rezago(X, k, relleno=np.nan):
+    salida = np.full(X.shape, relleno, dtype=float)
+    if k >= 0:
+        salida[:, k:] = X[:, :X.shape[1] - k]
+    else:
+        salida[:, :k] = X[:, -k:]
+    return salida
+
+
+def media_movil(valores, ventana):
+    """Media móvil con NaN en las primeras (ventana - 1) posiciones (arreglo nuevo, sin caché)"""
+    X, una = _matriz(valores)
+    return _forma(_medias(X, (ventana,))[ventana], una)
+
+
+# --- 2. CACHÉ OPCIONAL (clave por memoria de la entrada, acotada en bytes) ---
+MAX_BYTES = 64 * 2**20
+
+
+def _peso(guardado):
+    resultado = guardado[2]
+    return sum(a.nbytes for a in (resultado.values() if isinstance(resultado, dict) else [resultado]))
+
+
+CACHE = ResultCache(maxsize=256, maxbytes=MAX_BYTES, peso=_peso)
+
+
+class _NoCacheable(Exception):
+    pass
+
+
+def _congelar(arreglo):
+    """Marca la entrada como de solo lectura; falla si su memoria base todavía se puede escribir"""
+    if isinstance(arreglo, pd.Series):
+        arreglo = arreglo.to_numpy()
+    base = arreglo.base
+    while isinstance(base, np.ndarray):
+        if base.flags.writeable:
+            raise _NoCacheable
+        base = base.base
+    arreglo.flags.writeable = False
+    return arreglo
+
+
+def _clave(argumento):
+    if isinstance(argumento, (list, tuple)):
+        return tuple(_clave(a) for a in argumento)
+    if isinstance(argumento, (np.ndarray, pd.Series)):
+        a = _congelar(argumento)
+        return ("mem", a.__array_interface__["data"][0], a.shape, a.strides, a.dtype.str)
+    return argumento
+
+
+def _cacheado(nombre, entradas, parametros, calcular, cachear=False):
+    """
+    Resultado de `calcular()`; con cachear=True se guarda bajo (nombre, memoria de las entradas, parámetros).
+    La entrada guarda referencias a los arreglos: su memoria no se reutiliza mientras siga en caché.
+    """
+    if not cachear:
+        return calcular()
+    try:
+        clave = (nombre, _clave(entradas), _clave(parametros))
+    except _NoCacheable:
+        return calcular()
+    guardado = CACHE.get(clave)
+    if guardado is not None:
+        return guardado[2]
+    resultado = calcular()
+    for arreglo in (resultado.values() if isinstance(resultado, dict) else [resultado]):
+        arreglo.flags.writeable = False
+    CACHE.put(clave, (entradas, parametros, resultado))
+    return resultado
+
+
+# --- 3. VARIABLES ---
+def medias_moviles(series, ventanas=VENTANAS, min_periodos=None, cachear=False):
+    """{ventana: media móvil} de cada serie, una suma acumulada para todas las ventanas"""
+    def calcular():
+        X, una = _matriz(series)
+        return {w: _forma(m, una) for w, m in _medias(X, ventanas, min_periodos).items()}
+    return _cacheado("medias", series, (tuple(ventanas), min_periodos), calcular, cachear)
+
+
+def rezagos(series, rezagos=(1,), relleno=np.nan, cachear=False):
+    """{k: serie desplazada k meses} (k > 0: valor de hace k meses)"""
+    def calcular():
+        X, una = _matriz(series)
+        return {k: _forma(_rezago(X, k, relleno), una) for k in rezagos}
+    return _cacheado("rezagos", series, (tuple(rezagos), relleno), calcular, cachear)
+
+
+def deficit_acumulado(series, referencia, cachear=False):
+    """
+    Déficit acumulado bajo `referencia` (escalar, por fila o por mes): D_t = max(0, D_t-1 + ref_t - x_t).
+    Con S = suma acumulada de (ref - x) desde 0, D_t = S_t - min(S_0..S_t): una suma y un mínimo acumulado.
+    """
+    def calcular():
+        X, una = _matriz(series)
+        diferencia = np.nan_to_num(np.asarray(referencia, dtype=float) - X) # meses sin dato no suman
+        S = np.concatenate([np.zeros((X.shape[0], 1)), np.cumsum(diferencia, axis=1)], axis=1)
+        return _forma(S[:, 1:] - np.minimum.accumulate(S, axis=1)[:, 1:], una)
+    return _cacheado("deficit", series, (referencia,), calcular, cachear)
+
+
+def climatologia(series, mes, cachear=False):
+    """Media de cada mes calendario por serie (S × 13; la columna 0 no se usa), ignorando NaN"""
+    def calcular():
+        X, una = _matriz(series)
+        uno_caliente = (np.asarray(mes, dtype=int)[:, None] == np.arange(13)[None, :]).astype(float) # N × 13
+        validos = ~np.isnan(X)
+        suma = np.where(validos, X, 0.0) @ uno_caliente
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return _forma(suma / (validos @ uno_caliente), una)
+    return _cacheado("climatologia", series, (mes,), calcular, cachear)
+
+
+def anomalias_estacionales(series, mes, relativa=False, cachear=False):
+    """Desvío respecto a la climatología del mes calendario: x - clim (o x / clim - 1 si es relativa)"""
+    def calcular():
+        X, una = _matriz(series)
+        clim = np.atleast_2d(climatologia(series, mes, cachear))[:, np.asarray(mes, dtype=int)]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            anomalia = X / clim - 1 if relativa else X - clim
+        return _forma(anomalia, una)
+    return _cacheado("anomalias", series, (mes, relativa), calcular, cachear)
+
+
+def inercia_3meses(precipitacion, respaldo=None, cachear=False):
+    """Inercia_3meses: media de la lluvia del mes y los 2 anteriores; `respaldo` donde falta historia"""
+    def calcular():
+        media = medias_moviles(precipitacion, (3,), cachear=cachear)[3]
+        return media if respaldo is None else np.where(np.isnan(media), respaldo, media)
+    return _cacheado("inercia", precipitacion, (respaldo,), calcular, cachear)
+
+
+def recarga(precipitacion, cachear=False):
+    """Recarga: media de la lluvia de los 3 meses anteriores (0 sin historia suficiente)"""
+    def calcular():
+        X, una = _matriz(precipitacion)
+        return _forma(np.nan_to_num(_rezago(_medias(X, (3,))[3], 1)), una)
+    return _cacheado("recarga", precipitacion, (), calcular, cachear)
+
+
+def agotamiento(tmax):
+    """Pérdida por evaporación asociada a la temperatura máxima"""
+    return np.asarray(tmax, dtype=float) * FACTOR_AGOTAMIENTO
+
+
+def variables(series, mes=None, ventanas=VENTANAS, lags=(1, 12), referencia=None, prefijo=""):
+    """
+    Tabla de variables de una o varias series: medias móviles, rezagos, anomalía estacional
+    y déficit acumulado (si hay `referencia`). {nombre: arreglo}, mismas formas que la entrada.
+    """
+    salida = {f"{prefijo}media_{w}m": m for w, m in medias_moviles(series, ventanas).items()}
+    salida.update({f"{prefijo}rezago_{k}m": r for k, r in rezagos(series, lags).items()})
+    if mes is not None:
+        salida[f"{prefijo}anomalia"] = anomalias_estacionales(series, mes)
+    if referencia is not None:
+        salida[f"{prefijo}deficit"] = deficit_acumulado(series, referencia)
+    return salida
@@ -0,0 +1,138 @@
+"""
+Almacén columnar del dataset gold: un archivo .npy por columna + schema.json.
+Se lee con memory-map (sin parseo) y permite cargar solo las columnas necesarias.
+Los meses nuevos se anexan al final de cada .npy (append_gold_store) y cada escritura
+sube la versión del dataset, que las cachés usan como clave.
+"""
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+SCHEMA = "schema.json"
+FORMATO_VERSION = 1
+
+
+def _hash_array(arr):
+    return hashlib.sha256(np.ascontiguousarray(arr).view(np.uint8)).hexdigest()
+
+
+def _hash_cadena(previo, arr):
+    """Hash encadenado por segmento: sha256(hash previo + sha256 del bloque anexado)"""
+    return hashlib.sha256((previo + _hash_array(arr)).encode()).hexdigest()
+
+
+def _firma_version(schema):
+    partes = [str(schema["filas"])] + [f"{n}:{c['sha256']}" for n, c in sorted(schema["columnas"].items())]
+    return hashlib.sha256("|".join(partes).encode()).hexdigest()
+
+
+def _guardar_schema(directorio, schema):
+    temporal = os.path.join(directorio, SCHEMA + ".tmp")
+    with open(temporal, "w") as f:
+        json.dump(schema, f, indent=2)
+    os.replace(temporal, os.path.join(directorio, SCHEMA)) # los lectores ven el esquema viejo o el nuevo
+
+
+def dataset_version(directorio):
+    """Versión del dataset ("<n>-<hash>"): cambia con cada escritura o anexo"""
+    schema = read_schema(directorio)
+    return f"{schema.get('version', 1)}-{_firma_version(schema)[:12]}"
+
+
+def write_gold_store(df, directorio):
+    """Escribe cada columna del DataFrame como .npy tipado y registra el esquema"""
+    os.makedirs(directorio, exist_ok=True)
+    version = read_schema(directorio).get("version", 1) + 1 if os.path.exists(os.path.join(directorio, SCHEMA)) else 1
+    columnas = {}
+    for nombre in df.columns:
+        serie = df[nombre]
+        if nombre == 'Fecha':
+            arr = pd.to_datetime(serie).to_numpy()
+        else:
+            arr = serie.to_numpy()
+        if arr.dtype == object:
+            raise TypeError(f"La columna '{nombre}' no tiene un tipo nativo de NumPy")
+        archivo = f"{nombre}.npy"
+        np.save(os.path.join(directorio, archivo), arr, allow_pickle=False)
+        columnas[nombre] = {"archivo": archivo, "dtype": arr.dtype.str, "sha256": _hash_array(arr)}
+
+    schema = {"formato": FORMATO_VERSION, "version": version, "filas": int(len(df)), "columnas": columnas}
+    _guardar_schema(directorio, schema)
+    return schema
+
+
+def _anexar_npy(ruta, arr):
+    """Agrega filas al final de un .npy 1-D: reescribe solo la cabecera (mismo largo gracias al relleno)"""
+    with open(ruta, "r+b") as f:
+        version = np.lib.format.read_magic(f)
+        if version != (1, 0):
+            raise ValueError(f"{ruta}: versión .npy {version} no soportada para anexar")
+        forma, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        largo_cabecera = f.tell()
+        cabecera = io.BytesIO()
+        np.lib.format.write_array_header_1_0(cabecera, {
+            "descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": fortran, "shape": (forma[0] + len(arr),),
+        })
+        if len(cabecera.getvalue()) != largo_cabecera:
+            raise ValueError(f"{ruta}: la cabecera cambió de tamaño")
+        f.seek(0, os.SEEK_END)
+        f.write(np.ascontiguousarray(arr.astype(dtype, copy=False)).tobytes())
+        f.seek(0)
+        f.write(cabecera.getvalue()) # la cabecera se actualiza después de los datos
+
+
+def append_gold_store(df, directorio):
+    """
+    Anexa filas nuevas (mismas columnas que el almacén) sin reescribir la historia.
+    El costo depende solo del número de filas nuevas; devuelve el esquema con la versión nueva.
+    """
+    schema = read_schema(directorio)
+    if set(df.columns) != set(schema["columnas"]):
+        raise KeyError(f"Columnas distintas a las del almacén: {sorted(set(df.columns) ^ set(schema['columnas']))}")
+    if len(df) == 0:
+        return schema
+
+    for nombre, columna in schema["columnas"].items():
+        serie = df[nombre]
+        arr = (pd.to_datetime(serie).to_numpy() if nombre == 'Fecha' else serie.to_numpy()).astype(np.dtype(columna["dtype"]))
+        _anexar_npy(os.path.join(directorio, columna["archivo"]), arr)
+        columna["sha256"] = _hash_cadena(columna["sha256"], arr)
+
+    schema["filas"] = int(schema["filas"] + len(df))
+    schema["version"] = schema.get("version", 1) + 1
+    _guardar_schema(directorio, schema)
+    return schema
+
+
+def read_schema(directorio):
+    with open(os.path.join(directorio, SCHEMA)) as f:
+        return json.load(f)
+
+
+def read_gold_store(directorio, columnas=None, mmap=True):
+    """Abre las columnas pedidas con memory-map; las demás ni se tocan"""
+    schema = read_schema(directorio)
+    nombres = list(schema["columnas"]) if columnas is None else list(columnas)
+    faltantes = [c for c in nombres if c not in schema["columnas"]]
+    if faltantes:
+        raise KeyError(f"Columnas no disponibles en el almacén gold: {faltantes}")
+
+    datos = {}
+    for nombre in nombres:
+        ruta = os.path.join(directorio, schema["columnas"][nombre]["archivo"])
+        arr = np.load(ruta, mmap_mode="r" if mmap else None, allow_pickle=False)
+        # Series individuales: pandas no consolida (ni copia) los bloques mapeados
+        datos[nombre] = pd.Series(arr, name=nombre, copy=False)
+    return pd.DataFrame(datos, copy=False)
+
+
+def export_csv(directorio, ruta_csv):
+    """Exporta el almacén a CSV (formato de intercambio)"""
+    df = read_gold_store(directorio, mmap=False)
+    if 'Fecha' in df.columns:
+        df['Fecha'] = df['Fecha'].dt.strftime('%Y-%m-%d')
+    df.to_csv(ruta_csv, index=False)
@@ -1,70 +1,91 @@
 import streamlit as st
-import pandas as pd
-import datetime
+from core.governance import evaluar_escenario, decisiones, registrar_decision
+from modules.rules import MOPE, SECTORES
+from modules.audit import AuditStore, AUDIT_PATH
+from modules.tracing import traced
+
+PAGINA_LOG = 20
+
+
+@st.cache_resource
+def _abrir_audit_store(ruta):
+    """Una conexión (WAL) compartida por todas las sesiones del servidor"""
+    return AuditStore(ruta)
+
 
 class GovernanceModule:
-    def __init__(self):
-        # Inicializar el registro de auditoría en la sesión si no existe
-        if 'audit_log' not in st.session_state:
-            st.session_state['audit_log'] = []
+    def __init__(self, ruta_audit=AUDIT_PATH):
+        # Registro de auditoría persistente (SQLite append-only con cadena de hashes)
+        self.audit = _abrir_audit_store(ruta_audit)
 
     def evaluar_escenario(self, kpis):
-        """
-        Motor Híbrido: Convierte datos técnicos (Caudal) en reglas normativas (MOPE).
-        """
-        caudal = kpis.get('caudal_promedio', 0)
-        
-        # REGLAS DEL MOPE (Simuladas para el Hackathon, ya luego integramos el manual completo que no seria tan dificil pero eso lo quiere hacer con el chatbot de AI tambien=
-        if caudal < 25:
-            return {
-                "nivel": "EMERGENCIA ROJA",
-                "accion": "CIERRE TOTAL DE RIEGO AGRÍCOLA",
-                "prioridad": "Consumo Humano Exclusivo",
-                "fundamento": "Art. 4 Reglamento de Aguas y Resolución INDRHI-2025",
-                "color": "error",
-                "impacto_social": {"Agro": 0, "Urbano": 100, "Energia": 20}
-            }
-        elif caudal < 40:
-            return {
-                "nivel": "ALERTA AMARILLA",
-                "accion": "TANDEO (Turnos de 12 horas)",
-                "prioridad": "Riego Restringido + Consumo Humano",
-                "fundamento": "Protocolo de Sequía Estacional - Fase 2",
-                "color": "warning",
-                "impacto_social": {"Agro": 50, "Urbano": 90, "Energia": 60}
-            }
-        else:
-            return {
-                "nivel": "NORMALIDAD VERDE",
-                "accion": "OPERACIÓN ESTÁNDAR",
-                "prioridad": "Todos los sectores garantizados",
-                "fundamento": "Manual de Operación de Presas (MOPE)",
-                "color": "success",
-                "impacto_social": {"Agro": 100, "Urbano": 100, "Energia": 100}
-            }
+        # Tabla declarativa compartida con el motor, el reporte y la CLI (core/governance.py)
+        return evaluar_escenario(kpis)
 
+    @traced()
+    def render_timeline(self, df_view):
+        """Línea de tiempo MOPE: nivel de cada mes del escenario y transiciones entre niveles"""
+        st.subheader("🗓️ Línea de Tiempo de Decisiones (MOPE)")
+        timeline = decisiones(df_view)
+        conteos = MOPE.conteos(timeline['Codigo'].to_numpy())
+
+        cols = st.columns(MOPE.n_niveles)
+        for col, codigo in zip(cols, sorted(MOPE.reglas, reverse=True)):
+            col.metric(f"Meses en {MOPE.niveles[codigo]}", int(conteos[codigo]))
+
+        col_chart, col_trans = st.columns([2, 1])
+        with col_chart:
+            st.line_chart(timeline.set_index('Fecha')[list(SECTORES)])
+            st.caption("Disponibilidad sectorial (%) que dicta la regla MOPE de cada mes.")
+        with col_trans:
+            st.markdown("**Transiciones entre niveles** (filas: desde)")
+            st.dataframe(MOPE.tabla_transiciones(timeline['Codigo'].to_numpy()), use_container_width=True)
+
+        with st.expander("Ver decisiones mes a mes"):
+            st.dataframe(timeline, hide_index=True, use_container_width=True)
+
+    @traced()
     def render_audit_log(self):
         st.markdown("### 📜 Notario Digital (Audit Log)")
-        st.caption("Registro inmutable de decisiones conforme a ISO-31000.")
-        
-        if len(st.session_state['audit_log']) > 0:
-            df_log = pd.DataFrame(st.session_state['audit_log'])
-            # Mostramos el log como una tabla limpia
-            st.dataframe(
-                df_log, 
-                column_config={
-                    "timestamp": "Hora",
-                    "autoridad": "Responsable",
-                    "accion": "Decisión Tomada",
-                    "causa": "Justificación Técnica"
-                },
-                use_container_width=True,
-                hide_index=True
-            )
-        else:
-            st.info("No hay decisiones registradas en esta sesión.")
-
-    def render(self, kpis):
+        st.caption("Registro inmutable de decisiones conforme a ISO-31000 (cadena de hashes SHA-256).")
+
+        total = len(self.audit)
+        if total == 0:
+            st.info("No hay decisiones registradas todavía.")
+            return
+
+        # Solo se lee la página visible del final del registro
+        c1, c2, c3 = st.columns([1, 1, 2])
+        niveles = ["Todos"] + list(MOPE.niveles)
+        nivel = c1.selectbox("Nivel", niveles, key="audit_nivel")
+        filtro = {"nivel": None if nivel == "Todos" else nivel}
+        n_filtrados = self.audit.contar(**filtro) if filtro["nivel"] else total
+        paginas = max(1, -(-n_filtrados // PAGINA_LOG))
+        pagina = c2.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, value=1, key="audit_pagina")
+        if c3.button("🔐 Verificar integridad de la cadena"):
+            ok, alterado = self.audit.verificar()
+            if ok:
+                c3.success(f"Cadena íntegra ({total} registros).")
+            else:
+                c3.error(f"Cadena alterada a partir del registro #{alterado}.")
+
+        df_log = self.audit.pagina(int(pagina) - 1, PAGINA_LOG, **filtro)
+        st.dataframe(
+            df_log[['timestamp', 'autoridad', 'nivel', 'accion', 'causa', 'hash']],
+            column_config={
+                "timestamp": "Fecha y Hora",
+                "autoridad": "Responsable",
+                "nivel": "Nivel MOPE",
+                "accion": "Decisión Tomada",
+                "causa": "Justificación Técnica",
+                "hash": "Sello (SHA-256)"
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+
+    @traced()
+    def render(self, kpis, df_view=None):
         st.header("⚖️ Gobernabilidad y Toma de Decisiones")
         st.markdown("Este módulo transforma la **Inteligencia de Datos** en **Actos Administrativos** transparentes.")
         
@@ -94,14 +115,8 @@ class GovernanceModule:
             autoridad = st.text_input("Firma del Funcionario Responsable:", value="Operador INDRHI - Turno A")
             
             if st.button("🗳️ EJECUTAR DECISIÓN Y REGISTRAR"):
-                # Guardamos en el "Blockchain" (Session State)
-                nuevo_registro = {
-                    "timestamp": datetime.datetime.now().strftime("%H:%M:%S"),
-                    "autoridad": autoridad,
-                    "accion": escenario['accion'],
-                    "causa": f"Caudal a {kpis['caudal_promedio']:.1f} m³/s ({escenario['nivel']})"
-                }
-                st.session_state['audit_log'].insert(0, nuevo_registro) # El más reciente primero
+                # Se encola en el registro persistente; la lectura del log vacía el lote pendiente
+                registrar_decision(self.audit, kpis, autoridad)
                 st.success("Decisión registrada en el Libro Oficial Digital.")
                 st.balloons()
 
@@ -126,6 +141,11 @@ class GovernanceModule:
                 st.warning("⚠️ **ALERTA DE CONFLICTO:** Riesgo alto de protestas en sector agrícola.")
 
         st.divider()
-        
-        # 3. EL LOG
+
+        # 3. LÍNEA DE TIEMPO
+        if df_view is not None and len(df_view):
+            self.render_timeline(df_view)
+            st.divider()
+
+        # 4. EL LOG
         self.render_audit_log()
\ No newline at end of file
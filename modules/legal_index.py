@@ -0,0 +1,167 @@
+"""
+Índice invertido BM25 sobre la base de conocimiento legal (MOPE y reglamento).
+Se construye una sola vez (python -m modules.legal_index build) y se guarda en disco;
+las búsquedas top-k recorren solo las listas de los términos de la consulta.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_PATH = os.path.join(BASE_DIR, "data", "legal", "base_conocimiento.json")
+INDICE_PATH = os.path.join(BASE_DIR, "data", "legal", "indice_bm25.npz")
+
+STOPWORDS = frozenset(
+    "a al como con cual de del el en es la las lo los me mi o para por que se si sobre su un una y".split()
+)
+
+
+def tokenizar(texto):
+    """Minúsculas, sin acentos ni signos, sin palabras vacías y con plural simple recortado"""
+    texto = unicodedata.normalize("NFD", texto.lower())
+    texto = "".join(c for c in texto if unicodedata.category(c) != "Mn")
+    tokens = []
+    for t in re.findall(r"[a-z0-9]+", texto):
+        if t in STOPWORDS:
+            continue
+        if len(t) > 4 and t.endswith("es"):
+            t = t[:-2]
+        elif len(t) > 3 and t.endswith("s"):
+            t = t[:-1]
+        tokens.append(t)
+    return tokens
+
+
+def _texto_indexable(doc):
+    # Título y palabras clave pesan más que el cuerpo: se repiten
+    if doc.get("solo_claves"): # p. ej. la ayuda, cuyo texto cita otros artículos
+        return " ".join([doc.get("titulo", ""), doc.get("claves", "")])
+    return " ".join([doc.get("titulo", "")] * 2 + [doc.get("claves", "")] * 2 + [doc.get("texto", "")])
+
+
+def hash_corpus(documentos):
+    return hashlib.sha256(json.dumps(documentos, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class BM25Index:
+    def __init__(self, documentos, k1=1.5, b=0.75):
+        self.documentos = list(documentos)
+        self.k1 = k1
+        self.b = b
+        self.firma = hash_corpus(self.documentos)
+
+        # 1. Listas invertidas en formato CSR: término -> (documentos, frecuencias)
+        conteos = []
+        for doc in self.documentos:
+            tokens = tokenizar(_texto_indexable(doc))
+            terminos, tf = np.unique(tokens, return_counts=True)
+            conteos.append((terminos, tf, len(tokens)))
+        self.vocabulario = {t: i for i, t in enumerate(sorted({t for c in conteos for t in c[0]}))}
+        self.longitudes = np.array([c[2] for c in conteos], dtype=float)
+
+        pares = [(self.vocabulario[t], d, f) for d, (terminos, tf, _) in enumerate(conteos) for t, f in zip(terminos, tf)]
+        pares.sort()
+        terminos = np.array([p[0] for p in pares], dtype=np.int64)
+        self.docs = np.array([p[1] for p in pares], dtype=np.int32)
+        self.tf = np.array([p[2] for p in pares], dtype=float)
+        self.indptr = np.searchsorted(terminos, np.arange(len(self.vocabulario) + 1))
+        self._precalcular()
+
+    def _precalcular(self):
+        # 2. Pesos BM25 por posting precalculados: la consulta solo suma
+        n = len(self.longitudes)
+        df = np.diff(self.indptr)
+        self.idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+        norma = self.k1 * (1 - self.b + self.b * self.longitudes / max(self.longitudes.mean(), 1e-9))
+        idf_posting = np.repeat(self.idf, df)
+        self.pesos = idf_posting * self.tf * (self.k1 + 1) / (self.tf + norma[self.docs])
+
+    def __len__(self):
+        return len(self.documentos)
+
+    def search(self, consulta, k=3):
+        """Top-k [(puntaje, documento)] con puntaje > 0, de mayor a menor"""
+        ids = {self.vocabulario[t] for t in tokenizar(consulta) if t in self.vocabulario}
+        if not ids:
+            return []
+        puntajes = np.zeros(len(self.documentos))
+        for i in ids:
+            a, b = self.indptr[i], self.indptr[i + 1]
+            puntajes[self.docs[a:b]] += self.pesos[a:b]
+        k = min(k, len(puntajes))
+        mejores = np.argpartition(-puntajes, k - 1)[:k]
+        mejores = mejores[np.argsort(-puntajes[mejores], kind="stable")]
+        return [(float(puntajes[d]), self.documentos[d]) for d in mejores if puntajes[d] > 0]
+
+    # --- 3. PERSISTENCIA ---
+    def save(self, ruta=INDICE_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        terminos = np.array(sorted(self.vocabulario, key=self.vocabulario.get))
+        meta = json.dumps({"k1": self.k1, "b": self.b, "firma": self.firma, "documentos": self.documentos}, ensure_ascii=False)
+        with open(ruta, "wb") as f:
+            np.savez(f, terminos=terminos, indptr=self.indptr, docs=self.docs, tf=self.tf,
+                     longitudes=self.longitudes, meta=np.array(meta))
+
+    @classmethod
+    def load(cls, ruta=INDICE_PATH):
+        with np.load(ruta, allow_pickle=False) as datos:
+            meta = json.loads(str(datos["meta"]))
+            indice = cls.__new__(cls)
+            indice.documentos = meta["documentos"]
+            indice.k1, indice.b, indice.firma = meta["k1"], meta["b"], meta["firma"]
+            indice.vocabulario = {str(t): i for i, t in enumerate(datos["terminos"])}
+            indice.indptr = datos["indptr"]
+            indice.docs = datos["docs"]
+            indice.tf = datos["tf"]
+            indice.longitudes = datos["longitudes"]
+        indice._precalcular()
+        return indice
+
+
+def leer_corpus(ruta=CORPUS_PATH):
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def cargar_indice(ruta_indice=INDICE_PATH, ruta_corpus=CORPUS_PATH):
+    """Índice preconstruido si coincide con el corpus; si no, se reconstruye (y se guarda si se puede)"""
+    documentos = leer_corpus(ruta_corpus)
+    if os.path.exists(ruta_indice):
+        indice = BM25Index.load(ruta_indice)
+        if indice.firma == hash_corpus(documentos):
+            return indice
+    indice = BM25Index(documentos)
+    try:
+        indice.save(ruta_indice)
+    except OSError:
+        pass
+    return indice
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.legal_index", description="Índice BM25 de la base legal")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    build = sub.add_parser("build", help="Construye el índice desde el corpus")
+    build.add_argument("--corpus", default=CORPUS_PATH)
+    build.add_argument("--salida", default=INDICE_PATH)
+    buscar = sub.add_parser("search", help="Consulta el índice")
+    buscar.add_argument("consulta")
+    buscar.add_argument("-k", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.comando == "build":
+        indice = BM25Index(leer_corpus(args.corpus))
+        indice.save(args.salida)
+        print(f"Índice con {len(indice)} documentos y {len(indice.vocabulario)} términos en {args.salida}")
+    else:
+        for puntaje, doc in cargar_indice().search(args.consulta, args.k):
+            print(f"{puntaje:6.2f}  {doc['titulo']}")
+
+
+if __name__ == "__main__":
+    main()
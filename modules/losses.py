@@ -1,7 +1,14 @@
+import os
+import sys
 import streamlit as st
 import pandas as pd
 import numpy as np
 
+# Script independiente (streamlit run modules/losses.py): habilitar imports del paquete
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.thresholds import ThresholdEngine
+from modules.features import recarga, agotamiento
+
 # --- 1. GENERACIÓN DE DATOS SIMULADOS (Para que funcione sin CSVs jijijij) ---
 def get_dummy_data():
     dates = pd.date_range(start='2020-01-01', periods=60, freq='ME')
@@ -17,9 +24,9 @@ def get_dummy_data():
 # --- 2. LÓGICA CORE (Caudal Lógico) ---
 def generar_alertas(df):
     df_out = df.copy()
-    # Recarga (Inercia 3 meses)
-    df_out['Recarga_pr'] = df_out['pr'].rolling(3).mean().shift(1).fillna(0)
-    df_out['Agotamiento'] = df_out['TMAX'] * 1.5
+    # Recarga (Inercia de los 3 meses previos) y agotamiento: misma física que la biblioteca de variables
+    df_out['Recarga_pr'] = recarga(df_out['pr'].to_numpy())
+    df_out['Agotamiento'] = agotamiento(df_out['TMAX'].to_numpy())
     df_out['Caudal_Logico'] = df_out['Recarga_pr'] - df_out['Agotamiento']
     return df_out
 
@@ -62,9 +69,10 @@ for cult in cultivos:
 df_clima = get_dummy_data()
 df_processed = generar_alertas(df_clima)
 
-# Calculamos P10/P90 dinámicamente sobre la serie
-p10 = df_processed['Caudal_Logico'].quantile(0.10)
-p90 = df_processed['Caudal_Logico'].quantile(0.90)
+# P10/P90 mantenidos de forma incremental (los meses nuevos se agregan con update)
+if "umbrales_losses" not in st.session_state:
+    st.session_state["umbrales_losses"] = ThresholdEngine().update(df_processed['Caudal_Logico'].to_numpy())
+p10, p90 = st.session_state["umbrales_losses"].umbrales()
 
 df_final = motor_estimacion(df_processed, p10, p90, costos_config)
 
@@ -0,0 +1,310 @@
+"""
+Motor de memorándums por lotes: un memo por mes, estación y escenario.
+Las plantillas se precompilan por nivel MOPE (estilo y órdenes ya incrustados), los lotes se
+renderizan en un pool de procesos y la salida (ZIP o documento HTML multipágina) se emite en
+bloques, sin mantener todos los memos en memoria.
+"""
+import argparse
+import html
+import io
+import os
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from string import Template
+
+import numpy as np
+
+from modules.rules import MOPE
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Por debajo de este número de memos el arranque del pool cuesta más que el render
+UMBRAL_PARALELO = 2000
+TAMANO_BLOQUE = 500
+
+# Contenido del memorándum por código MOPE (0 = Normalidad, 1 = Alerta, 2 = Crisis)
+MEMOS = {
+    2: {
+        "estilo": {
+            "color": "#d92b2b",
+            "bg": "#ffe6e6",
+            "titulo": "🚨 URGENTE: DECLARATORIA DE DESASTRE HÍDRICO",
+            "borde": "red"
+        },
+        "agro": """
+            * **Arroz (Bajo Yaque):** Pérdida total proyectada (100%) por inviabilidad de inundación.
+            * **Banano (Línea Noroeste):** Estrés severo. Se requiere auxilio de pozos tubulares.
+            * **Ganadería:** Riesgo alto en Montecristi.
+            """,
+        "urbano": "**CORAASAN (Santiago):** Déficit del 40%. Racionamiento obligatorio (48h).",
+        "acciones": [
+            "🔴 **CIERRE TOTAL** del Canal Monsieur Bogaert y UFE.",
+            "🔴 Operación de Presa Tavera-Bao en cota mínima (solo humano).",
+            "🔴 Activación del Fondo de Contingencia (Aseguradora Agropecuaria)."
+        ],
+    },
+    1: {
+        "estilo": {
+            "color": "#ff9900",
+            "bg": "#fff8e6",
+            "titulo": "⚠️ AVISO: RESTRICCIÓN PREVENTIVA",
+            "borde": "orange"
+        },
+        "agro": """
+            * **Arroz:** Prohibición de siembra de tercera etapa ("Viveros").
+            * **Turnos de Riego:** Reducción a 3 días por semana.
+            """,
+        "urbano": "**Acueductos Rurales:** Reducción de presión nocturna.",
+        "acciones": [
+            "🟡 Reducción del 30% en válvulas de salida.",
+            "🟡 Suspensión de lavado de vehículos en Santiago.",
+            "🟡 Monitoreo diario de infiltración."
+        ],
+    },
+    0: {
+        "estilo": {
+            "color": "#28a745",
+            "bg": "#e6f9e9",
+            "titulo": "✅ INFORME OPERATIVO: ESTABILIDAD",
+            "borde": "green"
+        },
+        "agro": "**Ciclo de Siembra:** Garantizado al 100%.",
+        "urbano": "Abastecimiento continuo (24/7).",
+        "acciones": [
+            "🟢 Mantener curva guía de operación.",
+            "🟢 Mantenimiento preventivo de compuertas.",
+            "🟢 Maximizar generación hidroeléctrica."
+        ],
+    },
+}
+
+# --- 1. PLANTILLAS PRECOMPILADAS ---
+CUERPO = """<section class="memo">
+    <h1 style="color: #003366;">🇩🇴 INDRHI / COPRE</h1>
+    <hr>
+    <h3>ASUNTO: {titulo}</h3>
+    <p><strong>REF:</strong> $ref</p>
+    <p><strong>ÁMBITO:</strong> $ambito | <strong>ESCENARIO:</strong> $escenario</p>
+    <br>
+    <div style="background-color: {bg}; padding: 20px; border-left: 5px solid {color};">
+        <h3>DIAGNÓSTICO</h3>
+        <p>Caudal Proyectado: <strong>$caudal m³/s</strong></p>
+        <p>Variación: <strong>$variacion%</strong></p>
+        <p>Nivel MOPE: <strong>{nivel}</strong> ({accion})</p>
+        $extra
+    </div>
+    <br>
+    <h3>ÓRDENES OPERATIVAS</h3>
+    <ul>
+        {acciones}
+    </ul>
+    <hr>
+    <p style="font-size: small; color: gray;">Generado por Inteligencia Artificial RH-PARGIRH</p>
+</section>
+"""
+
+INICIO_DOCUMENTO = """<html>
+<head><meta charset="utf-8"><title>$titulo</title>
+<style>.memo { page-break-after: always; }</style></head>
+<body style="font-family: sans-serif; padding: 40px;">
+"""
+FIN_DOCUMENTO = "</body>\n</html>\n"
+
+
+def _compilar(codigo):
+    memo, regla = MEMOS[codigo], MOPE.regla(codigo)
+    estaticos = {
+        **memo["estilo"],
+        "nivel": regla["nivel"],
+        "accion": regla["accion"],
+        "acciones": "".join(f"<li>{html.escape(a)}</li>" for a in memo["acciones"]),
+    }
+    return Template(CUERPO.format(**estaticos))
+
+
+PLANTILLAS = {codigo: _compilar(codigo) for codigo in MEMOS}
+
+
+def render_cuerpo(ref, ambito, escenario, caudal, variacion, codigo, extra=""):
+    """Cuerpo HTML de un memo: solo se sustituyen los valores variables"""
+    return PLANTILLAS[int(codigo)].substitute(
+        ref=html.escape(ref), ambito=html.escape(ambito), escenario=html.escape(escenario),
+        caudal=f"{caudal:.1f}", variacion=f"{variacion:.1f}", extra=extra,
+    )
+
+
+def eventos_html(tabla, max_filas=10):
+    """Tabla HTML de los eventos más severos (sección extra del memo)"""
+    from modules.events import tabla_presentacion
+    if tabla is None or tabla.empty:
+        return "<p>Sin eventos de sequía ni inundación en el periodo.</p>"
+    filas = tabla_presentacion(tabla, max_filas).to_html(index=False, border=0)
+    return f"<h3>EVENTOS HIDROLÓGICOS ({len(tabla)})</h3>\n{filas}"
+
+
+def documento(cuerpos, titulo="Memorandum"):
+    """Documento HTML completo con uno o varios memos (un memo por página)"""
+    return Template(INICIO_DOCUMENTO).substitute(titulo=html.escape(titulo)) + "".join(cuerpos) + FIN_DOCUMENTO
+
+
+# --- 2. TAREAS (vectorizadas por serie y escenario) ---
+def tareas_serie(fechas, caudal_base, caudal_simulado, ambito, escenario, bloque=TAMANO_BLOQUE):
+    """Bloques de tareas (nombre, ref, ámbito, escenario, caudal, variación, código) de una serie"""
+    fechas = np.asarray(fechas, dtype="datetime64[M]").astype(str)
+    base = np.asarray(caudal_base, dtype=float)
+    simulado = np.asarray(caudal_simulado, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variacion = np.nan_to_num((simulado - base) / base * 100)
+    codigos = MOPE.clasificar(simulado)
+    clave = "".join(c if c.isalnum() else "_" for c in f"{ambito}_{escenario}").strip("_")
+    for inicio in range(0, len(fechas), bloque):
+        fin = min(inicio + bloque, len(fechas))
+        yield [
+            (f"{clave}/MEMO_INDRHI_{f}.html", f"PARGIRH-INT-{f.replace('-', '')}", ambito, escenario,
+             float(simulado[i]), float(variacion[i]), int(codigos[i]))
+            for i, f in zip(range(inicio, fin), fechas[inicio:fin])
+        ]
+
+
+def etiqueta_escenario(delta_lluvia, delta_temp):
+    return f"Lluvia {delta_lluvia:+g}% | Temp {delta_temp:+g}°C"
+
+
+def tareas_periodo(series, escenarios, bloque=TAMANO_BLOQUE):
+    """
+    Todas las combinaciones mes × serie × escenario.
+    series: [(ámbito, fechas, Caudal_IA)]; escenarios: [(delta_lluvia, delta_temp)]
+    """
+    from modules.engine import HydrologyEngine
+    for ambito, fechas, caudal in series:
+        caudal = np.asarray(caudal, dtype=float)
+        for delta_lluvia, delta_temp in escenarios:
+            simulado = caudal * float(HydrologyEngine.factores(delta_lluvia, delta_temp))
+            yield from tareas_serie(fechas, caudal, simulado, ambito, etiqueta_escenario(delta_lluvia, delta_temp), bloque)
+
+
+# --- 3. RENDER EN POOL DE PROCESOS ---
+def _render_bloque(bloque):
+    return [(nombre, render_cuerpo(*campos).encode("utf-8")) for nombre, *campos in bloque]
+
+
+def generar_memos(bloques, workers=None, total=None):
+    """(nombre, html) en orden; como máximo 2 bloques por proceso en vuelo (memoria acotada)"""
+    if workers is None:
+        workers = os.cpu_count() if total is None or total >= UMBRAL_PARALELO else 1
+    if workers <= 1:
+        for bloque in bloques:
+            yield from _render_bloque(bloque)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        en_vuelo = []
+        for bloque in bloques:
+            en_vuelo.append(pool.submit(_render_bloque, bloque))
+            if len(en_vuelo) >= 2 * workers:
+                yield from en_vuelo.pop(0).result()
+        for futuro in en_vuelo:
+            yield from futuro.result()
+
+
+# --- 4. SALIDAS EN BLOQUES ---
+class _Tubo(io.RawIOBase):
+    """Destino no buscable para zipfile: acumula bytes hasta que se vacían"""
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self.buffer.extend(datos)
+        return len(datos)
+
+    def vaciar(self):
+        datos = bytes(self.buffer)
+        self.buffer.clear()
+        return datos
+
+
+def zip_en_bloques(memos):
+    """ZIP emitido memo a memo (cada memo como documento HTML independiente)"""
+    tubo = _Tubo()
+    with zipfile.ZipFile(tubo, mode="w", compression=zipfile.ZIP_DEFLATED) as archivo:
+        for nombre, cuerpo in memos:
+            titulo = os.path.splitext(os.path.basename(nombre))[0]
+            archivo.writestr(nombre, documento([cuerpo.decode("utf-8")], titulo))
+            if tubo.buffer:
+                yield tubo.vaciar()
+    yield tubo.vaciar()
+
+
+def documento_en_bloques(memos, titulo="Memorándums RH-PARGIRH"):
+    """Un solo documento HTML multipágina emitido memo a memo"""
+    yield Template(INICIO_DOCUMENTO).substitute(titulo=html.escape(titulo)).encode("utf-8")
+    for _, cuerpo in memos:
+        yield cuerpo
+    yield FIN_DOCUMENTO.encode("utf-8")
+
+
+def a_archivo(bloques, limite=32 * 1024 * 1024):
+    """Archivo temporal rebobinado (en memoria hasta `limite`, luego en disco)"""
+    archivo = tempfile.SpooledTemporaryFile(max_size=limite)
+    for datos in bloques:
+        archivo.write(datos)
+    archivo.seek(0)
+    return archivo
+
+
+def series_gold(desde, hasta, estaciones=False):
+    """Series (ámbito, fechas, Caudal_IA) del almacén gold: la cuenca y, opcionalmente, cada estación"""
+    import pandas as pd
+    from modules.gold_store import read_gold_store
+
+    gold = os.path.join(BASE_DIR, "data", "gold")
+    df = read_gold_store(os.path.join(gold, "app_data_70years"), columnas=['Fecha', 'Caudal_IA'])
+    anos = df['Fecha'].dt.year
+    filtro = (anos >= desde) & (anos <= hasta)
+    series = [("Cuenca Yaque del Norte", df['Fecha'][filtro].to_numpy(), df['Caudal_IA'][filtro].to_numpy())]
+
+    if estaciones and os.path.exists(os.path.join(gold, "estaciones")):
+        df_est = read_gold_store(os.path.join(gold, "estaciones"), columnas=['grdc_no', 'Fecha', 'Caudal_IA'])
+        meta_path = os.path.join(gold, "estaciones.csv")
+        nombres = pd.read_csv(meta_path).set_index('grdc_no')['Estacion'].to_dict() if os.path.exists(meta_path) else {}
+        anos = df_est['Fecha'].dt.year
+        df_est = df_est[(anos >= desde) & (anos <= hasta)]
+        for grdc_no, grupo in df_est.groupby('grdc_no', sort=True):
+            ambito = f"{str(nombres.get(grdc_no, grdc_no)).title()} ({grdc_no})"
+            series.append((ambito, grupo['Fecha'].to_numpy(), grupo['Caudal_IA'].to_numpy()))
+    return series
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.memos", description="Memorándums por lotes (mes × estación × escenario)")
+    parser.add_argument("salida", help="Archivo de salida (.zip o .html)")
+    parser.add_argument("--desde", type=int, required=True, help="Año inicial")
+    parser.add_argument("--hasta", type=int, required=True, help="Año final")
+    parser.add_argument("--lluvia", type=float, nargs="+", default=[0.0], help="Deltas de lluvia (%%)")
+    parser.add_argument("--temp", type=float, nargs="+", default=[0.0], help="Deltas de temperatura (°C)")
+    parser.add_argument("--estaciones", action="store_true", help="Incluye un memo por estación GRDC")
+    parser.add_argument("--formato", choices=["zip", "html"], default=None, help="Por defecto según la extensión")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos de render")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    series = series_gold(args.desde, args.hasta, args.estaciones)
+    escenarios = [(dl, dt) for dl in args.lluvia for dt in args.temp]
+    total = sum(len(s[1]) for s in series) * len(escenarios)
+    memos = generar_memos(tareas_periodo(series, escenarios), workers=args.workers, total=total)
+
+    formato = args.formato or ("html" if args.salida.endswith(".html") else "zip")
+    bloques = zip_en_bloques(memos) if formato == "zip" else documento_en_bloques(memos)
+    with open(args.salida, "wb") as f:
+        for datos in bloques:
+            f.write(datos)
+    print(f"{total} memos escritos en {args.salida} ({time.perf_counter() - inicio:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
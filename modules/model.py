@@ -0,0 +1,176 @@
+"""
+Modelo Random Forest persistido, registro local de modelos entrenados y simulación climática
+con el modelo en el lazo.
+"""
+import functools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from modules.features import inercia_3meses
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELO_PATH = os.path.join(BASE_DIR, "models", "caudal_rf.joblib")
+REGISTRO_DIR = os.path.join(BASE_DIR, "models", "registry")
+
+COLUMNAS_MODELO = ['Precipitacion', 'Temperatura', 'Inercia_3meses', 'Mes']
+
+
+def guardar_modelo(modelo, ruta=MODELO_PATH):
+    import joblib # diferido: el núcleo sin interfaz no paga scikit-learn/joblib al importar
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    joblib.dump(modelo, ruta, compress=3)
+
+
+def _escribir_json(ruta, datos):
+    temporal = ruta + ".tmp"
+    with open(temporal, "w") as f:
+        json.dump(datos, f, indent=2, sort_keys=True)
+    os.replace(temporal, ruta) # los lectores ven el archivo viejo o el nuevo, nunca uno a medias
+
+
+class ModelRegistry:
+    """
+    Registro local de modelos: <directorio>/<clave>/{modelo.joblib, metricas.json} y el puntero
+    activo.json. La clave es un hash de los datos y parámetros de entrenamiento (modules/training.py).
+    """
+    def __init__(self, directorio=REGISTRO_DIR):
+        self.directorio = str(directorio)
+
+    def _ruta(self, *partes):
+        return os.path.join(self.directorio, *partes)
+
+    def ruta_modelo(self, clave):
+        return self._ruta(clave, "modelo.joblib")
+
+    def contiene(self, clave):
+        # metricas.json se escribe al final: su presencia indica una entrada completa
+        return os.path.exists(self._ruta(clave, "metricas.json"))
+
+    def metricas(self, clave):
+        with open(self._ruta(clave, "metricas.json")) as f:
+            return json.load(f)
+
+    def guardar(self, clave, modelo, metricas):
+        guardar_modelo(modelo, self.ruta_modelo(clave))
+        _escribir_json(self._ruta(clave, "metricas.json"), {**metricas, "clave": clave})
+
+    def activar(self, clave):
+        if not self.contiene(clave):
+            raise KeyError(f"Modelo no registrado: {clave}")
+        _escribir_json(self._ruta("activo.json"), {"clave": clave})
+
+    def clave_activa(self):
+        ruta = self._ruta("activo.json")
+        if not os.path.exists(ruta):
+            return None
+        with open(ruta) as f:
+            clave = json.load(f)["clave"]
+        return clave if self.contiene(clave) else None
+
+    def listar(self):
+        """Métricas de todos los modelos registrados, del más reciente al más antiguo"""
+        if not os.path.isdir(self.directorio):
+            return []
+        entradas = [self.metricas(c) for c in os.listdir(self.directorio) if self.contiene(c)]
+        return sorted(entradas, key=lambda m: m.get("creado", ""), reverse=True)
+
+
+def ruta_modelo_activo(registro=None):
+    """Artefacto del modelo activo del registro; sin modelo activo, el del pipeline (MODELO_PATH)"""
+    registro = registro or ModelRegistry()
+    clave = registro.clave_activa()
+    return registro.ruta_modelo(clave) if clave else MODELO_PATH
+
+
+@functools.lru_cache(maxsize=8)
+def _cargar_artefacto(ruta, mtime_ns, tamano):
+    import joblib
+    modelo = joblib.load(ruta)
+    modelo.n_jobs = -1 # Predicción en todos los núcleos
+    return modelo
+
+
+def firma_artefacto(ruta):
+    """(ruta, mtime, tamaño) del artefacto; None si no existe"""
+    if not os.path.exists(ruta):
+        return None
+    estado = os.stat(ruta)
+    return ruta, estado.st_mtime_ns, estado.st_size
+
+
+def cargar_modelo(ruta=None):
+    """
+    Carga el artefacto (por defecto, el modelo activo del registro) una vez por versión del archivo:
+    un 'build' que lo reescribe se recarga en la siguiente llamada. None si no existe (no se cachea).
+    """
+    firma = firma_artefacto(ruta or ruta_modelo_activo())
+    return _cargar_artefacto(*firma) if firma else None
+
+
+class ModelSimulator:
+    """
+    Reconstruye las variables perturbadas y las pasa por el Random Forest en un solo predict.
+    El resultado se expresa como delta sobre Caudal_IA, de modo que el escenario sin cambios
+    reproduce exactamente la línea base.
+    """
+
+    def __init__(self, df, modelo, cache_size=256):
+        self.df = df
+        self.modelo = modelo
+        # Copias propias (solo lectura al cachearse): la caché de variables las reconoce entre escenarios
+        self.precipitacion = np.array(df['Precipitacion'], dtype=float)
+        self.temperatura = df['Temperatura'].to_numpy(dtype=float)
+        self.inercia = np.array(df['Inercia_3meses'], dtype=float)
+        self.mes = df['Mes'].to_numpy(dtype=float)
+        self.caudal_ia = df['Caudal_IA'].to_numpy(dtype=float)
+        self._base = None
+        # Caché LRU acotada por escenario cuantizado
+        self._simular = functools.lru_cache(maxsize=cache_size)(self._simular_sin_cache)
+
+    @staticmethod
+    def cuantizar(lo, hi, delta_lluvia, delta_temp):
+        """Clave de escenario: lluvia en % entero, temperatura en décimas de grado"""
+        return int(lo), int(hi), int(round(delta_lluvia)), round(float(delta_temp), 1)
+
+    def features(self, lo, hi, delta_lluvia, delta_temp):
+        """Matriz de variables perturbadas para las filas [lo, hi)"""
+        factor = 1 + delta_lluvia / 100
+        # Inercia_3meses de la lluvia perturbada: la media móvil es lineal, así que basta escalar la
+        # de la lluvia base (calculada una vez por serie); sin historia suficiente, inercia base escalada
+        inercia = inercia_3meses(self.precipitacion, respaldo=self.inercia, cachear=True)[lo:hi] * factor
+
+        return np.column_stack([
+            self.precipitacion[lo:hi] * factor,
+            self.temperatura[lo:hi] + delta_temp,
+            inercia,
+            self.mes[lo:hi],
+        ])
+
+    def _predict(self, X):
+        return self.modelo.predict(pd.DataFrame(X, columns=COLUMNAS_MODELO))
+
+    def _prediccion_base(self):
+        if self._base is None:
+            base = np.column_stack([self.precipitacion, self.temperatura, self.inercia, self.mes])
+            self._base = self._predict(base)
+        return self._base
+
+    def _simular_sin_cache(self, lo, hi, delta_lluvia, delta_temp):
+        if delta_lluvia == 0 and delta_temp == 0:
+            resultado = self.caudal_ia[lo:hi].copy()
+        else:
+            X = self.features(lo, hi, delta_lluvia, delta_temp)
+            delta = self._predict(X) - self._prediccion_base()[lo:hi]
+            resultado = np.maximum(self.caudal_ia[lo:hi] + delta, 0.0)
+        resultado.setflags(write=False)
+        return resultado
+
+    def simular(self, lo, hi, delta_lluvia, delta_temp):
+        """Caudal_Simulado de las filas [lo, hi) para el escenario (cacheado)"""
+        return self._simular(*self.cuantizar(lo, hi, delta_lluvia, delta_temp))
+
+    def cache_info(self):
+        return self._simular.cache_info()
@@ -0,0 +1,405 @@
+"""
+Pipeline offline RAW -> SILVER -> GOLD (reemplaza las celdas del notebook).
+
+Uso:
+    python -m modules.pipeline build            # reconstruye solo las etapas con entradas nuevas
+    python -m modules.pipeline build --force    # reconstruye todo
+    python -m modules.pipeline convert          # CSV gold existente -> almacén columnar
+    python -m modules.pipeline export out.csv   # almacén columnar -> CSV de intercambio
+    python -m modules.pipeline update           # anexa los meses nuevos de SILVER sin reentrenar
+    python -m modules.pipeline update nuevos.csv  # ... o los de un CSV (Fecha, Precipitacion, Temperatura[, Caudal_Real])
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from modules.gold_store import write_gold_store, append_gold_store, read_gold_store, dataset_version, export_csv, SCHEMA
+from modules.model import guardar_modelo, cargar_modelo, COLUMNAS_MODELO
+from modules.features import media_movil # biblioteca de variables compartida (re-exportada aquí)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLUMNAS_GOLD = ['Fecha', 'Precipitacion', 'Temperatura', 'Caudal_Real', 'Inercia_3meses', 'Mes', 'Caudal_IA']
+
+
+# --- 1. UTILIDADES ---
+def hash_archivo(ruta, bloque=1 << 20):
+    """SHA-256 del contenido de un archivo, leído por bloques"""
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for chunk in iter(lambda: f.read(bloque), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def indice_mes(year, month):
+    """Mes absoluto (año * 12 + mes - 1): entero ordenable y sin timestamps"""
+    return int(year) * 12 + int(month) - 1
+
+
+def fechas_desde_indice(meses):
+    """Convierte índices de mes absolutos en datetime64 (primer día del mes)"""
+    meses = np.asarray(meses, dtype=np.int64)
+    return (meses - 1970 * 12).astype("datetime64[M]").astype("datetime64[ns]")
+
+
+def leer_ancho(ruta):
+    """
+    Lee un archivo ERA5 de una sola fila con columnas 'data/<var>/DOM/<YYYY-MM>'.
+    Recorre cabecera y valores en paralelo y devuelve {variable: (meses, valores)}
+    sin pasar por un formato largo.
+    """
+    acumulado = {}
+    with open(ruta, newline="") as f:
+        lector = csv.reader(f)
+        cabecera = next(lector)
+        valores = next(lector)
+
+    for columna, valor in zip(cabecera, valores):
+        partes = columna.split("/")
+        if len(partes) != 4 or partes[0] != "data" or valor == "":
+            continue
+        year, month = partes[3].split("-")
+        meses, datos = acumulado.setdefault(partes[1], ([], []))
+        meses.append(indice_mes(year, month))
+        datos.append(float(valor))
+
+    return {var: (np.array(m, dtype=np.int64), np.array(d, dtype=float)) for var, (m, d) in acumulado.items()}
+
+
+def leer_grdc(ruta):
+    """Lee GRDC-Monthly en streaming y devuelve (estaciones, meses, matriz estaciones × meses)"""
+    registros = {}
+    with open(ruta, newline="") as f:
+        for fila in csv.DictReader(f):
+            if fila["runoff_mean"] == "":
+                continue
+            month, _, year = fila["time"].split("/")
+            registros[(int(fila["id"]), indice_mes(year, month))] = float(fila["runoff_mean"])
+
+    estaciones = np.array(sorted({k[0] for k in registros}), dtype=np.int64)
+    meses = np.array(sorted({k[1] for k in registros}), dtype=np.int64)
+    matriz = np.full((len(estaciones), len(meses)), np.nan)
+    fila_de = {e: i for i, e in enumerate(estaciones)}
+    col_de = {m: j for j, m in enumerate(meses)}
+    for (estacion, mes), valor in registros.items():
+        matriz[fila_de[estacion], col_de[mes]] = valor
+    return estaciones, meses, matriz
+
+
+def promedio_variables(variables):
+    """Promedio mensual de todas las variables de un archivo (como el groupby del notebook)"""
+    meses = np.unique(np.concatenate([m for m, _ in variables.values()]))
+    suma = np.zeros(len(meses))
+    cuenta = np.zeros(len(meses))
+    for m, v in variables.values():
+        pos = np.searchsorted(meses, m)
+        np.add.at(suma, pos, v)
+        np.add.at(cuenta, pos, 1)
+    return meses, suma / cuenta
+
+
+# --- 2. PIPELINE CON MANIFIESTO ---
+class GoldPipeline:
+    def __init__(self, raw_dir=None, silver_dir=None, gold_dir=None, manifest_path=None, models_dir=None, workers=None):
+        self.raw_dir = raw_dir or os.path.join(BASE_DIR, "data", "raw")
+        self.silver_dir = silver_dir or os.path.join(BASE_DIR, "data", "silver")
+        self.gold_dir = gold_dir or os.path.join(BASE_DIR, "data", "gold")
+        self.manifest_path = manifest_path or os.path.join(BASE_DIR, "data", "manifest.json")
+        self.models_dir = models_dir or os.path.join(BASE_DIR, "models")
+        self.workers = workers
+
+        self.rutas = {
+            "precipitacion": os.path.join(self.raw_dir, "precipitation.csv"),
+            "temperatura": os.path.join(self.raw_dir, "temperatura.csv"),
+            "grdc": os.path.join(self.raw_dir, "GRDC-Monthly.csv"),
+            "cuencas": os.path.join(self.raw_dir, "stationbasins.csv"),
+            "clima": os.path.join(self.silver_dir, "clima.npz"),
+            "rio": os.path.join(self.silver_dir, "rio.npz"),
+            "gold": os.path.join(self.gold_dir, "app_data_70years.csv"),
+            "gold_store": os.path.join(self.gold_dir, "app_data_70years", SCHEMA),
+            "modelo": os.path.join(self.models_dir, "caudal_rf.joblib"),
+            "estaciones_store": os.path.join(self.gold_dir, "estaciones", SCHEMA),
+            "estaciones_meta": os.path.join(self.gold_dir, "estaciones.csv"),
+        }
+        self.etapas = {
+            "clima": (["precipitacion", "temperatura"], ["clima"], self._etapa_clima),
+            "rio": (["grdc"], ["rio"], self._etapa_rio),
+            "gold": (["clima", "rio"], ["gold", "gold_store", "modelo"], self._etapa_gold),
+            "estaciones": (["clima", "rio", "cuencas"], ["estaciones_store", "estaciones_meta"], self._etapa_estaciones),
+        }
+
+    def _leer_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        return {"etapas": {}}
+
+    def _guardar_manifest(self, manifest):
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        with open(self.manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+    def _firma(self, claves):
+        return {k: hash_archivo(self.rutas[k]) for k in claves}
+
+    def _al_dia(self, registro, entradas, salidas):
+        """Una etapa está al día si sus entradas no cambiaron y sus salidas siguen intactas"""
+        if not registro or registro.get("entradas") != entradas:
+            return False
+        for clave, h in registro.get("salidas", {}).items():
+            if not os.path.exists(self.rutas[clave]) or hash_archivo(self.rutas[clave]) != h:
+                return False
+        return True
+
+    def run(self, force=False, verbose=True, solo=None):
+        """Ejecuta las etapas en orden (o solo las indicadas); devuelve {etapa: 'ok' | 'omitida'}"""
+        manifest = self._leer_manifest()
+        estado = {}
+        for nombre, (entradas, salidas, funcion) in self.etapas.items():
+            if solo is not None and nombre not in solo:
+                continue
+            firma = self._firma(entradas)
+            if not force and self._al_dia(manifest["etapas"].get(nombre), firma, salidas):
+                estado[nombre] = "omitida"
+            else:
+                inicio = time.perf_counter()
+                for clave in salidas:
+                    os.makedirs(os.path.dirname(self.rutas[clave]), exist_ok=True)
+                funcion()
+                manifest["etapas"][nombre] = {
+                    "entradas": firma,
+                    "salidas": self._firma(salidas),
+                    "segundos": round(time.perf_counter() - inicio, 4),
+                }
+                estado[nombre] = "ok"
+            if verbose:
+                print(f"[{nombre}] {estado[nombre]}")
+        self._guardar_manifest(manifest)
+        return estado
+
+    def actualizar(self, nuevos=None, modelo=None, verbose=True):
+        """
+        Anexa al gold los meses posteriores al último (de un DataFrame o, si no se da, de SILVER)
+        sin reentrenar ni volver a predecir la historia. Devuelve {'filas', 'version'}.
+        """
+        store_dir = os.path.dirname(self.rutas["gold_store"])
+        previas = read_gold_store(store_dir, columnas=['Fecha', 'Precipitacion']).iloc[-2:]
+        desde_silver = nuevos is None
+        if desde_silver:
+            self.run(solo=["clima", "rio"], verbose=verbose)
+            nuevos = self._meses_silver(previas['Fecha'].iloc[-1])
+        modelo = modelo if modelo is not None else cargar_modelo(self.rutas["modelo"])
+        if modelo is None:
+            raise FileNotFoundError("No hay modelo entrenado: ejecute 'build' antes de 'update'")
+
+        df = filas_nuevas(previas, nuevos, modelo)
+        if len(df):
+            append_gold_store(df, store_dir)
+            salida = df.copy()
+            salida['Fecha'] = salida['Fecha'].dt.strftime('%Y-%m-%d')
+            salida.to_csv(self.rutas["gold"], mode="a", header=False, index=False)
+
+            # El manifiesto registra las salidas nuevas: 'build' no rehace la etapa gold por este anexo
+            manifest = self._leer_manifest()
+            registro = manifest["etapas"].get("gold")
+            if registro:
+                registro["salidas"] = self._firma(["gold", "gold_store", "modelo"])
+                if desde_silver:
+                    # Las entradas (SILVER recién regenerado) ya están incorporadas al gold
+                    registro["entradas"] = self._firma(self.etapas["gold"][0])
+                registro["incremental"] = registro.get("incremental", 0) + len(df)
+                self._guardar_manifest(manifest)
+
+        version = dataset_version(store_dir)
+        if verbose:
+            print(f"[update] {len(df)} meses nuevos, versión {version}")
+        return {"filas": len(df), "version": version}
+
+    def _meses_silver(self, ultima_fecha):
+        """Meses de SILVER posteriores a la última fecha del gold (solo esos se leen del río)"""
+        ultimo = indice_mes(ultima_fecha.year, ultima_fecha.month)
+        with np.load(self.rutas["clima"]) as clima, np.load(self.rutas["rio"]) as rio:
+            nuevos = clima["meses"] > ultimo
+            meses = clima["meses"][nuevos]
+            en_rio = rio["meses"] > ultimo
+            caudal_real = caudal_real_promedio(meses, rio["meses"][en_rio], rio["caudal"][:, en_rio])
+            return pd.DataFrame({
+                'Fecha': fechas_desde_indice(meses),
+                'Precipitacion': clima["Precipitacion"][nuevos],
+                'Temperatura': clima["Temperatura"][nuevos],
+                'Caudal_Real': caudal_real,
+            })
+
+    # --- Etapas ---
+    def _etapa_clima(self):
+        """RAW (ERA5 ancho) -> SILVER: arreglos por variable + promedios mensuales"""
+        pr = leer_ancho(self.rutas["precipitacion"])
+        tas = leer_ancho(self.rutas["temperatura"])
+        meses_pr, precipitacion = promedio_variables(pr)
+        meses_tas, temperatura = promedio_variables(tas)
+
+        # Unión interna por mes
+        meses, i_pr, i_tas = np.intersect1d(meses_pr, meses_tas, return_indices=True)
+        arrays = {f"var_{k}": v for k, (_, v) in {**pr, **tas}.items()}
+        arrays.update({f"meses_{k}": m for k, (m, _) in {**pr, **tas}.items()})
+        np.savez(self.rutas["clima"], meses=meses, Precipitacion=precipitacion[i_pr],
+                 Temperatura=temperatura[i_tas], **arrays)
+
+    def _etapa_rio(self):
+        """RAW (GRDC) -> SILVER: matriz estaciones × meses"""
+        estaciones, meses, matriz = leer_grdc(self.rutas["grdc"])
+        np.savez(self.rutas["rio"], estaciones=estaciones, meses=meses, caudal=matriz)
+
+    def _etapa_gold(self):
+        """SILVER -> GOLD: inercia, entrenamiento Random Forest (persistido) y reconstrucción de Caudal_IA"""
+        df, modelo = construir_gold(self.rutas["clima"], self.rutas["rio"])
+        guardar_modelo(modelo, self.rutas["modelo"])
+        write_gold_store(df, os.path.dirname(self.rutas["gold_store"]))
+        salida = df.copy()
+        salida['Fecha'] = salida['Fecha'].dt.strftime('%Y-%m-%d')
+        salida.to_csv(self.rutas["gold"], index=False)
+
+    def _etapa_estaciones(self):
+        """SILVER -> GOLD multi-estación: un modelo por grdc_no, entrenado en paralelo"""
+        from modules.stations import construir_estaciones, leer_metadatos
+        df = construir_estaciones(self.rutas["clima"], self.rutas["rio"], workers=self.workers)
+        write_gold_store(df, os.path.dirname(self.rutas["estaciones_store"]))
+        leer_metadatos(self.rutas["cuencas"]).to_csv(self.rutas["estaciones_meta"], index=False)
+
+
+def alinear_meses(meses, meses_origen, valores):
+    """Reubica una serie mensual sobre el calendario `meses` (NaN donde no hay dato)"""
+    salida = np.full(len(meses), np.nan)
+    _, i_destino, i_origen = np.intersect1d(meses, meses_origen, return_indices=True)
+    salida[i_destino] = valores[i_origen]
+    return salida
+
+
+def tabla_base(meses, precipitacion, temperatura, caudal_real):
+    """Variables físicas (Inercia, Mes); se descartan los primeros meses sin ventana completa"""
+    inercia = media_movil(precipitacion, 3)
+    valido = ~np.isnan(inercia)
+    return pd.DataFrame({
+        'Fecha': fechas_desde_indice(meses[valido]),
+        'Precipitacion': precipitacion[valido],
+        'Temperatura': temperatura[valido],
+        'Caudal_Real': caudal_real[valido],
+        'Inercia_3meses': inercia[valido],
+        'Mes': (meses[valido] % 12 + 1).astype(np.int64),
+    })
+
+
+def entrenar_y_predecir(df, n_jobs=-1):
+    """Entrena solo donde hay datos reales y reconstruye Caudal_IA en toda la serie"""
+    train = df.dropna(subset=['Caudal_Real'])
+    modelo = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=n_jobs)
+    modelo.fit(train[COLUMNAS_MODELO], train['Caudal_Real'])
+    df['Caudal_IA'] = modelo.predict(df[COLUMNAS_MODELO])
+    return df[COLUMNAS_GOLD], modelo
+
+
+def construir_gold(ruta_clima, ruta_rio):
+    """Arma el DataFrame gold a partir de los arreglos SILVER; devuelve (df, modelo)"""
+    with np.load(ruta_clima) as clima, np.load(ruta_rio) as rio:
+        meses = clima["meses"]
+        precipitacion = clima["Precipitacion"]
+        temperatura = clima["Temperatura"]
+
+        caudal_real = caudal_real_promedio(meses, rio["meses"], rio["caudal"])
+
+    return entrenar_y_predecir(tabla_base(meses, precipitacion, temperatura, caudal_real))
+
+
+def caudal_real_promedio(meses, meses_rio, caudal):
+    """Caudal real = promedio de estaciones disponibles en cada mes, sobre el calendario `meses`"""
+    con_dato = ~np.all(np.isnan(caudal), axis=0)
+    promedio_rio = np.full(caudal.shape[1], np.nan)
+    promedio_rio[con_dato] = np.nanmean(caudal[:, con_dato], axis=0)
+    return alinear_meses(meses, meses_rio, promedio_rio)
+
+
+# --- 3. ACTUALIZACIÓN INCREMENTAL ---
+def filas_nuevas(previas, nuevos, modelo):
+    """
+    Filas gold de los meses posteriores a `previas` (las dos últimas bastan para la inercia).
+    Solo se calculan las variables de esas filas y Caudal_IA con el modelo ya entrenado.
+    """
+    ultimo = indice_mes(previas['Fecha'].iloc[-1].year, previas['Fecha'].iloc[-1].month)
+    fechas = pd.to_datetime(nuevos['Fecha'])
+    meses = (fechas.dt.year * 12 + fechas.dt.month - 1).to_numpy(dtype=np.int64)
+    orden = np.argsort(meses, kind="stable")
+    meses, nuevos = meses[orden], nuevos.iloc[orden]
+    posteriores = meses > ultimo # los meses ya presentes se ignoran (actualización idempotente)
+    meses, nuevos = meses[posteriores], nuevos[posteriores]
+    if len(meses) == 0:
+        return pd.DataFrame(columns=COLUMNAS_GOLD)
+    if meses[0] != ultimo + 1 or np.any(np.diff(meses) != 1):
+        raise ValueError("Los meses nuevos deben continuar la serie gold sin huecos ni duplicados")
+
+    # Inercia: ventana de 3 meses que arranca con las 2 últimas precipitaciones del gold
+    precipitacion = nuevos['Precipitacion'].to_numpy(dtype=float)
+    cola = previas['Precipitacion'].to_numpy(dtype=float)[-2:]
+    df = pd.DataFrame({
+        'Fecha': fechas_desde_indice(meses),
+        'Precipitacion': precipitacion,
+        'Temperatura': nuevos['Temperatura'].to_numpy(dtype=float),
+        'Caudal_Real': nuevos['Caudal_Real'].to_numpy(dtype=float) if 'Caudal_Real' in nuevos else np.nan,
+        'Inercia_3meses': media_movil(np.concatenate([cola, precipitacion]), 3)[len(cola):],
+        'Mes': (meses % 12 + 1).astype(np.int64),
+    })
+    df['Caudal_IA'] = modelo.predict(df[COLUMNAS_MODELO])
+    return df[COLUMNAS_GOLD]
+
+
+# --- 4. CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.pipeline", description="Pipeline offline RAW -> GOLD")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    build = sub.add_parser("build", help="Reconstruye las etapas cuyas entradas cambiaron")
+    build.add_argument("--raw", default=None, help="Directorio de datos crudos")
+    build.add_argument("--gold", default=None, help="Directorio de salida gold")
+    build.add_argument("--force", action="store_true", help="Ignora el manifiesto y reconstruye todo")
+    build.add_argument("--solo", nargs="+", default=None, help="Etapas a ejecutar (por defecto todas)")
+    build.add_argument("--workers", type=int, default=None, help="Procesos para el entrenamiento por estación")
+    convert = sub.add_parser("convert", help="Convierte el CSV gold en almacén columnar")
+    convert.add_argument("--gold", default=None, help="Directorio gold")
+    export = sub.add_parser("export", help="Exporta el almacén columnar a CSV")
+    export.add_argument("destino", help="Ruta del CSV de salida")
+    export.add_argument("--gold", default=None, help="Directorio gold")
+    update = sub.add_parser("update", help="Anexa los meses nuevos sin reconstruir la historia")
+    update.add_argument("nuevos", nargs="?", default=None, help="CSV con Fecha, Precipitacion, Temperatura[, Caudal_Real]")
+    update.add_argument("--raw", default=None, help="Directorio de datos crudos (sin CSV: meses nuevos de SILVER)")
+    update.add_argument("--gold", default=None, help="Directorio gold")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    opciones = {"raw_dir": args.raw, "workers": args.workers} if args.comando == "build" else {}
+    if args.comando == "update":
+        opciones = {"raw_dir": args.raw}
+    pipeline = GoldPipeline(gold_dir=args.gold, **opciones)
+    store_dir = os.path.dirname(pipeline.rutas["gold_store"])
+    if args.comando == "build":
+        pipeline.run(force=args.force, solo=args.solo)
+    elif args.comando == "update":
+        pipeline.actualizar(pd.read_csv(args.nuevos) if args.nuevos else None)
+    elif args.comando == "convert":
+        df = pd.read_csv(pipeline.rutas["gold"])
+        df['Fecha'] = pd.to_datetime(df['Fecha'])
+        write_gold_store(df, store_dir)
+        print(f"Almacén columnar escrito en {store_dir}")
+    else:
+        export_csv(store_dir, args.destino)
+        print(f"CSV exportado en {args.destino}")
+    print(f"Completado en {time.perf_counter() - inicio:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
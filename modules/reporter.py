@@ -1,7 +1,14 @@
 import streamlit as st
+import pandas as pd
+from modules.rules import MOPE
+from modules.memos import MEMOS, render_cuerpo, documento, eventos_html, tareas_serie, generar_memos, zip_en_bloques, a_archivo
+from modules.events import tabla_presentacion
+from modules.tracing import traced
+from modules.compact import columna
 
 class ReportGenerator:
-    def render_button(self, df_view, kpis):
+    @traced()
+    def render_button(self, df_view, kpis, eventos=None):
         st.markdown("---")
         st.subheader("📄 Generador de Memorándums de Inteligencia")
         st.info("Generación de directrices operativas basadas en el Manual de Operación de Presas y Embalses (MOPE).")
@@ -19,68 +26,26 @@ class ReportGenerator:
 
         # 3. Mostrar reporte si está activo
         if st.session_state.show_report:
-            self._generate_memo(df_view, kpis)
+            self._generate_memo(df_view, kpis, eventos)
 
-    def _generate_memo(self, df_view, kpis):
+    def _generate_memo(self, df_view, kpis, eventos=None):
         # Desempaquetar datos
-        fecha_rep = df_view['Fecha'].max().strftime('%Y-%m')
+        fecha_rep = pd.Timestamp(columna(df_view, 'Fecha').max()).strftime('%Y-%m')
         promedio_actual = kpis['promedio']
         variacion = kpis['variacion']
         inercia_promedio = kpis['inercia']
-        estado_texto = kpis['estado_texto']
         
-        # Lógica de Negocio Avanzada (La versión buena)
-        if "CRISIS" in estado_texto:
-            estilo = {
-                "color": "#d92b2b", 
-                "bg": "#ffe6e6", 
-                "titulo": "🚨 URGENTE: DECLARATORIA DE DESASTRE HÍDRICO",
-                "borde": "red"
-            }
-            impacto_agro = """
-            * **Arroz (Bajo Yaque):** Pérdida total proyectada (100%) por inviabilidad de inundación.
-            * **Banano (Línea Noroeste):** Estrés severo. Se requiere auxilio de pozos tubulares.
-            * **Ganadería:** Riesgo alto en Montecristi.
-            """
-            impacto_urbano = "**CORAASAN (Santiago):** Déficit del 40%. Racionamiento obligatorio (48h)."
-            acciones = [
-                "🔴 **CIERRE TOTAL** del Canal Monsieur Bogaert y UFE.",
-                "🔴 Operación de Presa Tavera-Bao en cota mínima (solo humano).",
-                "🔴 Activación del Fondo de Contingencia (Aseguradora Agropecuaria)."
-            ]
-            
-        elif "ALERTA" in estado_texto:
-            estilo = {
-                "color": "#ff9900", 
-                "bg": "#fff8e6", 
-                "titulo": "⚠️ AVISO: RESTRICCIÓN PREVENTIVA",
-                "borde": "orange"
-            }
-            impacto_agro = """
-            * **Arroz:** Prohibición de siembra de tercera etapa ("Viveros").
-            * **Turnos de Riego:** Reducción a 3 días por semana.
-            """
-            impacto_urbano = "**Acueductos Rurales:** Reducción de presión nocturna."
-            acciones = [
-                "🟡 Reducción del 30% en válvulas de salida.",
-                "🟡 Suspensión de lavado de vehículos en Santiago.",
-                "🟡 Monitoreo diario de infiltración."
-            ]
-            
-        else:
-            estilo = {
-                "color": "#28a745", 
-                "bg": "#e6f9e9", 
-                "titulo": "✅ INFORME OPERATIVO: ESTABILIDAD",
-                "borde": "green"
-            }
-            impacto_agro = "**Ciclo de Siembra:** Garantizado al 100%."
-            impacto_urbano = "Abastecimiento continuo (24/7)."
-            acciones = [
-                "🟢 Mantener curva guía de operación.",
-                "🟢 Mantenimiento preventivo de compuertas.",
-                "🟢 Maximizar generación hidroeléctrica."
-            ]
+        # Contenido del memo según el código MOPE (misma tabla que el motor y Gobernabilidad)
+        codigo = kpis.get('codigo_estado', int(MOPE.clasificar(promedio_actual)))
+        if codigo is None:
+            st.warning("Sin datos de caudal en el rango seleccionado: no se emite memorándum.")
+            return
+        regla = MOPE.regla(codigo)
+        memo = MEMOS[codigo]
+        estilo, impacto_agro, impacto_urbano, acciones = memo["estilo"], memo["agro"], memo["urbano"], memo["acciones"]
+        # Meses del periodo en cada nivel (clasificación mes a mes, no solo del promedio)
+        conteos = MOPE.conteos(MOPE.clasificar(columna(df_view, 'Caudal_Simulado')))
+        resumen_meses = " | ".join(f"{MOPE.niveles[c]}: {int(conteos[c])}" for c in sorted(MOPE.reglas, reverse=True))
 
         # RENDERIZADO DEL DOCUMENTO (Estilo Hoja Oficial)
         with st.container(border=True):
@@ -103,17 +68,22 @@ class ReportGenerator:
                 * 🌊 **Caudal Proyectado:** `{promedio_actual:.1f} m³/s`
                 * 📉 **Variación Histórica:** `{variacion:.1f}%`
                 * 🏜️ **Inercia del Suelo:** `{inercia_promedio:.1f} mm`
+                * 🗓️ **Meses por nivel MOPE:** {resumen_meses}
                 """)
                 
                 st.markdown("### 2. IMPACTO SOCIOECONÓMICO")
-                if "CRISIS" in estado_texto:
-                    st.error(impacto_agro)
-                    st.error(impacto_urbano)
-                elif "ALERTA" in estado_texto:
-                    st.warning(impacto_agro)
-                    st.warning(impacto_urbano)
-                else:
-                    st.success(impacto_agro)
+                caja = getattr(st, regla['color']) # st.error / st.warning / st.success
+                caja(impacto_agro)
+                if codigo > 0:
+                    caja(impacto_urbano)
+
+                if eventos is not None:
+                    st.markdown("### 4. EVENTOS HIDROLÓGICOS")
+                    if eventos.empty:
+                        st.markdown("Sin eventos de sequía ni inundación en el periodo.")
+                    else:
+                        st.dataframe(tabla_presentacion(eventos, max_filas=10), hide_index=True, use_container_width=True)
+                        st.caption(f"Los 10 eventos más severos de {len(eventos)} (déficit o exceso acumulado).")
             
             with col_der:
                 st.markdown("### 3. DIRECTRICES OPERATIVAS")
@@ -124,34 +94,41 @@ class ReportGenerator:
                 st.markdown("---")
                 st.caption("🔒 Documento oficial generado por Sistema DSS. Firma digital válida.")
                 
-        html_content = f"""
-        <html>
-        <head><title>Memorandum {fecha_rep}</title></head>
-        <body style="font-family: sans-serif; padding: 40px;">
-            <h1 style="color: #003366;">🇩🇴 INDRHI / COPRE</h1>
-            <hr>
-            <h3>ASUNTO: {estilo['titulo']}</h3>
-            <p><strong>REF:</strong> PARGIRH-INT-{fecha_rep}</p>
-            <br>
-            <div style="background-color: {estilo['bg']}; padding: 20px; border-left: 5px solid {estilo['color']};">
-                <h3>DIAGNÓSTICO</h3>
-                <p>Caudal Proyectado: <strong>{promedio_actual:.1f} m³/s</strong></p>
-                <p>Variación: <strong>{variacion:.1f}%</strong></p>
-            </div>
-            <br>
-            <h3>ÓRDENES OPERATIVAS</h3>
-            <ul>
-                {''.join([f'<li>{acc}</li>' for acc in acciones])}
-            </ul>
-            <hr>
-            <p style="font-size: small; color: gray;">Generado por Inteligencia Artificial RH-PARGIRH</p>
-        </body>
-        </html>
-        """
-        
+        # Misma plantilla precompilada que el motor de memos por lotes
+        cuerpo = render_cuerpo(
+            f"PARGIRH-INT-{fecha_rep.replace('-', '')}", "Cuenca Yaque del Norte", "Vista actual",
+            promedio_actual, variacion, codigo,
+            extra=f"<p>Meses por nivel MOPE: <strong>{resumen_meses}</strong></p>"
+                  + ("" if eventos is None else eventos_html(eventos)),
+        )
+        html_content = documento([cuerpo], f"Memorandum {fecha_rep}")
+
         st.download_button(
             label="📥 Descargar Documento Oficial",
             data=html_content,
             file_name=f"MEMO_INDRHI_{fecha_rep}.html",
             mime="text/html"
-        )
\ No newline at end of file
+        )
+
+        self._render_lote(df_view)
+
+    def _render_lote(self, df_view):
+        """Un memo por mes de la vista, empaquetados en ZIP al pulsar el botón"""
+        n = len(df_view)
+        # Arreglos de la SimulationView (sin copia); las fechas se decodifican una vez para el lote
+        fechas = columna(df_view, 'Fecha')
+        base = columna(df_view, 'Caudal_IA')
+        simulado = columna(df_view, 'Caudal_Simulado')
+        desde, hasta = pd.Timestamp(fechas.min()), pd.Timestamp(fechas.max())
+
+        def construir_zip():
+            # Se ejecuta al descargar; los bloques del ZIP se vuelcan a un archivo temporal
+            bloques = tareas_serie(fechas, base, simulado, "Cuenca Yaque del Norte", "Vista actual")
+            return a_archivo(zip_en_bloques(generar_memos(bloques, total=n)))
+
+        st.download_button(
+            label=f"📦 Descargar los {n} memorándums mensuales del periodo (ZIP)",
+            data=construir_zip,
+            file_name=f"MEMOS_INDRHI_{desde:%Y%m}_{hasta:%Y%m}.zip",
+            mime="application/zip"
+        )
@@ -0,0 +1,137 @@
+"""
+Reglas del MOPE (Manual de Operación de Presas y Embalses) como tabla declarativa.
+La tabla se compila en arreglos NumPy: un np.searchsorted clasifica cualquier matriz de
+caudales (escenarios × meses) y los niveles, acciones e impactos se obtienen por indexado.
+"""
+import numpy as np
+import pandas as pd
+
+SECTORES = ("Agro", "Urbano", "Energia")
+
+# Cada regla aplica a caudales por debajo de "hasta" (m³/s) y por encima de la regla anterior.
+# Código: 0 = Normalidad, 1 = Alerta, 2 = Crisis (mismo orden que el cubo de escenarios del motor)
+REGLAS_MOPE = (
+    {
+        "hasta": 25.0,
+        "codigo": 2,
+        "nivel": "EMERGENCIA ROJA",
+        "estado": "CRISIS HÍDRICA",
+        "icono": "🔴",
+        "color_kpi": "inverse",
+        "color": "error",
+        "accion": "CIERRE TOTAL DE RIEGO AGRÍCOLA",
+        "prioridad": "Consumo Humano Exclusivo",
+        "fundamento": "Art. 4 Reglamento de Aguas y Resolución INDRHI-2025",
+        "impacto_social": {"Agro": 0, "Urbano": 100, "Energia": 20},
+    },
+    {
+        "hasta": 40.0,
+        "codigo": 1,
+        "nivel": "ALERTA AMARILLA",
+        "estado": "ALERTA PREVENTIVA",
+        "icono": "🟡",
+        "color_kpi": "off",
+        "color": "warning",
+        "accion": "TANDEO (Turnos de 12 horas)",
+        "prioridad": "Riego Restringido + Consumo Humano",
+        "fundamento": "Protocolo de Sequía Estacional - Fase 2",
+        "impacto_social": {"Agro": 50, "Urbano": 90, "Energia": 60},
+    },
+    {
+        "hasta": np.inf,
+        "codigo": 0,
+        "nivel": "NORMALIDAD VERDE",
+        "estado": "NORMALIDAD",
+        "icono": "🟢",
+        "color_kpi": "normal",
+        "color": "success",
+        "accion": "OPERACIÓN ESTÁNDAR",
+        "prioridad": "Todos los sectores garantizados",
+        "fundamento": "Manual de Operación de Presas (MOPE)",
+        "impacto_social": {"Agro": 100, "Urbano": 100, "Energia": 100},
+    },
+)
+
+
+class MOPERules:
+    def __init__(self, reglas=REGLAS_MOPE):
+        reglas = sorted(reglas, key=lambda r: r["hasta"])
+        if not np.isinf(reglas[-1]["hasta"]):
+            raise ValueError("La última regla debe cubrir cualquier caudal (hasta = inf)")
+
+        # 1. Compilación: límites ordenados y código de cada tramo
+        self.limites = np.array([r["hasta"] for r in reglas[:-1]], dtype=float)
+        self.tramos = np.array([r["codigo"] for r in reglas], dtype=np.uint8)
+
+        # 2. Tablas indexadas por código
+        self.reglas = {int(r["codigo"]): r for r in reglas}
+        self.n_niveles = max(self.reglas) + 1
+        self.niveles = np.array([self.reglas[c]["nivel"] for c in range(self.n_niveles)], dtype=object)
+        self.acciones = np.array([self.reglas[c]["accion"] for c in range(self.n_niveles)], dtype=object)
+        self.impactos = np.array([[self.reglas[c]["impacto_social"][s] for s in SECTORES]
+                                  for c in range(self.n_niveles)], dtype=float)
+
+    def clasificar(self, caudales):
+        """Caudales de cualquier forma -> códigos MOPE de la misma forma"""
+        return self.tramos[np.searchsorted(self.limites, np.asarray(caudales, dtype=float), side="right")]
+
+    def regla(self, codigo):
+        return self.reglas[int(codigo)]
+
+    def evaluar(self, caudal):
+        """Regla completa (nivel, acción, fundamento, impacto) para un caudal escalar"""
+        return self.regla(self.clasificar(caudal))
+
+    def conteos(self, codigos):
+        """Meses por nivel: (... × N) -> (... × niveles)"""
+        codigos = np.asarray(codigos, dtype=np.int64)
+        filas = codigos.reshape(-1, codigos.shape[-1])
+        desplazado = filas + self.n_niveles * np.arange(len(filas))[:, None]
+        tabla = np.bincount(desplazado.ravel(), minlength=len(filas) * self.n_niveles)
+        return tabla.reshape(codigos.shape[:-1] + (self.n_niveles,))
+
+    def transiciones(self, codigos):
+        """Cambios de nivel mes a mes: (... × N) -> (... × desde × hacia)"""
+        codigos = np.asarray(codigos, dtype=np.int64)
+        k = self.n_niveles
+        filas = codigos.reshape(-1, codigos.shape[-1])
+        pares = filas[:, :-1] * k + filas[:, 1:] + (k * k) * np.arange(len(filas))[:, None]
+        tabla = np.bincount(pares.ravel(), minlength=len(filas) * k * k)
+        return tabla.reshape(codigos.shape[:-1] + (k, k))
+
+    def evaluar_lote(self, caudales):
+        """Todos los meses de todos los escenarios en una pasada: códigos, impactos, conteos y transiciones"""
+        codigos = self.clasificar(np.atleast_2d(caudales))
+        return {
+            "codigos": codigos,
+            "impactos": self.impactos[codigos], # (E × N × sectores)
+            "conteos": self.conteos(codigos),
+            "transiciones": self.transiciones(codigos),
+        }
+
+    def timeline(self, fechas, caudales):
+        """Línea de tiempo de decisiones de un escenario: una fila por mes"""
+        codigos = self.clasificar(caudales)
+        tabla = pd.DataFrame({
+            'Fecha': np.asarray(fechas),
+            'Caudal': np.asarray(caudales, dtype=float),
+            'Codigo': codigos,
+            'Nivel': self.niveles[codigos],
+            'Accion': self.acciones[codigos],
+        })
+        impactos = self.impactos[codigos]
+        for s, sector in enumerate(SECTORES):
+            tabla[sector] = impactos[:, s]
+        return tabla
+
+    def tabla_transiciones(self, codigos):
+        """Matriz de transiciones con los nombres de nivel (filas: desde, columnas: hacia)"""
+        nombres = list(self.niveles)
+        return pd.DataFrame(self.transiciones(codigos), index=nombres, columns=nombres)
+
+
+MOPE = MOPERules()
+
+# Umbrales derivados de la tabla (m³/s)
+UMBRAL_CRISIS = float(MOPE.limites[0])
+UMBRAL_ALERTA = float(MOPE.limites[1])
@@ -1,8 +1,19 @@
 import streamlit as st
 import os
+from modules.tracing import traced
 
 class Sidebar:
-    def render_sources(self):
+    @staticmethod
+    def texto_validacion(metricas=None):
+        """Línea de validación del modelo: R² fuera de muestra del registro o, sin él, el ajuste original"""
+        if not metricas:
+            return "* *Validación:* R² = 0.97 sobre los datos de entrenamiento (sin validación cruzada; `python -m modules.training`)."
+        cv = metricas["cv"]
+        return (f"* *Validación:* R² = {cv['r2']:.2f} ± {cv['r2_std']:.2f} fuera de muestra "
+                f"(TimeSeriesSplit, {cv['pliegues']} pliegues; MAE {cv['mae']:.1f} m³/s). "
+                f"Modelo `{metricas['clave']}`, {metricas['filas']} meses {metricas['periodo'][0][:4]}–{metricas['periodo'][1][:4]}.")
+
+    def render_sources(self, metricas_modelo=None):
         """Renderiza la sección de fuentes y metodología (La Justificación del Reporte)"""
         with st.sidebar:
             st.markdown("---")
@@ -16,7 +27,7 @@ class Sidebar:
                 **2. Modelo Predictivo (IA):**
                 * *Algoritmo:* Random Forest Regressor (Scikit-Learn).
                 * *Entrenamiento:* Periodo 1976-1984 (Ground Truth).
-                * *Validación:* R² = 0.97 (Alta Precisión).
+                {validacion}
                 
                 **3. Impacto Económico:**
                 * *Producción:* Censo Agropecuario 2023 (Ministerio de Agricultura).
@@ -24,11 +35,12 @@ class Sidebar:
                 
                 **4. Protocolos de Actuación:**
                 * Basado en el "Manual de Operación de Presas y Embalses (MOPE)" del INDRHI.
-                """)
+                """.format(validacion=self.texto_validacion(metricas_modelo)))
                 st.info("Sistema auditado conforme a estándares ISO-31000 de Gestión de Riesgos.")
                 st.caption("v1.0.5 | Hackathon Build")
 
-    def render(self, df):
+    @traced()
+    def render(self, df, modelo_disponible=False, metricas_modelo=None):
         with st.sidebar:
             # A. LOGO PRINCIPAL
             if os.path.exists("assets/logo.png"):
@@ -51,13 +63,23 @@ class Sidebar:
             st.subheader("🧪 Simulador Climático")
             lluvia = st.slider("🌧️ Lluvia (%)", -50, 50, 0)
             temp = st.slider("🌡️ Temperatura (+°C)", 0.0, 3.0, 0.0, step=0.1)
+            motor = "factores"
+            if modelo_disponible:
+                opcion = st.radio("Motor de simulación", ["Factores físicos", "Modelo IA (Random Forest)"], horizontal=True)
+                motor = "ia" if opcion.startswith("Modelo") else "factores"
+                if metricas_modelo:
+                    st.caption(f"🧠 R² validación cruzada temporal: {metricas_modelo['cv']['r2']:.2f} "
+                               f"± {metricas_modelo['cv']['r2_std']:.2f}")
+            ensamble = st.toggle("🎲 Ensamble Monte Carlo (1.000 miembros)", value=False)
             
             # D. LLAMADA A LA JUSTIFICACIÓN (AQUÍ ESTÁ LA CLAVE)
-            self.render_sources()
+            self.render_sources(metricas_modelo)
             
             # Retorno de valores al motor
             return {
                 "rango": rango,
                 "delta_lluvia": lluvia,
-                "delta_temp": temp
+                "delta_temp": temp,
+                "motor": motor,
+                "ensamble": ensamble
             }
\ No newline at end of file
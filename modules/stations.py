@@ -0,0 +1,110 @@
+"""
+Modelo multi-estación: datos gold y motor hidrológico por estación GRDC (grdc_no).
+El entrenamiento de cada estación se reparte en un pool de procesos; los KPIs se consultan en serie.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from modules.engine import HydrologyEngine
+from modules.events import eventos as tabla_eventos
+from modules.compact import columna
+from modules.pipeline import alinear_meses, tabla_base, entrenar_y_predecir
+
+# Con pocas estaciones el arranque del pool cuesta más que el cálculo
+UMBRAL_PARALELO = 16
+
+COLUMNAS_META = {'grdc_no': 'grdc_no', 'station': 'Estacion', 'river': 'Rio', 'lat_pp': 'lat', 'long_pp': 'lon', 'area': 'area'}
+
+
+def _config_estacion(config):
+    """Los motores por estación no tienen modelo IA propio: se simulan siempre con factores físicos"""
+    return {**config, "motor": "factores"}
+
+
+def leer_metadatos(ruta):
+    """Metadatos de estaciones (stationbasins.csv): nombre, río y coordenadas de la estación"""
+    meta = pd.read_csv(ruta, usecols=list(COLUMNAS_META))[list(COLUMNAS_META)]
+    return meta.rename(columns=COLUMNAS_META).sort_values('grdc_no').reset_index(drop=True)
+
+
+def _workers(n_tareas, workers):
+    if workers is None:
+        return os.cpu_count() if n_tareas >= UMBRAL_PARALELO else 1
+    return max(1, int(workers))
+
+
+def _mapear(funcion, tareas, workers=None):
+    """map serial o en pool de procesos según el número de tareas"""
+    workers = _workers(len(tareas), workers)
+    if workers == 1:
+        return [funcion(t) for t in tareas]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(funcion, tareas))
+
+
+# --- 1. CONSTRUCCIÓN (features + Random Forest por estación) ---
+def _construir_estacion(tarea):
+    grdc_no, meses, precipitacion, temperatura, caudal_real = tarea
+    df = tabla_base(meses, precipitacion, temperatura, caudal_real)
+    df, _ = entrenar_y_predecir(df, n_jobs=1) # El paralelismo va por estación
+    df.insert(0, 'grdc_no', np.int64(grdc_no))
+    return df
+
+
+def construir_estaciones(ruta_clima, ruta_rio, workers=None):
+    """Dataset gold largo (grdc_no, Fecha, ...) con un modelo entrenado por estación"""
+    with np.load(ruta_clima) as clima, np.load(ruta_rio) as rio:
+        meses = clima["meses"]
+        tareas = [
+            (int(grdc_no), meses, clima["Precipitacion"], clima["Temperatura"],
+             alinear_meses(meses, rio["meses"], rio["caudal"][i]))
+            for i, grdc_no in enumerate(rio["estaciones"])
+        ]
+    partes = _mapear(_construir_estacion, tareas, workers)
+    return pd.concat(partes, ignore_index=True)
+
+
+# --- 2. MOTOR MULTI-ESTACIÓN ---
+class MultiStationEngine:
+    def __init__(self, df, metadatos=None):
+        self.df = df
+        self.metadatos = metadatos
+        # Desplazamientos de cada estación (el dataset está ordenado por grdc_no, Fecha)
+        codigos = df['grdc_no'].to_numpy()
+        self.estaciones, inicios = np.unique(codigos, return_index=True)
+        self.offsets = np.append(inicios, len(codigos))
+        self._engines = {}
+
+    def serie(self, grdc_no):
+        i = int(np.searchsorted(self.estaciones, grdc_no))
+        return self.df.iloc[self.offsets[i]:self.offsets[i + 1]]
+
+    def engine(self, grdc_no):
+        """HydrologyEngine de una estación (con su índice por año), creado una sola vez"""
+        if grdc_no not in self._engines:
+            self._engines[grdc_no] = HydrologyEngine(self.serie(grdc_no))
+        return self._engines[grdc_no]
+
+    def calculate_kpis(self, config):
+        """
+        KPIs del escenario para todas las estaciones; una fila por estación. Cada estación es una consulta
+        a su índice por año (sumas acumuladas), así que se evalúan en serie con los motores cacheados:
+        un pool de procesos costaría más en arranque y serialización que el cálculo.
+        """
+        config = _config_estacion(config)
+        filas = [{"grdc_no": int(g), **self.engine(int(g)).kpis_for_range(config)} for g in self.estaciones]
+        tabla = pd.DataFrame(filas)
+        if self.metadatos is not None:
+            tabla = tabla.merge(self.metadatos, on='grdc_no', how='left')
+        return tabla
+
+    def eventos(self, config, umbrales=None):
+        """Eventos de sequía/inundación de todas las estaciones en un solo lote (series de distinta longitud)"""
+        config = _config_estacion(config)
+        vistas = [self.engine(int(g)).run_simulation(config) for g in self.estaciones]
+        tabla = tabla_eventos([columna(v, 'Caudal_Simulado') for v in vistas], umbrales,
+                        fechas=[columna(v, 'Fecha') for v in vistas], series=[int(g) for g in self.estaciones])
+        return tabla.rename(columns={"serie": "grdc_no"})
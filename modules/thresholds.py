@@ -0,0 +1,217 @@
+"""
+Umbrales hidrológicos (P10/P90) mantenidos de forma incremental.
+
+OrderStatistics es un árbol de Fenwick sobre una rejilla de valores con una lista ordenada por
+celda: inserción y borrado en O(log B) y estadísticos de orden exactos, por lo que los cuantiles
+coinciden con pandas (interpolación lineal). La rejilla se deriva del primer lote (con margen) y
+se amplía cuando llega un valor fuera de ella, así ninguna celda de borde acumula la serie entera.
+Dos estructuras se pueden fusionar.
+"""
+import bisect
+from collections import deque
+
+import numpy as np
+
+CUANTILES = (0.10, 0.90)
+# Fracción del rango de datos que se añade a cada lado al fijar o ampliar la rejilla
+MARGEN = 0.5
+
+
+class OrderStatistics:
+    def __init__(self, vmin=None, vmax=None, bins=4096):
+        self.bins = int(bins)
+        self.arbol = np.zeros(self.bins + 1, dtype=np.int64) # Fenwick (base 1)
+        self.celdas = {}
+        self.n = 0
+        self._paso = 1 << (self.bins.bit_length() - 1)
+        # Sin rejilla explícita se fija con el primer valor o lote
+        self.vmin = self.vmax = self.ancho = None
+        if vmin is not None and vmax is not None:
+            self._rejilla(vmin, vmax)
+
+    def __len__(self):
+        return self.n
+
+    def _rejilla(self, vmin, vmax):
+        self.vmin = float(vmin)
+        self.vmax = float(vmax)
+        self.ancho = (self.vmax - self.vmin) / self.bins
+
+    def _cubrir(self, lo, hi):
+        """Fija o amplía la rejilla para que contenga [lo, hi]; los valores cargados se redistribuyen"""
+        if self.vmin is not None and self.vmin <= lo and hi < self.vmax:
+            return
+        if self.vmin is not None:
+            lo, hi = min(lo, self.vmin), max(hi, self.vmax)
+        # El margen al menos duplica el rango: el número de ampliaciones es logarítmico en el rango final
+        margen = max((hi - lo) * MARGEN, 1.0)
+        valores = [x for lista in self.celdas.values() for x in lista]
+        self._rejilla(lo - margen, hi + margen)
+        self.celdas = {}
+        self.arbol = np.zeros(self.bins + 1, dtype=np.int64)
+        self.n = 0
+        if valores:
+            self._cargar(np.asarray(valores))
+
+    def _celda(self, x):
+        # Recorte solo por redondeo en los bordes: _cubrir garantiza que x cae dentro de la rejilla
+        return min(max(int((x - self.vmin) // self.ancho), 0), self.bins - 1)
+
+    def _sumar(self, celda, delta):
+        i = celda + 1
+        while i <= self.bins:
+            self.arbol[i] += delta
+            i += i & -i
+
+    def add(self, x):
+        x = float(x)
+        self._cubrir(x, x)
+        celda = self._celda(x)
+        bisect.insort(self.celdas.setdefault(celda, []), x)
+        self._sumar(celda, 1)
+        self.n += 1
+
+    def remove(self, x):
+        x = float(x)
+        if self.vmin is None or not self.vmin <= x < self.vmax:
+            raise ValueError(f"{x} no está en la estructura")
+        celda = self._celda(x)
+        lista = self.celdas.get(celda)
+        pos = bisect.bisect_left(lista, x) if lista else 0
+        if not lista or pos == len(lista) or lista[pos] != x:
+            raise ValueError(f"{x} no está en la estructura")
+        lista.pop(pos)
+        self._sumar(celda, -1)
+        self.n -= 1
+
+    def extend(self, valores):
+        """Carga masiva: conteos con np.add.at y reconstrucción del árbol en O(B)"""
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return
+        self._cubrir(float(valores.min()), float(valores.max()))
+        self._cargar(valores)
+
+    def _cargar(self, valores):
+        celdas = np.clip(((valores - self.vmin) // self.ancho).astype(np.int64), 0, self.bins - 1)
+        orden = np.lexsort((valores, celdas))
+        celdas, valores = celdas[orden], valores[orden]
+        cortes = np.flatnonzero(np.diff(celdas)) + 1
+        for celda, grupo in zip(celdas[np.r_[0, cortes]], np.split(valores, cortes)):
+            lista = self.celdas.setdefault(int(celda), [])
+            lista[:] = sorted(lista + grupo.tolist()) if lista else grupo.tolist()
+
+        conteos = np.zeros(self.bins + 1, dtype=np.int64)
+        for celda, lista in self.celdas.items():
+            conteos[celda + 1] = len(lista)
+        self._reconstruir(conteos)
+        self.n = int(conteos.sum())
+
+    def _reconstruir(self, conteos):
+        arbol = conteos.copy()
+        for i in range(1, self.bins + 1):
+            j = i + (i & -i)
+            if j <= self.bins:
+                arbol[j] += arbol[i]
+        self.arbol = arbol
+
+    def kth(self, k):
+        """k-ésimo menor valor (base 0) por descenso binario en el árbol"""
+        if not 0 <= k < self.n:
+            raise IndexError(k)
+        pos, resto, paso = 0, k, self._paso
+        while paso:
+            siguiente = pos + paso
+            if siguiente <= self.bins and self.arbol[siguiente] <= resto:
+                pos = siguiente
+                resto -= self.arbol[siguiente]
+            paso >>= 1
+        return self.celdas[pos][resto]
+
+    def quantile(self, q):
+        """Cuantil con interpolación lineal (mismo criterio que pandas/NumPy)"""
+        if self.n == 0:
+            return np.nan
+        posicion = q * (self.n - 1)
+        lo = int(np.floor(posicion))
+        a = self.kth(lo)
+        if lo + 1 >= self.n:
+            return a
+        b = self.kth(lo + 1)
+        return a + (b - a) * (posicion - lo)
+
+    def merge(self, otra):
+        """Fusiona otra estructura (sketch combinable); la rejilla se amplía si hace falta"""
+        self.extend([x for lista in otra.celdas.values() for x in lista])
+        return self
+
+
+class ThresholdEngine:
+    """
+    Umbrales P10/P90 globales, por mes calendario y (opcionalmente) sobre una ventana móvil.
+    `update` incorpora solo los meses nuevos. Sin `vmin`/`vmax`, la rejilla de cada estructura
+    sale de su primer lote (±50 % del rango); con ellos es solo la rejilla inicial. En ambos casos
+    se amplía ante valores fuera de rango, de modo que los cuantiles son exactos sin cota de caudal.
+    """
+
+    def __init__(self, cuantiles=CUANTILES, ventana=None, vmin=None, vmax=None, bins=4096):
+        self.cuantiles = tuple(cuantiles)
+        self.ventana = ventana
+        crear = lambda: OrderStatistics(vmin, vmax, bins)
+        self.global_ = crear()
+        self.mensual = {mes: crear() for mes in range(1, 13)}
+        self.movil = crear() if ventana else None
+        self._cola = deque()
+
+    def __len__(self):
+        return len(self.global_)
+
+    def update(self, valores, meses=None):
+        """Agrega meses nuevos (valores y, si se conoce, su mes calendario 1-12)"""
+        valores = np.asarray(valores, dtype=float)
+        masivo = len(valores) > 64
+        if masivo:
+            self.global_.extend(valores)
+        if meses is not None:
+            meses = np.asarray(meses, dtype=int)
+            for mes in np.unique(meses):
+                self.mensual[int(mes)].extend(valores[meses == mes])
+        for x in valores:
+            if np.isnan(x):
+                continue
+            if not masivo:
+                self.global_.add(x)
+            if self.movil is not None:
+                self.movil.add(x)
+                self._cola.append(x)
+                if len(self._cola) > self.ventana:
+                    self.movil.remove(self._cola.popleft())
+        return self
+
+    def umbrales(self, movil=False):
+        """(P10, P90) de toda la historia o de la ventana móvil"""
+        fuente = self.movil if movil and self.movil is not None else self.global_
+        return tuple(fuente.quantile(q) for q in self.cuantiles)
+
+    def umbrales_mensuales(self):
+        """Matriz 13 × len(cuantiles) indexable directamente por el mes (fila 0 sin uso)"""
+        tabla = np.full((13, len(self.cuantiles)), np.nan)
+        for mes, estructura in self.mensual.items():
+            tabla[mes] = [estructura.quantile(q) for q in self.cuantiles]
+        return tabla
+
+    def umbrales_por_fila(self, meses):
+        """Umbrales estacionales alineados con una serie de meses calendario"""
+        tabla = self.umbrales_mensuales()
+        return tabla[np.asarray(meses, dtype=int)].T
+
+    @staticmethod
+    def batch(caudales, cuantiles=CUANTILES):
+        """Umbrales de muchos escenarios a la vez: (E × N) -> (E × len(cuantiles))"""
+        return np.quantile(np.atleast_2d(caudales), cuantiles, axis=-1).T
+
+    @staticmethod
+    def escalar(umbrales_base, factores):
+        """Con un factor escalar positivo por escenario, los cuantiles escalan igual: q(f·x) = f·q(x)"""
+        return np.asarray(factores, dtype=float)[:, None] * np.asarray(umbrales_base, dtype=float)[None, :]
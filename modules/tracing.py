@@ -0,0 +1,153 @@
+"""
+Trazas ligeras por etapa: spans (context manager o decorador), histogramas en proceso y
+exportación a texto Prometheus o JSONL. Se activa con la variable de entorno PARGIRH_TRACING=1;
+desactivado, un span es un objeto nulo compartido y el decorador solo consulta una bandera.
+
+    PARGIRH_TRACING=1 PARGIRH_TRACING_FILE=trazas.jsonl streamlit run app.py
+    PARGIRH_TRACING=1 PARGIRH_TRACING_FILE=metricas.prom streamlit run app.py
+"""
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# Límites superiores de los buckets (ms); el último bucket es +Inf
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+_NULO = nullcontext()
+
+
+class Histograma:
+    def __init__(self, limites=BUCKETS_MS):
+        self.limites = limites
+        self.conteos = [0] * (len(limites) + 1)
+        self.suma = 0.0
+        self.n = 0
+
+    def observar(self, ms):
+        self.conteos[bisect.bisect_left(self.limites, ms)] += 1
+        self.suma += ms
+        self.n += 1
+
+    def acumulados(self):
+        total, salida = 0, []
+        for conteo in self.conteos:
+            total += conteo
+            salida.append(total)
+        return salida
+
+
+class _Span:
+    __slots__ = ("tracer", "nombre", "inicio")
+
+    def __init__(self, tracer, nombre):
+        self.tracer = tracer
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.tracer._pila().append(self.nombre)
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self.inicio) * 1000
+        pila = self.tracer._pila()
+        self.tracer._registrar(self.nombre, ms, len(pila) - 1)
+        pila.pop()
+        return False
+
+
+class Tracer:
+    def __init__(self, activo=None, archivo=None):
+        self.activo = os.environ.get("PARGIRH_TRACING", "0") not in ("", "0") if activo is None else activo
+        self.archivo = os.environ.get("PARGIRH_TRACING_FILE") if archivo is None else archivo
+        self.histogramas = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _pila(self):
+        if not hasattr(self._local, "pila"):
+            self._local.pila, self._local.rerun = [], []
+        return self._local.pila
+
+    def _registrar(self, nombre, ms, profundidad):
+        self._local.rerun.append({"span": nombre, "ms": round(ms, 3), "nivel": profundidad})
+        with self._lock:
+            self.histogramas.setdefault(nombre, Histograma()).observar(ms)
+
+    # --- 1. API DE INSTRUMENTACIÓN ---
+    def span(self, nombre):
+        """Context manager de una etapa; nulo (sin coste de medición) si el tracer está apagado"""
+        return _Span(self, nombre) if self.activo else _NULO
+
+    def traced(self, nombre=None):
+        """Decorador: mide cada llamada como un span (por defecto Clase.metodo)"""
+        def decorador(funcion):
+            etiqueta = nombre or funcion.__qualname__
+
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                if not self.activo:
+                    return funcion(*args, **kwargs)
+                with _Span(self, etiqueta):
+                    return funcion(*args, **kwargs)
+            return envoltura
+        return decorador
+
+    # --- 2. CICLO DEL RERUN ---
+    def iniciar_rerun(self):
+        self._pila()
+        self._local.rerun = []
+
+    def ultimo_rerun(self):
+        """Spans del último rerun de este hilo, en orden de cierre"""
+        self._pila()
+        return list(self._local.rerun)
+
+    def finalizar_rerun(self):
+        """Exporta al archivo configurado (.prom reescribe el texto Prometheus; otro, JSONL)"""
+        if not self.activo or not self.archivo:
+            return
+        if self.archivo.endswith(".prom"):
+            self.exportar_prometheus(self.archivo)
+        else:
+            self.exportar_jsonl(self.archivo)
+
+    # --- 3. EXPORTACIÓN ---
+    def resumen(self):
+        with self._lock:
+            return {nombre: {"n": h.n, "total_ms": round(h.suma, 3), "media_ms": round(h.suma / h.n, 3) if h.n else 0.0}
+                    for nombre, h in sorted(self.histogramas.items())}
+
+    def prometheus(self):
+        lineas = [
+            "# HELP pargirh_span_duration_ms Duración de las etapas de la app (ms)",
+            "# TYPE pargirh_span_duration_ms histogram",
+        ]
+        with self._lock:
+            for nombre, h in sorted(self.histogramas.items()):
+                etiquetas = [str(l) for l in h.limites] + ["+Inf"]
+                for le, acumulado in zip(etiquetas, h.acumulados()):
+                    lineas.append(f'pargirh_span_duration_ms_bucket{{span="{nombre}",le="{le}"}} {acumulado}')
+                lineas.append(f'pargirh_span_duration_ms_sum{{span="{nombre}"}} {h.suma:.3f}')
+                lineas.append(f'pargirh_span_duration_ms_count{{span="{nombre}"}} {h.n}')
+        return "\n".join(lineas) + "\n"
+
+    def exportar_prometheus(self, ruta):
+        temporal = f"{ruta}.tmp"
+        with open(temporal, "w") as f:
+            f.write(self.prometheus())
+        os.replace(temporal, ruta) # el scraper nunca ve un archivo a medias
+
+    def exportar_jsonl(self, ruta):
+        registro = {"ts": time.time(), "spans": self.ultimo_rerun()}
+        with self._lock, open(ruta, "a") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+# Tracer global de la app
+TRACER = Tracer()
+span = TRACER.span
+traced = TRACER.traced
@@ -0,0 +1,165 @@
+"""
+Entrenamiento reproducible del Random Forest (reemplaza la celda de Colab del notebook).
+Validación cruzada temporal (TimeSeriesSplit: cada pliegue valida sobre meses posteriores a los
+de entrenamiento) y búsqueda de hiperparámetros en paralelo en todos los núcleos. El mejor modelo
+y sus métricas quedan en el registro local bajo un hash de datos + parámetros: con las mismas
+entradas no se reentrena.
+
+    python -m modules.training                  # busca, registra y activa el mejor modelo
+    python -m modules.training --pliegues 4 --jobs 2
+    python -m modules.training --listar
+"""
+import argparse
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import sklearn
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+from sklearn.model_selection import GridSearchCV, TimeSeriesSplit
+
+from modules.features import inercia_3meses
+from modules.model import ModelRegistry, COLUMNAS_MODELO
+
+# Espacio de búsqueda por defecto (12 combinaciones × pliegues)
+ESPACIO = {
+    "n_estimators": [100, 300],
+    "max_depth": [None, 8],
+    "min_samples_leaf": [1, 3, 5],
+}
+PLIEGUES = 5
+SEMILLA = 42
+METRICAS = {"r2": "r2", "mae": "neg_mean_absolute_error", "rmse": "neg_root_mean_squared_error"}
+
+
+# --- 1. DATOS Y CLAVE DEL REGISTRO ---
+def datos_entrenamiento(df):
+    """
+    Meses con caudal observado, en orden temporal: (X, y, fechas). Inercia_3meses sale de la
+    biblioteca de variables (la misma que usa el simulador) sobre la serie completa, antes de filtrar.
+    """
+    df = df.sort_values('Fecha', kind='stable')
+    X = df[COLUMNAS_MODELO].copy()
+    X['Inercia_3meses'] = inercia_3meses(df['Precipitacion'].to_numpy(dtype=float),
+                                         respaldo=df['Inercia_3meses'].to_numpy(dtype=float))
+    observado = df['Caudal_Real'].notna().to_numpy()
+    return X[observado], df['Caudal_Real'].to_numpy(dtype=float)[observado], df['Fecha'][observado]
+
+
+def clave_entrenamiento(X, y, espacio, pliegues, semilla):
+    """Hash de datos, espacio de búsqueda y versión de scikit-learn (el artefacto depende de ella)"""
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(X, dtype=float).tobytes())
+    h.update(np.ascontiguousarray(y, dtype=float).tobytes())
+    parametros = {"columnas": COLUMNAS_MODELO, "espacio": espacio, "pliegues": pliegues,
+                  "semilla": semilla, "sklearn": sklearn.__version__}
+    h.update(json.dumps(parametros, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+# --- 2. BÚSQUEDA CON VALIDACIÓN CRUZADA TEMPORAL ---
+def buscar(X, y, espacio=None, pliegues=PLIEGUES, semilla=SEMILLA, n_jobs=-1):
+    """
+    GridSearchCV con TimeSeriesSplit. El paralelismo va por combinación × pliegue
+    (cada bosque usa un solo núcleo) y el mejor se reajusta con todos los meses.
+    """
+    busqueda = GridSearchCV(
+        RandomForestRegressor(random_state=semilla, n_jobs=1),
+        espacio or ESPACIO,
+        cv=TimeSeriesSplit(n_splits=pliegues),
+        scoring=METRICAS,
+        refit="r2",
+        n_jobs=n_jobs,
+    )
+    return busqueda.fit(X, y)
+
+
+def resumen_busqueda(busqueda, X, y):
+    """Métricas del mejor candidato: R², MAE y RMSE fuera de muestra por pliegue y ajuste en entrenamiento"""
+    r = busqueda.cv_results_
+    i = busqueda.best_index_
+    pliegues = busqueda.n_splits_
+    return {
+        "params": busqueda.best_params_,
+        "cv": {
+            "r2": float(r["mean_test_r2"][i]),
+            "r2_std": float(r["std_test_r2"][i]),
+            "mae": float(-r["mean_test_mae"][i]),
+            "rmse": float(-r["mean_test_rmse"][i]),
+            "r2_pliegues": [float(r[f"split{k}_test_r2"][i]) for k in range(pliegues)],
+            "pliegues": pliegues,
+        },
+        # Referencia: el R² sobre los mismos datos de entrenamiento sobreestima la precisión
+        "r2_entrenamiento": float(r2_score(y, busqueda.best_estimator_.predict(X))),
+        "candidatos": len(r["params"]),
+    }
+
+
+# --- 3. ENTRENAMIENTO CON REGISTRO ---
+def entrenar(df, espacio=None, pliegues=PLIEGUES, semilla=SEMILLA, n_jobs=-1, registro=None, activar=True):
+    """
+    Devuelve (modelo, métricas). Si la clave de datos + parámetros ya está registrada se carga
+    el artefacto sin reentrenar; `metricas['reentrenado']` indica qué ocurrió.
+    """
+    from modules.model import cargar_modelo
+
+    registro = registro or ModelRegistry()
+    espacio = espacio or ESPACIO
+    X, y, fechas = datos_entrenamiento(df)
+    clave = clave_entrenamiento(X, y, espacio, pliegues, semilla)
+
+    reentrenado = not registro.contiene(clave)
+    if reentrenado:
+        inicio = time.perf_counter()
+        busqueda = buscar(X, y, espacio, pliegues, semilla, n_jobs)
+        metricas = {
+            **resumen_busqueda(busqueda, X, y),
+            "filas": len(y),
+            "periodo": [str(fechas.iloc[0].date()), str(fechas.iloc[-1].date())],
+            "espacio": espacio,
+            "semilla": semilla,
+            "sklearn": sklearn.__version__,
+            "segundos": round(time.perf_counter() - inicio, 3),
+            "creado": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        registro.guardar(clave, busqueda.best_estimator_, metricas)
+    if activar:
+        registro.activar(clave)
+    return cargar_modelo(registro.ruta_modelo(clave)), {**registro.metricas(clave), "reentrenado": reentrenado}
+
+
+# --- 4. CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.training", description="Entrenamiento con validación cruzada temporal")
+    parser.add_argument("--pliegues", type=int, default=PLIEGUES, help="Pliegues de TimeSeriesSplit")
+    parser.add_argument("--jobs", type=int, default=-1, help="Procesos de la búsqueda (-1: todos los núcleos)")
+    parser.add_argument("--registro", default=None, help="Directorio del registro (por defecto models/registry)")
+    parser.add_argument("--datos", choices=["auto", "npy", "csv"], default="auto")
+    parser.add_argument("--no-activar", action="store_true", help="Registra el modelo sin activarlo")
+    parser.add_argument("--listar", action="store_true", help="Muestra los modelos registrados")
+    args = parser.parse_args(argv)
+
+    registro = ModelRegistry(args.registro) if args.registro else ModelRegistry()
+    if args.listar:
+        activa = registro.clave_activa()
+        for m in registro.listar():
+            marca = "*" if m["clave"] == activa else " "
+            print(f"{marca} {m['clave']}  R² CV = {m['cv']['r2']:.3f} ± {m['cv']['r2_std']:.3f}  {m['params']}  ({m['creado']})")
+        return
+
+    from core.data import cargar_gold
+    df = cargar_gold(args.datos)
+    if df is None:
+        raise SystemExit("No se encuentra el dataset gold (python -m modules.pipeline build)")
+    _, metricas = entrenar(df, pliegues=args.pliegues, n_jobs=args.jobs, registro=registro, activar=not args.no_activar)
+    estado = "entrenado" if metricas["reentrenado"] else "sin cambios (registro)"
+    print(f"[{metricas['clave']}] {estado}: R² CV = {metricas['cv']['r2']:.3f} ± {metricas['cv']['r2_std']:.3f} "
+          f"| MAE = {metricas['cv']['mae']:.2f} m³/s | R² entrenamiento = {metricas['r2_entrenamiento']:.3f}")
+    print(f"Mejores parámetros: {metricas['params']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import numpy as np
+
+
+class YearIndex:
+    """
+    Índice por año sobre los datos gold: sumas acumuladas de Caudal_IA e Inercia_3meses
+    y caudales ordenados dentro de cada año. Permite calcular medias y conteos de meses
+    críticos de cualquier rango de años sin filtrar ni copiar el DataFrame.
+    """
+
+    def __init__(self, df, columna_caudal='Caudal_IA', columna_inercia='Inercia_3meses'):
+        years = df['Fecha'].dt.year.to_numpy()
+        # Orden estable por año (si el DataFrame ya está ordenado es la identidad)
+        self.orden = np.argsort(years, kind="stable")
+        self.contiguo = bool(np.all(self.orden == np.arange(len(years))))
+        years = years[self.orden]
+
+        caudal = df[columna_caudal].to_numpy(dtype=float)[self.orden]
+        inercia = df[columna_inercia].to_numpy(dtype=float)[self.orden]
+
+        # 1. Años presentes y desplazamientos de cada año en la serie
+        self.anos, inicios = np.unique(years, return_index=True)
+        self.offsets = np.append(inicios, len(years))
+
+        # 2. Sumas acumuladas (longitud N + 1) sin NaN y conteo acumulado de valores válidos:
+        # las medias ignoran los huecos, igual que np.nanmean sobre la vista simulada
+        self.cum_caudal, self.cum_n_caudal = self._acumulados(caudal)
+        self.cum_inercia, self.cum_n_inercia = self._acumulados(inercia)
+
+        # 3. Caudales válidos ordenados dentro de cada año, codificados en una sola clave creciente
+        rango_anual = np.repeat(np.arange(len(self.anos)), np.diff(self.offsets))
+        valido = ~np.isnan(caudal)
+        caudal, rango_anual = caudal[valido], rango_anual[valido]
+        self.offsets_validos = np.concatenate([[0], np.cumsum(np.bincount(rango_anual, minlength=len(self.anos)))])
+        self.caudal_min = float(caudal.min()) if len(caudal) else 0.0
+        self.escala = (float(caudal.max()) - self.caudal_min + 1.0) if len(caudal) else 1.0
+        self.claves = np.sort(rango_anual * self.escala + (caudal - self.caudal_min))
+
+    @staticmethod
+    def _acumulados(valores):
+        valido = ~np.isnan(valores)
+        return (np.concatenate([[0.0], np.cumsum(np.where(valido, valores, 0.0))]),
+                np.concatenate([[0], np.cumsum(valido)]))
+
+    def filas(self, rangos):
+        """Devuelve los desplazamientos (inicio, fin) de filas de cada rango de años"""
+        rangos = np.asarray(rangos, dtype=int).reshape(-1, 2)
+        i = np.searchsorted(self.anos, rangos[:, 0], side="left")
+        j = np.searchsorted(self.anos, rangos[:, 1], side="right")
+        j = np.maximum(i, j)
+        return self.offsets[i], self.offsets[j]
+
+    def medias(self, rangos):
+        """Media de Caudal_IA e Inercia_3meses por rango (sin NaN) en tiempo constante; NaN si no hay datos"""
+        lo, hi = self.filas(rangos)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            caudal = (self.cum_caudal[hi] - self.cum_caudal[lo]) / (self.cum_n_caudal[hi] - self.cum_n_caudal[lo])
+            inercia = (self.cum_inercia[hi] - self.cum_inercia[lo]) / (self.cum_n_inercia[hi] - self.cum_n_inercia[lo])
+        return caudal, inercia, hi - lo
+
+    def meses_bajo(self, rangos, umbrales):
+        """
+        Cuenta los meses con Caudal_IA < umbral para cada rango y umbral.
+        Devuelve una matriz (R × U); cada año cuesta una búsqueda binaria.
+        """
+        rangos = np.asarray(rangos, dtype=int).reshape(-1, 2)
+        umbrales = np.atleast_1d(np.asarray(umbrales, dtype=float))
+
+        # 1. Conteo por año y umbral mediante búsqueda en las claves ordenadas
+        rel = np.clip(umbrales - self.caudal_min, 0.0, self.escala - 0.5)
+        ranks = np.arange(len(self.anos))
+        buscados = ranks[:, None] * self.escala + rel[None, :]
+        por_ano = np.searchsorted(self.claves, buscados, side="left") - self.offsets_validos[:-1, None]
+
+        # 2. Acumulado por años para responder cualquier rango con una resta
+        acumulado = np.vstack([np.zeros((1, len(umbrales)), dtype=int), np.cumsum(por_ano, axis=0)])
+        i = np.searchsorted(self.anos, rangos[:, 0], side="left")
+        j = np.maximum(i, np.searchsorted(self.anos, rangos[:, 1], side="right"))
+        return acumulado[j] - acumulado[i]
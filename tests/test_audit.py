@@ -0,0 +1,54 @@
+import sqlite3
+import pytest
+from modules.audit import AuditStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = AuditStore(tmp_path / "audit.sqlite", lote=10, intervalo=3600)
+    yield s
+    s.close()
+
+
+# 1. Test: las escrituras se agrupan en lotes y persisten entre conexiones
+def test_lotes_y_persistencia(tmp_path, store):
+    for i in range(9):
+        store.append(autoridad="Operador A", accion=f"Decisión {i}", nivel="ALERTA AMARILLA")
+    assert store.conn.execute("SELECT COUNT(*) FROM registros").fetchone()[0] == 0 # aún en el lote
+    store.append(autoridad="Operador A", accion="Decisión 9", nivel="ALERTA AMARILLA")
+    assert store.conn.execute("SELECT COUNT(*) FROM registros").fetchone()[0] == 10
+
+    otra = AuditStore(tmp_path / "audit.sqlite")
+    assert len(otra) == 10
+    assert otra.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    otra.close()
+
+
+# 2. Test: páginas del final, con y sin filtro
+def test_paginacion(store):
+    for i in range(45):
+        store.append(autoridad=f"Operador {i % 3}", accion=f"Decisión {i}",
+                     nivel="EMERGENCIA ROJA" if i % 5 == 0 else "NORMALIDAD VERDE")
+    assert store.pagina(0, 20)['accion'].tolist()[:2] == ["Decisión 44", "Decisión 43"]
+    assert store.pagina(2, 20)['accion'].tolist() == ["Decisión 4", "Decisión 3", "Decisión 2", "Decisión 1", "Decisión 0"]
+
+    rojas = store.pagina(0, 20, nivel="EMERGENCIA ROJA")
+    assert rojas['accion'].tolist() == [f"Decisión {i}" for i in range(40, -1, -5)]
+    assert store.contar(autoridad="Operador 1") == 15
+    assert store.tail(5, antes_de=10)['id'].tolist() == [9, 8, 7, 6, 5]
+
+
+# 3. Test: la cadena de hashes detecta cualquier alteración
+def test_cadena_detecta_alteraciones(tmp_path, store):
+    for i in range(25):
+        store.append(autoridad="Operador A", accion=f"Decisión {i}", caudal=30.0 + i)
+    assert store.verificar(bloque=7) == (True, None)
+
+    # El registro es append-only desde SQL
+    with pytest.raises(sqlite3.DatabaseError):
+        store.conn.execute("UPDATE registros SET accion = 'otra' WHERE id = 12")
+
+    # Aun saltándose las protecciones, la verificación encuentra el registro alterado
+    store.conn.execute("DROP TRIGGER registros_sin_update")
+    store.conn.execute("UPDATE registros SET caudal = 99.0 WHERE id = 12")
+    assert store.verificar(bloque=7) == (False, 12)
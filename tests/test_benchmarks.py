@@ -0,0 +1,26 @@
+import numpy as np
+from benchmarks.datasets import gold_sintetico, estaciones_sintetico
+from benchmarks.run import ejecutar, comparar, guardar, leer
+
+
+# 1. Test: los datasets sintéticos tienen la forma del gold
+def test_datasets_sinteticos():
+    df = gold_sintetico(2000)
+    assert list(df.columns) == ['Fecha', 'Precipitacion', 'Temperatura', 'Caudal_Real', 'Inercia_3meses', 'Mes', 'Caudal_IA']
+    assert df['Fecha'].is_monotonic_increasing and df['Mes'].between(1, 12).all()
+    est = estaciones_sintetico(5000)
+    assert est['grdc_no'].nunique() == 5000 // 888 and est.groupby('grdc_no').size().eq(888).all()
+
+
+# 2. Test: la suite corre a escala pequeña y la comparación detecta regresiones
+def test_suite_y_regresion(tmp_path):
+    resultados = ejecutar([1000], repeticiones=1, memoria=False, verbose=False)
+    assert "engine.run_simulation@1000" in resultados
+    assert all(np.isfinite(m["ms"]) for m in resultados.values())
+
+    ruta = tmp_path / "base.json"
+    guardar(resultados, ruta)
+    base = leer(ruta)
+    assert comparar(resultados, base) == []
+    lento = {k: {"ms": v["ms"] * 2 + 10} for k, v in resultados.items()}
+    assert {c for c, _, _ in comparar(lento, base)} == set(resultados)
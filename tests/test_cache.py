@@ -0,0 +1,29 @@
+from modules.cache import ResultCache, clave_escenario
+
+
+# 1. Test: expulsión LRU y contadores de aciertos/fallos
+def test_lru_y_contadores():
+    cache = ResultCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1 # "a" pasa a ser el más reciente
+    cache.put("c", 3)          # expulsa "b"
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.get("b") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 1, "size": 2, "maxsize": 2, "hit_rate": 0.5}
+
+
+# 2. Test: el cálculo solo se ejecuta en el primer acceso de cada escenario
+def test_get_or_compute():
+    cache = ResultCache()
+    llamadas = []
+    calcular = lambda: llamadas.append(1) or {"kpis": len(llamadas)}
+    config = {"rango": (2000, 2010), "delta_lluvia": 0, "delta_temp": 0}
+    for _ in range(5):
+        resultado = cache.get_or_compute(clave_escenario("v1", config), calcular)
+    assert resultado == {"kpis": 1} and len(llamadas) == 1
+
+    # La misma configuración con otros tipos numéricos comparte la clave; otra versión no
+    igual = {"rango": [2000, 2010], "delta_lluvia": 0.0, "delta_temp": 0.0, "motor": "factores"}
+    assert clave_escenario("v1", config) == clave_escenario("v1", igual)
+    assert clave_escenario("v2", config) != clave_escenario("v1", config)
@@ -0,0 +1,70 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.datasets import gold_sintetico
+from core.data import cargar_gold, STORE_PATH
+from modules.chunked import ChunkedEngine, VentanaMovil
+from modules.engine import HydrologyEngine
+from modules.gold_store import write_gold_store, read_gold_store
+from modules.model import cargar_modelo
+from modules.pipeline import media_movil
+
+
+# 1. Test: la media móvil por bloques coincide con la de la serie completa (y se reinicia por grupo)
+@pytest.mark.parametrize("tamano", [1, 2, 5, 64])
+def test_ventana_entre_bloques(tamano):
+    valores = np.random.default_rng(3).gamma(2, 10, size=100)
+    ventana = VentanaMovil(3)
+    salida = np.concatenate([ventana.aplicar(valores[i:i + tamano]) for i in range(0, 100, tamano)])
+    np.testing.assert_allclose(salida, media_movil(valores, 3))
+
+    grupos = np.repeat([10, 20], 50)
+    ventana = VentanaMovil(3)
+    salida = np.concatenate([ventana.aplicar(valores[i:i + tamano], grupos[i:i + tamano]) for i in range(0, 100, tamano)])
+    esperado = np.concatenate([media_movil(valores[:50], 3), media_movil(valores[50:], 3)])
+    np.testing.assert_allclose(salida, esperado)
+
+
+# 2. Test: KPIs y serie por bloques = motor en memoria (factores y modelo IA con inercia arrastrada)
+@pytest.mark.parametrize("config", [
+    {"rango": (1975, 1985), "delta_lluvia": -20, "delta_temp": 1.0},
+    {"rango": (1990, 1995), "delta_lluvia": 10, "delta_temp": 0.5, "motor": "ia"},
+])
+def test_equivalencia_con_motor(config):
+    modelo = cargar_modelo()
+    engine = HydrologyEngine(cargar_gold(), modelo=modelo)
+    df_sim = engine.run_simulation(config)
+    esperado = engine.calculate_kpis(df_sim)
+    for filas in (1, 7, 1000):
+        chunked = ChunkedEngine(STORE_PATH, modelo=modelo, filas_por_bloque=filas)
+        kpis = chunked.calculate_kpis(config)
+        assert kpis["caudal_promedio"] == pytest.approx(esperado["caudal_promedio"])
+        assert kpis["meses_criticos"] == esperado["meses_criticos"]
+        assert kpis["inercia"] == pytest.approx(esperado["inercia"])
+        serie = pd.concat(list(chunked.iter_simulacion(config)), ignore_index=True)
+        np.testing.assert_allclose(serie['Caudal_Simulado'], df_sim['Caudal_Simulado'])
+
+
+# 3. Test: el pico de memoria lo fija el presupuesto, no el tamaño del dataset
+def test_presupuesto_de_memoria(tmp_path):
+    n = 1_000_000
+    write_gold_store(gold_sintetico(n), tmp_path / "gold")
+    config = {"rango": None, "delta_lluvia": -20, "delta_temp": 1.0}
+    chunked = ChunkedEngine(tmp_path / "gold", presupuesto_mb=4)
+
+    tracemalloc.start()
+    kpis = chunked.calculate_kpis(config)
+    pico_mb = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    assert pico_mb < 4 # un DataFrame de 1e6 filas ocuparía decenas de MB
+
+    df = read_gold_store(tmp_path / "gold")
+    simulado = df['Caudal_IA'].to_numpy() * float(HydrologyEngine.factores(-20, 1.0))
+    assert kpis["caudal_promedio"] == pytest.approx(simulado.mean())
+
+    # Salida también por bloques: almacén gold anexado bloque a bloque
+    assert chunked.simular_a_store(config, tmp_path / "sim") == n
+    np.testing.assert_allclose(read_gold_store(tmp_path / "sim")['Caudal_Simulado'], simulado)
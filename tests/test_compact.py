@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.data import cargar_gold
+from modules.compact import TablaCompacta, SimulationView, indice_mes, fechas_de_indice
+from modules.engine import HydrologyEngine
+
+
+@pytest.fixture(scope="module")
+def df():
+    return cargar_gold()
+
+
+# 1. Test: tipos compactos y fechas recuperadas desde el índice de mes
+def test_tabla_compacta(df):
+    tabla = TablaCompacta(df)
+    assert tabla['Caudal_IA'].dtype == np.float32 and tabla['Mes'].dtype == np.uint8
+    assert tabla['Indice_Mes'].dtype == np.int32 and 'Fecha' not in tabla.columnas
+    assert tabla.nbytes < df.memory_usage(index=False).sum() / 1.9
+    np.testing.assert_array_equal(fechas_de_indice(indice_mes(df['Fecha'])), df['Fecha'].to_numpy())
+    with pytest.raises(ValueError):
+        tabla['Caudal_IA'][0] = 0.0 # solo lectura: las vistas la comparten
+
+
+# 2. Test: la vista no copia la serie base y Caudal_Simulado se calcula al primer acceso
+def test_vista_sin_copia(df):
+    engine = HydrologyEngine(df)
+    vista = engine.run_simulation({"rango": (1990, 2000), "delta_lluvia": -20, "delta_temp": 1.0})
+    assert isinstance(vista, SimulationView) and len(vista) == 132 and vista.nbytes == 0
+    assert np.shares_memory(vista.arreglo('Caudal_IA'), engine.compacto['Caudal_IA'])
+    assert vista['Fecha'].dt.year.between(1990, 2000).all()
+
+    esperado = df['Caudal_IA'].to_numpy()[vista.lo:vista.hi] * float(HydrologyEngine.factores(-20, 1.0))
+    np.testing.assert_allclose(vista.caudal_simulado, esperado, rtol=1e-6)
+    assert vista.nbytes == 4 * len(vista) and vista.caudal_simulado is vista.caudal_simulado
+
+
+# 3. Test: KPIs sobre la vista = KPIs del índice; exportación como DataFrame
+def test_kpis_y_exportacion(df):
+    engine = HydrologyEngine(df)
+    config = {"rango": (1975, 1985), "delta_lluvia": 15, "delta_temp": 0.5}
+    vista = engine.run_simulation(config)
+    kpis, esperado = engine.calculate_kpis(vista), engine.kpis_for_range(config)
+    assert kpis['promedio'] == pytest.approx(esperado['promedio'])
+    assert kpis['meses_criticos'] == esperado['meses_criticos']
+
+    tabla = vista.to_frame(['Fecha', 'Caudal_IA', 'Caudal_Simulado'])
+    assert list(tabla.columns) == ['Fecha', 'Caudal_IA', 'Caudal_Simulado'] and len(tabla) == len(vista)
+    assert pd.api.types.is_datetime64_any_dtype(tabla['Fecha'])
@@ -0,0 +1,60 @@
+import json
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from core.cli import main
+from core.data import cargar_gold
+from core.economics import EconomicCore
+from modules.engine import HydrologyEngine
+from modules.pipeline import BASE_DIR
+
+
+# 1. Test: el núcleo no importa la interfaz ni scikit-learn, y `import core` no carga ni pandas
+def test_nucleo_sin_dependencias_de_interfaz():
+    script = (
+        "import sys, core\n"
+        "vacio = 'pandas' not in sys.modules\n"
+        "df = core.cargar_gold()\n"
+        "kpis = core.HydrologyEngine(df).kpis_for_range({'rango': (2000, 2010), 'delta_lluvia': -20, 'delta_temp': 1.0})\n"
+        "core.evaluar_escenario(kpis); core.EconomicCore()\n"
+        "pesados = [m for m in ('streamlit', 'plotly', 'sklearn', 'joblib') if m in sys.modules]\n"
+        "print(vacio, pesados)\n"
+    )
+    salida = subprocess.run([sys.executable, "-c", script], cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    assert salida.stdout.strip() == "True []"
+
+
+# 2. Test: la CLI produce los mismos KPIs que el motor y clasifica caudales sueltos
+def test_cli_kpis_y_clasificacion(tmp_path):
+    ruta = tmp_path / "kpis.json"
+    main(["kpis", "--desde", "1975", "--hasta", "1985", "--lluvia", "-20", "--perdidas", "--salida", str(ruta)])
+    kpis = json.loads(ruta.read_text())
+
+    config = {"rango": (1975, 1985), "delta_lluvia": -20.0, "delta_temp": 0.0}
+    esperado = HydrologyEngine(cargar_gold()).kpis_for_range(config)
+    assert np.isclose(kpis["caudal_promedio"], esperado["caudal_promedio"])
+    assert kpis["meses_criticos"] == esperado["meses_criticos"]
+    assert kpis["perdida_Arroz"] > 0
+
+    ruta = tmp_path / "mope.csv"
+    main(["classify", "--caudal", "18", "32", "55", "--formato", "csv", "--salida", str(ruta)])
+    tabla = pd.read_csv(ruta)
+    assert tabla["codigo"].tolist() == [2, 1, 0]
+
+    ruta = tmp_path / "serie.csv"
+    main(["simulate", "--desde", "2023", "--hasta", "2023", "--formato", "csv", "--salida", str(ruta)])
+    serie = pd.read_csv(ruta)
+    assert len(serie) == 12 and np.allclose(serie["Caudal_IA"], serie["Caudal_Simulado"])
+
+
+# 3. Test: los totales por cultivo coinciden con la suma de las pérdidas mensuales
+def test_totales_economicos():
+    df = HydrologyEngine(cargar_gold()).run_simulation({"rango": (1990, 2000), "delta_lluvia": -30, "delta_temp": 0.5})
+    eco = EconomicCore()
+    costos = {"Arroz": {"Sequia": 4500, "Inundacion": 2000}}
+    df_perdidas, _, _ = eco.calcular_perdidas(df, costos)
+    totales = eco.totales(df, costos)
+    assert np.isclose(totales["Perdida_Escenario"].iloc[0], df_perdidas["Perdida_Arroz"].sum())
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from modules.decimation import minmax_indices, lttb_indices, decimar_indices, tipo_traza
+from modules.dashboard import DashboardUI
+
+
+def _serie(n=200_000, seed=0):
+    rng = np.random.default_rng(seed)
+    y = np.cumsum(rng.normal(size=n)) + 50
+    y[n // 16] = 500.0     # pico de crecida
+    y[3 * n // 4] = -400.0 # mínimo de sequía
+    return np.arange(n), y
+
+
+# 1. Test: min-max conserva el mínimo y el máximo de cada bucket
+def test_minmax_conserva_extremos():
+    x, y = _serie()
+    idx = minmax_indices(y, 600)
+    assert len(idx) <= 4 * 600 + 2
+    assert 12500 in idx and 150000 in idx and idx[0] == 0 and idx[-1] == len(y) - 1
+    bucket = (np.arange(len(y)) * 600) // len(y)
+    for b in (0, 17, 599):
+        miembros = np.flatnonzero(bucket == b)
+        assert y[miembros].max() in y[idx] and y[miembros].min() in y[idx]
+
+
+# 2. Test: LTTB reduce al tamaño pedido y también conserva los extremos globales
+def test_lttb():
+    x, y = _serie(50_000)
+    idx = lttb_indices(x, y, 1000)
+    assert 1000 <= len(idx) <= 1002
+    assert np.argmax(y) in idx and np.argmin(y) in idx
+    assert (np.diff(idx) > 0).all()
+    # Series cortas no se tocan
+    assert (decimar_indices(x[:500], y[:500]) == np.arange(500)).all()
+
+
+# 3. Test: la figura principal usa WebGL y puntos diezmados con series largas
+def test_figura_larga_en_webgl():
+    n = 20_000
+    fechas = pd.date_range('1900-01-01', periods=n, freq='D')
+    _, y = _serie(n, seed=1)
+    y = np.abs(y)
+    df = pd.DataFrame({'Fecha': fechas, 'Caudal_IA': y, 'Caudal_Simulado': y * 0.8, 'Caudal_Real': np.nan})
+    fig = DashboardUI().figura_principal(df, {"delta_lluvia": -20, "delta_temp": 0}, clave=("v", (1900, 1954)))
+    assert all(isinstance(t, go.Scattergl) for t in fig.data)
+    assert all(len(t.y) < n // 4 for t in fig.data)
+    assert max(fig.data[0].y) == y.max() and min(fig.data[1].y) == y.min() * 0.8
+    assert tipo_traza(100) is go.Scatter
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.economics import EconomicModule
+
+
+@pytest.fixture
+def df_simulado():
+    rng = np.random.default_rng(7)
+    base = rng.gamma(4, 10, size=120)
+    return pd.DataFrame({
+        'Fecha': pd.date_range('2000-01-01', periods=120, freq='MS'),
+        'Caudal_IA': base,
+        'Caudal_Simulado': base * 0.7,
+    })
+
+
+# 1. Test: el producto matricial coincide con el cálculo cultivo por cultivo
+def test_kernel_matricial():
+    rng = np.random.default_rng(0)
+    caudales = rng.gamma(4, 10, size=(5, 40)) # 5 escenarios × 40 meses
+    costos = {f"Cultivo_{k}": {'Sequia': rng.integers(0, 10000), 'Inundacion': rng.integers(0, 10000)} for k in range(200)}
+
+    S = EconomicModule.severidades(caudales, 20.0, 60.0)
+    nombres, C = EconomicModule.matriz_costos(costos)
+    L = EconomicModule.perdidas(S, C)
+    assert L.shape == (5, 40, 200)
+
+    k = nombres.index("Cultivo_17")
+    esperado = np.maximum(20.0 - caudales, 0) * costos["Cultivo_17"]['Sequia'] + \
+               np.maximum(caudales - 60.0, 0) * costos["Cultivo_17"]['Inundacion']
+    np.testing.assert_allclose(L[:, :, k], esperado)
+
+
+# 2. Test: la sequía simulada genera más pérdidas por sequía que la línea base
+def test_calcular_perdidas(df_simulado):
+    eco = EconomicModule()
+    costos = {c: {'Sequia': v['s'], 'Inundacion': v['i']} for c, v in eco.cultivos_default.items()}
+    df_final, p10, p90 = eco.calcular_perdidas(df_simulado, costos)
+
+    assert p10 == pytest.approx(df_simulado['Caudal_IA'].quantile(0.10))
+    assert {'Perdida_Arroz', 'Perdida_Banano', 'Perdida_Aguacate'} <= set(df_final.columns)
+    assert (df_simulado['Caudal_Simulado'] < p10).sum() > (df_simulado['Caudal_IA'] < p10).sum()
+    assert df_final['Severidad_Sequia'].sum() > 0
+
+
+# 3. Test: con un ThresholdEngine los umbrales salen de la historia completa (o por mes calendario)
+def test_umbrales_incrementales(df_simulado):
+    from modules.thresholds import ThresholdEngine
+    df = df_simulado.assign(Mes=df_simulado['Fecha'].dt.month)
+    umbrales = ThresholdEngine().update(df['Caudal_IA'].to_numpy(), df['Mes'].to_numpy())
+    eco = EconomicModule(umbrales=umbrales)
+
+    p10, p90 = eco.obtener_umbrales(df.iloc[:24])
+    assert p10 == pytest.approx(df['Caudal_IA'].quantile(0.10))
+    assert p90 == pytest.approx(df['Caudal_IA'].quantile(0.90))
+
+    p10_mes, _ = eco.obtener_umbrales(df, estacional=True)
+    assert len(p10_mes) == len(df)
+    assert p10_mes[0] == pytest.approx(df.loc[df['Mes'] == 1, 'Caudal_IA'].quantile(0.10))
@@ -49,4 +49,23 @@ def test_detecta_crisis(dummy_data):
     
     # Assert
     assert "CRISIS" in kpis['estado_texto']
-    print("Test Crisis: El sistema detectó correctamente la alerta roja.")
\ No newline at end of file
+    print("Test Crisis: El sistema detectó correctamente la alerta roja.")
+
+# 4. Test: ¿La malla de escenarios coincide con la simulación individual?
+def test_batch_coincide_con_simulacion(dummy_data):
+    engine = HydrologyEngine(dummy_data)
+    lluvias = [-50, 0, 20]
+    temps = [0.0, 1.5]
+
+    resultado = engine.run_batch([(2020, 2020)], lluvias, temps)
+    assert resultado['cubo'].shape == (1, 3, 2, len(resultado['kpis']))
+
+    for i, lluvia in enumerate(lluvias):
+        for j, temp in enumerate(temps):
+            config = {"rango": (2020, 2020), "delta_lluvia": lluvia, "delta_temp": temp}
+            esperado = engine.calculate_kpis(engine.run_simulation(config))
+            obtenido = engine.batch_kpis(resultado, 0, i, j)
+            assert obtenido['promedio'] == pytest.approx(esperado['promedio'])
+            assert obtenido['variacion'] == pytest.approx(esperado['variacion'])
+            assert obtenido['meses_criticos'] == esperado['meses_criticos']
+            assert obtenido['estado_texto'] == esperado['estado_texto']
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.ensemble import EnsembleSimulator
+
+
+@pytest.fixture
+def serie():
+    fechas = pd.date_range('2000-01-01', periods=60, freq='MS')
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({
+        'Fecha': fechas,
+        'Precipitacion': rng.gamma(2, 30, size=60),
+        'Temperatura': rng.normal(25, 1, size=60),
+        'Inercia_3meses': rng.normal(50, 5, size=60),
+        'Mes': fechas.month,
+        'Caudal_IA': rng.gamma(4, 10, size=60),
+    })
+
+
+# 1. Test: bandas ordenadas y una columna por mes del rango
+def test_bandas(serie):
+    resultado = EnsembleSimulator(serie).run(12, 48, -10, 0.5, miembros=500)
+    bandas = resultado['bandas']
+    assert len(bandas) == 36 and len(resultado['fechas']) == 36
+    assert (np.diff(bandas.to_numpy(), axis=1) >= 0).all()
+    assert 0.0 <= resultado['prob_crisis'] <= 1.0
+
+
+# 2. Test: sin dispersión el ensamble colapsa en la simulación determinista
+def test_sin_dispersion(serie):
+    ens = EnsembleSimulator(serie, dispersion=0.0)
+    caudales = ens.simular(0, 60, -50, 0.0, miembros=10)
+    np.testing.assert_allclose(caudales, np.tile(serie['Caudal_IA'] * 0.5, (10, 1)))
+
+
+# 3. Test: una sequía extrema vuelve la crisis casi segura
+def test_probabilidad_crisis(serie):
+    resultado = EnsembleSimulator(serie).run(0, 60, -50, 3.0, miembros=200)
+    assert resultado['prob_crisis'] > 0.9
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from core.data import cargar_gold
+from modules.engine import HydrologyEngine
+from modules.events import rachas, detectar_eventos, resumen, tabla_presentacion
+from modules.gold_store import read_gold_store
+from modules.pipeline import BASE_DIR
+from modules.stations import MultiStationEngine
+
+
+def _eventos_bucle(x, umbral):
+    """Referencia mes a mes: (inicio, fin, duración, déficit, pico) de cada racha bajo el umbral"""
+    salida, i = [], 0
+    while i < len(x):
+        if x[i] < umbral:
+            j = i
+            while j + 1 < len(x) and x[j + 1] < umbral:
+                j += 1
+            d = umbral - x[i:j + 1]
+            salida.append((i, j, j - i + 1, d.sum(), d.max()))
+            i = j + 1
+        else:
+            i += 1
+    return np.array(salida)
+
+
+# 1. Test: rachas y métricas por evento = bucle mes a mes (matriz de escenarios; un NaN corta la racha)
+def test_equivalencia_con_bucle():
+    X = np.random.default_rng(11).gamma(3, 10, size=(3, 80))
+    X[1, 20] = np.nan
+    tabla = detectar_eventos(X, 25.0)
+    for fila in range(3):
+        obtenido = tabla[tabla['serie'] == fila][['inicio', 'fin', 'duracion', 'deficit', 'pico']].to_numpy(dtype=float)
+        np.testing.assert_allclose(obtenido, _eventos_bucle(X[fila], 25.0))
+
+    fila, inicio, fin = rachas([[0, 1, 1, 0, 1], [1, 1, 1, 1, 1]])
+    assert fila.tolist() == [0, 0, 1] and inicio.tolist() == [1, 4, 0] and fin.tolist() == [2, 4, 4]
+
+    # Inundaciones y duración mínima
+    largos = detectar_eventos(X, 40.0, "inundacion", duracion_minima=2)
+    assert (largos['duracion'] >= 2).all() and (largos['pico'] > 0).all()
+
+
+# 2. Test: lote de series de distinta longitud con fechas propias; periodo de retorno de Weibull
+def test_lote_y_periodo_retorno():
+    fechas = pd.date_range('2000-01-01', periods=24, freq='MS').to_numpy()
+    a = np.full(24, 50.0)
+    a[[2, 3, 10, 15, 16, 17]] = [20, 20, 24, 10, 10, 10] # tres sequías: déficit 10, 1 y 45
+    b = np.full(12, 10.0) # toda la serie en sequía
+    tabla = detectar_eventos([a, b], 25.0, fechas=[fechas, fechas[:12]], series=["A", "B"])
+
+    A = tabla[tabla['serie'] == "A"].reset_index(drop=True)
+    assert A['deficit'].tolist() == [10.0, 1.0, 45.0]
+    assert pd.Timestamp(A['inicio'][2]) == pd.Timestamp('2001-04-01') and A['duracion'][2] == 3
+    # 2 años de registro: T = 3 / rango (el más severo, rango 1)
+    np.testing.assert_allclose(A['periodo_retorno'], [3 / 2, 3 / 3, 3 / 1])
+
+    B = tabla[tabla['serie'] == "B"]
+    assert len(B) == 1 and B['duracion'].iloc[0] == 12 # el relleno NaN del lote no extiende la racha
+    assert pd.Timestamp(B['fin'].iloc[0]) == pd.Timestamp('2000-12-01')
+
+
+# 3. Test: integración con el motor (meses en eventos de Crisis = meses críticos), escenarios y estaciones
+def test_motor_escenarios_y_estaciones():
+    engine = HydrologyEngine(cargar_gold())
+    config = {"rango": (1990, 2010), "delta_lluvia": -20, "delta_temp": 1.0}
+    vista = engine.run_simulation(config)
+    tabla = engine.eventos(vista)
+    por_umbral = resumen(tabla).set_index('umbral')
+    assert por_umbral.loc['Crisis', 'meses'] == engine.calculate_kpis(vista)['meses_criticos']
+    assert set(tabla['umbral']) == {'Crisis', 'Alerta'}
+    assert 'Serie' not in tabla_presentacion(tabla).columns
+
+    resultado = engine.run_batch([(1970, 2020)], [0, -20], [0, 1.0], incluir_series=True)
+    lote = engine.eventos_batch(resultado)
+    assert lote['serie'].nunique() == 4
+    secos = lote[lote['umbral'] == 'Crisis'].groupby('serie')['duracion'].sum()
+    assert secos['Lluvia -20% | Temp +1°C'] > secos['Lluvia +0% | Temp +0°C'] # menos caudal, más meses en sequía
+
+    ruta = os.path.join(BASE_DIR, "data", "gold", "estaciones")
+    if os.path.exists(ruta):
+        estaciones = MultiStationEngine(read_gold_store(ruta))
+        por_estacion = estaciones.eventos(config)
+        assert set(por_estacion['grdc_no']) <= set(estaciones.estaciones.tolist())
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.features import (medias_moviles, rezagos, deficit_acumulado, anomalias_estacionales,
+                              climatologia, recarga, variables)
+
+
+@pytest.fixture
+def serie():
+    valores = np.random.default_rng(7).gamma(2, 10, size=120)
+    valores[[5, 40]] = np.nan # meses sin dato
+    return valores
+
+
+# 1. Test: ventanas, rezagos y anomalías = pandas (rolling, shift, groupby por mes)
+def test_equivalencia_con_pandas(serie):
+    s = pd.Series(serie)
+    mes = np.tile(np.arange(1, 13), 10)
+    for w, media in medias_moviles(serie, (3, 6, 12)).items():
+        np.testing.assert_allclose(media, s.rolling(w).mean().to_numpy())
+    np.testing.assert_allclose(medias_moviles(serie, (3,), min_periodos=1)[3], s.rolling(3, min_periods=1).mean().to_numpy())
+    np.testing.assert_allclose(rezagos(serie, (1, 12))[12], s.shift(12).to_numpy())
+    esperado = (s - s.groupby(mes).transform('mean')).to_numpy()
+    np.testing.assert_allclose(anomalias_estacionales(serie, mes), esperado)
+    np.testing.assert_allclose(recarga(serie), s.rolling(3).mean().shift(1).fillna(0).to_numpy())
+
+
+# 2. Test: déficit acumulado = recursión mes a mes; varias series en una matriz
+def test_deficit_y_varias_series(serie):
+    referencia = 15.0
+    esperado, d = [], 0.0
+    for x in np.nan_to_num(serie, nan=referencia):
+        d = max(0.0, d + referencia - x)
+        esperado.append(d)
+    np.testing.assert_allclose(deficit_acumulado(serie, referencia), esperado, atol=1e-9)
+
+    otra = serie * 0.5
+    mes = np.tile(np.arange(1, 13), 10)
+    tabla = variables([serie, otra], mes, referencia=referencia)
+    assert tabla["media_12m"].shape == (2, 120) and climatologia([serie, otra], mes).shape == (2, 13)
+    np.testing.assert_allclose(tabla["media_6m"][1], medias_moviles(otra, (6,))[6])
+    np.testing.assert_allclose(tabla["deficit"][0], esperado, atol=1e-9)
+
+
+# 3. Test: caché opcional por memoria de la entrada, entradas y resultados de solo lectura
+def test_cache_opcional(serie):
+    assert medias_moviles(serie) is not medias_moviles(serie) # sin caché por defecto
+    primera = medias_moviles(serie, cachear=True)
+    assert medias_moviles(serie, cachear=True) is primera
+    assert medias_moviles(serie[:], cachear=True) is primera # otra vista de la misma memoria
+    assert medias_moviles(serie.copy(), cachear=True) is not primera
+    with pytest.raises(ValueError):
+        primera[3][0] = 0.0
+    with pytest.raises(ValueError):
+        serie[0] = 0.0 # la entrada cacheada tampoco se puede modificar
+
+    # Memoria base escribible: se calcula sin cachear (un cambio en la base no deja resultados viejos)
+    x = np.array([5.0, 1.0, 1.0, 10.0, 0.0])
+    vista = x[1:]
+    assert deficit_acumulado(vista, 5.0, cachear=True).tolist() == [4.0, 8.0, 3.0, 8.0]
+    assert vista.flags.writeable
+    x[:] = 0.0
+    assert deficit_acumulado(vista, 5.0, cachear=True).tolist() == [5.0, 10.0, 15.0, 20.0]
+
+    # Series de pandas y listas de números como una sola serie
+    np.testing.assert_allclose(deficit_acumulado(pd.Series(serie), 15.0, cachear=True), deficit_acumulado(serie, 15.0))
+    assert deficit_acumulado([1.0, 2.0], 5.0).tolist() == [4.0, 7.0]
+
+
+# 4. Test: la caché está acotada en bytes
+def test_cache_acotada_en_bytes():
+    from modules.features import CACHE, MAX_BYTES
+    n = MAX_BYTES // 8 // 4 # cada resultado ocupa 1/4 del límite
+    for _ in range(6):
+        medias_moviles(np.ones(n), (3,), cachear=True)
+    assert CACHE.bytes <= MAX_BYTES and CACHE.evictions > 0
+    CACHE.clear()
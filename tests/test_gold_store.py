@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.gold_store import write_gold_store, read_gold_store, export_csv, append_gold_store, dataset_version
+
+
+@pytest.fixture
+def gold_df():
+    return pd.DataFrame({
+        'Fecha': pd.to_datetime(['2020-01-01', '2020-02-01', '2020-03-01']),
+        'Caudal_IA': [30.0, 40.0, 35.0],
+        'Caudal_Real': [31.0, np.nan, 34.0],
+        'Mes': [1, 2, 3],
+    })
+
+
+# 1. Test: ida y vuelta sin pérdida de tipos ni valores
+def test_ida_y_vuelta(tmp_path, gold_df):
+    write_gold_store(gold_df, tmp_path / "store")
+    pd.testing.assert_frame_equal(read_gold_store(tmp_path / "store", mmap=False), gold_df)
+    # Por defecto las columnas quedan mapeadas, sin copia en memoria
+    df = read_gold_store(tmp_path / "store")
+    assert not df['Caudal_IA'].to_numpy().flags.writeable
+
+
+# 2. Test: solo se cargan las columnas pedidas
+def test_seleccion_de_columnas(tmp_path, gold_df):
+    write_gold_store(gold_df, tmp_path / "store")
+    df = read_gold_store(tmp_path / "store", columnas=['Fecha', 'Caudal_IA'])
+    assert list(df.columns) == ['Fecha', 'Caudal_IA']
+    with pytest.raises(KeyError):
+        read_gold_store(tmp_path / "store", columnas=['No_Existe'])
+
+
+# 3. Test: el CSV exportado conserva el formato de intercambio
+def test_export_csv(tmp_path, gold_df):
+    write_gold_store(gold_df, tmp_path / "store")
+    export_csv(tmp_path / "store", tmp_path / "gold.csv")
+    df = pd.read_csv(tmp_path / "gold.csv")
+    assert list(df['Fecha']) == ['2020-01-01', '2020-02-01', '2020-03-01']
+    assert df['Caudal_Real'].isna().sum() == 1
+
+
+# 4. Test: anexar filas extiende cada columna y sube la versión del dataset
+def test_anexar_filas(tmp_path, gold_df):
+    store = tmp_path / "store"
+    write_gold_store(gold_df, store)
+    version = dataset_version(store)
+    nuevas = pd.DataFrame({
+        'Fecha': pd.to_datetime(['2020-04-01', '2020-05-01']),
+        'Caudal_IA': [20.0, 25.0],
+        'Caudal_Real': [np.nan, 26.0],
+        'Mes': [4, 5],
+    })
+    schema = append_gold_store(nuevas, store)
+    assert schema["filas"] == 5 and schema["version"] == 2
+    assert dataset_version(store) != version
+    pd.testing.assert_frame_equal(read_gold_store(store, mmap=False), pd.concat([gold_df, nuevas], ignore_index=True))
+    with pytest.raises(KeyError):
+        append_gold_store(nuevas.drop(columns='Mes'), store)
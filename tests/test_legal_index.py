@@ -0,0 +1,67 @@
+import math
+import time
+import numpy as np
+import pytest
+from modules.legal_index import BM25Index, tokenizar, cargar_indice, leer_corpus
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return leer_corpus()
+
+
+# 1. Test: las consultas del asistente llegan al artículo correcto
+@pytest.mark.parametrize("consulta, esperado", [
+    ("¿Qué hago en crisis?", "art45"),
+    ("Protocolo Fase Roja", "art45"),
+    ("medidas fase amarilla", "art44"),
+    ("¿Qué es la inercia del suelo?", "inercia"),
+    ("umbral de inundación P90", "umbrales_fao"),
+])
+def test_busqueda(corpus, consulta, esperado):
+    assert BM25Index(corpus).search(consulta, k=1)[0][1]["id"] == esperado
+
+
+# 2. Test: los puntajes coinciden con la fórmula BM25 calculada documento a documento
+def test_puntajes_bm25():
+    docs = [{"id": str(i), "titulo": "", "claves": "", "texto": t} for i, t in enumerate(
+        ["caudal bajo en el río", "riego y caudal del canal", "presa presa presa", "suelo seco"])]
+    indice = BM25Index(docs)
+    consulta = "caudal presa"
+    tokens = [tokenizar(d["texto"]) for d in docs]
+    media = np.mean([len(t) for t in tokens])
+    esperado = []
+    for t in tokens:
+        s = 0.0
+        for q in tokenizar(consulta):
+            df = sum(q in u for u in tokens)
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            tf = t.count(q)
+            s += idf * tf * (indice.k1 + 1) / (tf + indice.k1 * (1 - indice.b + indice.b * len(t) / media))
+        esperado.append(s)
+    obtenido = {d["id"]: p for p, d in indice.search(consulta, k=4)}
+    for i, s in enumerate(esperado):
+        assert obtenido.get(str(i), 0.0) == pytest.approx(s)
+
+
+# 3. Test: el índice en disco da los mismos resultados y se reconstruye si el corpus cambia
+def test_persistencia(tmp_path, corpus):
+    import json
+    ruta_corpus = tmp_path / "corpus.json"
+    ruta_corpus.write_text(json.dumps(corpus, ensure_ascii=False), encoding="utf-8")
+    ruta = tmp_path / "indice.npz"
+    original = cargar_indice(ruta, ruta_corpus)
+    cargado = cargar_indice(ruta, ruta_corpus)
+    assert [d["id"] for _, d in cargado.search("alerta tandeo", 5)] == [d["id"] for _, d in original.search("alerta tandeo", 5)]
+
+    ruta_corpus.write_text(json.dumps(corpus[:3], ensure_ascii=False), encoding="utf-8")
+    assert len(cargar_indice(ruta, ruta_corpus)) == 3
+
+
+# 4. Test: consulta top-k por debajo del milisegundo
+def test_latencia(corpus):
+    indice = BM25Index(corpus)
+    inicio = time.perf_counter()
+    for _ in range(200):
+        indice.search("protocolo de crisis y cierre de riego", k=3)
+    assert (time.perf_counter() - inicio) / 200 < 1e-3
@@ -0,0 +1,52 @@
+import io
+import zipfile
+import numpy as np
+import pandas as pd
+from modules.memos import (render_cuerpo, tareas_serie, tareas_periodo, generar_memos,
+                           zip_en_bloques, documento_en_bloques, MEMOS)
+
+
+def _series():
+    fechas = pd.date_range('2000-01-01', periods=60, freq='MS')
+    caudal = np.random.default_rng(5).gamma(4, 10, size=60)
+    return [("Cuenca", fechas.to_numpy(), caudal), ("Estación Test", fechas.to_numpy(), caudal * 0.5)]
+
+
+# 1. Test: la plantilla del nivel correcto, con los valores sustituidos
+def test_render_cuerpo():
+    cuerpo = render_cuerpo("PARGIRH-INT-202001", "Cuenca", "Base", 12.34, -20.0, 2)
+    assert MEMOS[2]["estilo"]["titulo"] in cuerpo
+    assert "12.3 m³/s" in cuerpo and "-20.0%" in cuerpo
+    assert "$" not in cuerpo
+
+
+# 2. Test: un memo por mes × serie × escenario, el mismo resultado en serie y en el pool
+def test_lote_serial_y_paralelo():
+    escenarios = [(0, 0), (-30, 1.0)]
+    serial = list(generar_memos(tareas_periodo(_series(), escenarios, bloque=7), workers=1))
+    paralelo = list(generar_memos(tareas_periodo(_series(), escenarios, bloque=7), workers=2))
+    assert len(serial) == 60 * 2 * 2
+    assert serial == paralelo
+    assert len({nombre for nombre, _ in serial}) == len(serial)
+
+
+# 3. Test: el ZIP emitido por bloques es válido y contiene todos los memos
+def test_zip_en_bloques():
+    fechas = pd.date_range('2000-01-01', periods=24, freq='MS')
+    base = np.full(24, 50.0)
+    memos = generar_memos(tareas_serie(fechas, base, base * 0.4, "Cuenca", "Sequía"), workers=1)
+    bloques = list(zip_en_bloques(memos))
+    assert len(bloques) > 1
+    with zipfile.ZipFile(io.BytesIO(b"".join(bloques))) as archivo:
+        nombres = archivo.namelist()
+        assert len(nombres) == 24
+        contenido = archivo.read(nombres[0]).decode("utf-8")
+    assert MEMOS[2]["estilo"]["titulo"] in contenido # 20 m³/s -> crisis
+
+
+# 4. Test: documento multipágina con un memo por página
+def test_documento_multipagina():
+    memos = generar_memos(tareas_periodo(_series()[:1], [(0, 0)]), workers=1)
+    texto = b"".join(documento_en_bloques(memos)).decode("utf-8")
+    assert texto.count('<section class="memo">') == 60
+    assert texto.rstrip().endswith("</html>")
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from modules.engine import HydrologyEngine
+from modules.model import ModelSimulator, COLUMNAS_MODELO, cargar_modelo, guardar_modelo
+
+
+@pytest.fixture
+def datos_y_modelo():
+    fechas = pd.date_range('2000-01-01', periods=48, freq='MS')
+    rng = np.random.default_rng(1)
+    pr = rng.gamma(2, 30, size=48)
+    df = pd.DataFrame({
+        'Fecha': fechas,
+        'Precipitacion': pr,
+        'Temperatura': rng.normal(25, 1, size=48),
+        'Inercia_3meses': pd.Series(pr).rolling(3, min_periods=1).mean(),
+        'Mes': fechas.month,
+    })
+    modelo = RandomForestRegressor(n_estimators=10, random_state=0)
+    modelo.fit(df[COLUMNAS_MODELO], df['Inercia_3meses'] * 0.8)
+    df['Caudal_IA'] = modelo.predict(df[COLUMNAS_MODELO])
+    return df, modelo
+
+
+# 1. Test: la inercia se recalcula sobre la lluvia perturbada
+def test_features_recalcula_inercia(datos_y_modelo):
+    df, modelo = datos_y_modelo
+    sim = ModelSimulator(df, modelo)
+    X = sim.features(12, 24, -30, 1.0)
+    esperado = (df['Precipitacion'] * 0.7).rolling(3).mean().iloc[12:24]
+    np.testing.assert_allclose(X[:, 2], esperado)
+    np.testing.assert_allclose(X[:, 1], df['Temperatura'].iloc[12:24] + 1.0)
+
+
+# 2. Test: sin cambios se reproduce la línea base y los escenarios se cachean
+def test_simulacion_ia(datos_y_modelo):
+    df, modelo = datos_y_modelo
+    engine = HydrologyEngine(df, modelo=modelo)
+    config = {"rango": (2001, 2002), "delta_lluvia": 0, "delta_temp": 0.0, "motor": "ia"}
+    df_sim = engine.run_simulation(config)
+    np.testing.assert_allclose(df_sim['Caudal_Simulado'], df_sim['Caudal_IA'])
+
+    config["delta_lluvia"] = -40
+    engine.run_simulation(config).caudal_simulado # la simulación es perezosa: se pide la columna
+    engine.run_simulation(dict(config, delta_temp=0.04)).caudal_simulado # Se cuantiza a 0.0
+    assert engine.simulador.cache_info().hits == 1
+    kpis = engine.kpis_for_range(config)
+    assert kpis['variacion'] < 0
+
+
+# 3. Test: el artefacto se cachea por versión del archivo; un modelo ausente no queda cacheado
+def test_cargar_modelo_por_version(datos_y_modelo, tmp_path):
+    df, modelo = datos_y_modelo
+    ruta = str(tmp_path / "caudal_rf.joblib")
+    assert cargar_modelo(ruta) is None
+    guardar_modelo(modelo, ruta)
+    primero = cargar_modelo(ruta)
+    assert primero is not None and cargar_modelo(ruta) is primero
+
+    guardar_modelo(RandomForestRegressor(n_estimators=3, random_state=1).fit(df[COLUMNAS_MODELO], df['Caudal_IA']), ruta)
+    os.utime(ruta, ns=(0, os.stat(ruta).st_mtime_ns + 10**9)) # el build reescribe el artefacto
+    nuevo = cargar_modelo(ruta)
+    assert nuevo is not primero and len(nuevo.estimators_) == 3
+
+
+# 4. Test: una serie desordenada se ordena por Fecha; sin modelo, motor="ia" es un error y no factores
+def test_motor_ia_sin_fallback(datos_y_modelo):
+    df, modelo = datos_y_modelo
+    desordenado = df.iloc[::-1]
+    config = {"rango": (2001, 2002), "delta_lluvia": -20, "delta_temp": 0.5, "motor": "ia"}
+    esperado = HydrologyEngine(df, modelo=modelo).run_simulation(config)
+    obtenido = HydrologyEngine(desordenado, modelo=modelo).run_simulation(config)
+    np.testing.assert_allclose(obtenido['Caudal_Simulado'], esperado['Caudal_Simulado'])
+    factores = HydrologyEngine(desordenado).run_simulation(dict(config, motor="factores"))
+    assert not np.allclose(obtenido['Caudal_Simulado'], factores['Caudal_Simulado'])
+
+    with pytest.raises(ValueError):
+        HydrologyEngine(df).run_simulation(config)
+    with pytest.raises(ValueError):
+        HydrologyEngine(df).kpis_for_range(config)
@@ -0,0 +1,107 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from modules.gold_store import write_gold_store, read_gold_store, dataset_version
+from modules.model import cargar_modelo, COLUMNAS_MODELO, MODELO_PATH
+from modules.pipeline import GoldPipeline, BASE_DIR, leer_ancho, media_movil
+
+
+# 1. Test: la cabecera ancha se convierte en arreglos por variable
+def test_leer_ancho(tmp_path):
+    ruta = tmp_path / "mini.csv"
+    ruta.write_text(
+        "metadata/apiVersion,metadata/status,data/pr/DOM/1950-01,data/pr/DOM/1950-02,data/cdd/DOM/1950-01\n"
+        "v1,success,10.5,20.0,3\n"
+    )
+    variables = leer_ancho(ruta)
+    assert set(variables) == {"pr", "cdd"}
+    meses, valores = variables["pr"]
+    assert list(meses) == [1950 * 12, 1950 * 12 + 1]
+    assert list(valores) == [10.5, 20.0]
+
+
+# 2. Test: la media móvil coincide con pandas rolling(3)
+def test_media_movil():
+    valores = np.array([1.0, 2.0, 6.0, 4.0, 8.0])
+    esperado = pd.Series(valores).rolling(3).mean().to_numpy()
+    np.testing.assert_allclose(media_movil(valores, 3), esperado)
+
+
+# 3. Test: reconstrucción offline y omisión de etapas sin cambios
+def test_build_incremental(tmp_path):
+    raw = tmp_path / "raw"
+    shutil.copytree(os.path.join(BASE_DIR, "data", "raw"), raw)
+    pipeline = GoldPipeline(raw_dir=str(raw), silver_dir=str(tmp_path / "silver"),
+                            gold_dir=str(tmp_path / "gold"), manifest_path=str(tmp_path / "manifest.json"),
+                            models_dir=str(tmp_path / "models"))
+
+    assert pipeline.run(verbose=False) == {"clima": "ok", "rio": "ok", "gold": "ok", "estaciones": "ok"}
+    assert set(pipeline.run(verbose=False).values()) == {"omitida"}
+    assert (tmp_path / "models" / "caudal_rf.joblib").exists()
+
+    gold = pd.read_csv(tmp_path / "gold" / "app_data_70years.csv")
+    referencia = pd.read_csv(os.path.join(BASE_DIR, "data", "gold", "app_data_70years.csv"))
+    assert list(gold.columns) == list(referencia.columns)
+    assert (gold['Fecha'] == referencia['Fecha']).all()
+    np.testing.assert_allclose(gold['Precipitacion'], referencia['Precipitacion'])
+    np.testing.assert_allclose(gold['Inercia_3meses'], referencia['Inercia_3meses'])
+
+    # Si solo cambia el río, el clima no se recalcula
+    with open(raw / "GRDC-Monthly.csv", "a") as f:
+        f.write("1/1/1985,4382100,40,,6718,DO,-71.55,19.77,11,x,RIO YAQUE DEL NORTE,PALO VERDE,4\n")
+    assert pipeline.run(verbose=False) == {"clima": "omitida", "rio": "ok", "gold": "ok", "estaciones": "ok"}
+
+
+# 4. Test: anexar los últimos 12 meses equivale a haberlos construido con la historia completa
+def test_actualizacion_incremental(tmp_path):
+    referencia = read_gold_store(os.path.join(BASE_DIR, "data", "gold", "app_data_70years"), mmap=False)
+    gold_dir = tmp_path / "gold"
+    historia, delta = referencia.iloc[:-12], referencia.iloc[-12:]
+    write_gold_store(historia, gold_dir / "app_data_70years")
+    salida = historia.copy()
+    salida['Fecha'] = salida['Fecha'].dt.strftime('%Y-%m-%d')
+    salida.to_csv(gold_dir / "app_data_70years.csv", index=False)
+    pipeline = GoldPipeline(gold_dir=str(gold_dir), manifest_path=str(tmp_path / "manifest.json"))
+    version = dataset_version(gold_dir / "app_data_70years")
+
+    # Desordenado y con meses ya presentes: se ignoran los repetidos
+    nuevos = pd.concat([historia.iloc[-3:], delta.iloc[::-1]])[['Fecha', 'Precipitacion', 'Temperatura', 'Caudal_Real']]
+    resultado = pipeline.actualizar(nuevos, verbose=False)
+    assert resultado["filas"] == 12 and resultado["version"] != version
+
+    df = read_gold_store(gold_dir / "app_data_70years", mmap=False)
+    pd.testing.assert_frame_equal(df[['Fecha', 'Mes']], referencia[['Fecha', 'Mes']])
+    np.testing.assert_allclose(df['Inercia_3meses'], referencia['Inercia_3meses'])
+    # La historia no se toca; solo las filas nuevas pasan por el modelo
+    np.testing.assert_array_equal(df['Caudal_IA'].iloc[:-12], historia['Caudal_IA'])
+    np.testing.assert_allclose(df['Caudal_IA'].iloc[-12:], cargar_modelo(MODELO_PATH).predict(delta[COLUMNAS_MODELO]))
+    assert len(pd.read_csv(gold_dir / "app_data_70years.csv")) == len(referencia)
+    assert pipeline.actualizar(nuevos, verbose=False)["filas"] == 0
+
+    # Un hueco en el calendario se rechaza
+    siguiente = pd.DataFrame({'Fecha': [referencia['Fecha'].iloc[-1] + pd.DateOffset(months=2)],
+                              'Precipitacion': [10.0], 'Temperatura': [25.0]})
+    with pytest.raises(ValueError):
+        pipeline.actualizar(siguiente, verbose=False)
+
+
+# 5. Test: 'update' desde SILVER deja la etapa gold al día (el siguiente 'build' no reentrena)
+def test_update_y_build(tmp_path):
+    raw = tmp_path / "raw"
+    shutil.copytree(os.path.join(BASE_DIR, "data", "raw"), raw)
+    completos = {}
+    for nombre in ("precipitation.csv", "temperatura.csv"):
+        completos[nombre] = (raw / nombre).read_text()
+        ancho = pd.read_csv(raw / nombre)
+        ancho.loc[:, [c for c in ancho.columns if "/2023-" not in c]].to_csv(raw / nombre, index=False)
+    pipeline = GoldPipeline(raw_dir=str(raw), silver_dir=str(tmp_path / "silver"),
+                            gold_dir=str(tmp_path / "gold"), manifest_path=str(tmp_path / "manifest.json"),
+                            models_dir=str(tmp_path / "models"))
+    pipeline.run(verbose=False, solo=["clima", "rio", "gold"])
+
+    for nombre, texto in completos.items():
+        (raw / nombre).write_text(texto)
+    assert pipeline.actualizar(verbose=False)["filas"] == 12
+    assert pipeline.run(verbose=False, solo=["clima", "rio", "gold"]) == {"clima": "omitida", "rio": "omitida", "gold": "omitida"}
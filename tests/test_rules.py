@@ -0,0 +1,64 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from modules.rules import MOPE, MOPERules, UMBRAL_CRISIS, UMBRAL_ALERTA
+from modules.engine import HydrologyEngine
+
+
+# 1. Test: el clasificador vectorizado respeta los límites de la tabla (< 25 crisis, < 40 alerta)
+def test_clasificar_limites():
+    caudales = np.array([0.0, 24.9, 25.0, 39.9, 40.0, 500.0])
+    assert MOPE.clasificar(caudales).tolist() == [2, 2, 1, 1, 0, 0]
+    assert (UMBRAL_CRISIS, UMBRAL_ALERTA) == (25.0, 40.0)
+    assert MOPE.evaluar(10.0)['nivel'] == "EMERGENCIA ROJA"
+    assert MOPE.evaluar(55.0)['accion'] == "OPERACIÓN ESTÁNDAR"
+
+
+# 2. Test: conteos y transiciones coinciden con un recorrido mes a mes
+def test_conteos_y_transiciones():
+    rng = np.random.default_rng(1)
+    caudales = rng.gamma(4, 10, size=(7, 120))
+    lote = MOPE.evaluar_lote(caudales)
+    assert lote['impactos'].shape == (7, 120, 3)
+
+    for e in range(len(caudales)):
+        codigos = [int(MOPE.evaluar(c)['codigo']) for c in caudales[e]]
+        assert lote['conteos'][e].tolist() == np.bincount(codigos, minlength=3).tolist()
+        esperado = np.zeros((3, 3), dtype=int)
+        for a, b in zip(codigos[:-1], codigos[1:]):
+            esperado[a, b] += 1
+        assert (lote['transiciones'][e] == esperado).all()
+
+
+# 3. Test: una sola tabla para el motor, la línea de tiempo y la regla escalar
+def test_motor_usa_la_tabla():
+    df = pd.DataFrame({
+        'Fecha': pd.date_range('2020-01-01', periods=3, freq='MS'),
+        'Caudal_IA': [22.0, 22.0, 22.0],
+        'Inercia_3meses': [50.0, 60.0, 55.0],
+        'Mes': [1, 2, 3],
+    })
+    engine = HydrologyEngine(df)
+    config = {"rango": (2020, 2020), "delta_lluvia": 0, "delta_temp": 0}
+    kpis = engine.kpis_for_range(config)
+    assert kpis['codigo_estado'] == 2 and "CRISIS" in kpis['estado_texto']
+    assert kpis['meses_criticos'] == 3
+
+    timeline = MOPE.timeline(df['Fecha'], engine.run_simulation(config)['Caudal_Simulado'])
+    assert (timeline['Nivel'] == MOPE.evaluar(kpis['caudal_promedio'])['nivel']).all()
+
+
+# 4. Test: 70 años × 2000 escenarios en una pasada
+def test_rendimiento_lote():
+    caudales = np.random.default_rng(0).gamma(4, 10, size=(2000, 840))
+    t0 = time.perf_counter()
+    lote = MOPE.evaluar_lote(caudales)
+    assert time.perf_counter() - t0 < 1.0
+    assert lote['conteos'].sum() == caudales.size
+
+
+# 5. Test: una tabla sin regla abierta se rechaza
+def test_tabla_invalida():
+    with pytest.raises(ValueError):
+        MOPERules([{"hasta": 10.0, "codigo": 0}])
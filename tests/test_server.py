@@ -0,0 +1,85 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmarks.loadtest import ejecutar
+from core.data import cargar_gold
+from core.server import SimulationService, crear_servidor
+from modules.engine import HydrologyEngine
+
+
+@pytest.fixture(scope="module")
+def df():
+    return cargar_gold()
+
+
+@pytest.fixture
+def servicio(df):
+    servicio = SimulationService(df, workers=2, maxsize=8)
+    yield servicio
+    servicio.close()
+
+
+# 1. Test: peticiones idénticas en vuelo se calculan una sola vez
+def test_coalescencia(servicio):
+    llamadas = []
+    calcular = servicio.calcular
+
+    def lento(endpoint, params):
+        llamadas.append(endpoint)
+        time.sleep(0.2)
+        return calcular(endpoint, params)
+
+    servicio.calcular = lento
+    params = {"desde": ["1990"], "hasta": ["2000"], "lluvia": ["-20"]}
+    respuestas = []
+    hilos = [threading.Thread(target=lambda: respuestas.append(servicio.responder("kpis", params))) for _ in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert len(llamadas) == 1 and len(set(respuestas)) == 1
+    assert servicio.coalescidas == 7
+    kpis = json.loads(respuestas[0])
+    assert kpis["mope"] and kpis["desde"] == 1990
+
+    # Mismo escenario con otro orden de parámetros: acierto de caché
+    servicio.responder("kpis", {"lluvia": ["-20.0"], "hasta": ["2000"], "desde": ["1990"]})
+    assert len(llamadas) == 1 and servicio.cache.hits >= 1
+
+
+# 2. Test: la caché está acotada y la respuesta coincide con el motor
+def test_cache_acotada_y_resultados(servicio, df):
+    for lluvia in range(-50, 50, 10): # 10 escenarios con maxsize=8
+        servicio.responder("kpis", {"desde": ["2000"], "hasta": ["2010"], "lluvia": [str(lluvia)]})
+    stats = servicio.stats()
+    assert stats["size"] == 8 and stats["evictions"] == 2 and stats["en_vuelo"] == 0
+
+    kpis = json.loads(servicio.responder("kpis", {"desde": ["2000"], "hasta": ["2010"], "lluvia": ["40"]}))
+    esperado = HydrologyEngine(df).kpis_for_range({"rango": (2000, 2010), "delta_lluvia": 40, "delta_temp": 0})
+    assert kpis["caudal_promedio"] == pytest.approx(esperado["caudal_promedio"])
+
+
+# 3. Test: HTTP de punta a punta (200, 400, 404) y prueba de carga corta sin errores
+def test_http_y_carga(servicio):
+    servidor = crear_servidor(servicio, port=0)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{url}/classify?caudal=18&caudal=55") as r:
+            assert [f["codigo"] for f in json.loads(r.read())] == [2, 0]
+        for ruta, estado in (("/kpis?desde=abc", 400), ("/kpis?desde=2010&hasta=2000", 400), ("/otra", 404)):
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(url + ruta)
+            assert error.value.code == estado
+
+        resultado = ejecutar(url, n=200, concurrencia=4, escenarios=10)
+        assert resultado["errores"] == 0 and resultado["p50_ms"] <= resultado["p99_ms"]
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
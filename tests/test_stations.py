@@ -0,0 +1,55 @@
+import os
+import pandas as pd
+import pytest
+from modules.gold_store import read_gold_store
+from modules.pipeline import BASE_DIR
+from modules.stations import MultiStationEngine, leer_metadatos
+
+GOLD = os.path.join(BASE_DIR, "data", "gold")
+
+
+@pytest.fixture
+def estaciones():
+    df = read_gold_store(os.path.join(GOLD, "estaciones"))
+    meta = leer_metadatos(os.path.join(BASE_DIR, "data", "raw", "stationbasins.csv"))
+    return MultiStationEngine(df, metadatos=meta)
+
+
+# 1. Test: una fila de KPIs por estación, con sus coordenadas
+def test_kpis_por_estacion(estaciones):
+    config = {"rango": (1976, 1984), "delta_lluvia": 0, "delta_temp": 0.0}
+    tabla = estaciones.calculate_kpis(config)
+    assert list(tabla['grdc_no']) == [4382100, 4382200, 4382300, 4382700]
+    assert tabla[['lat', 'lon', 'Estacion']].notna().all().all()
+    # Cada estación tiene su propio caudal (no un múltiplo fijo de la serie principal)
+    assert tabla['promedio'].nunique() == 4
+
+
+# 2. Test: los KPIs por estación usan los motores cacheados (sin pool de procesos) y no son más lentos
+def test_kpis_sin_pool(monkeypatch):
+    import time
+    import modules.stations as stations
+    from benchmarks.datasets import estaciones_sintetico, metadatos_sinteticos
+
+    df = estaciones_sintetico(20 * 888)
+    multi = MultiStationEngine(df, metadatos_sinteticos(df))
+    config = {"rango": (1990, 2000), "delta_lluvia": -20, "delta_temp": 1.0}
+    multi.calculate_kpis(config) # construye los motores (índice por año) una sola vez
+
+    def sin_pool(*args, **kwargs):
+        raise AssertionError("calculate_kpis no debe abrir un pool de procesos")
+    monkeypatch.setattr(stations, "ProcessPoolExecutor", sin_pool)
+
+    def mejor(funcion):
+        tiempos = []
+        for _ in range(5):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append(time.perf_counter() - inicio)
+        return min(tiempos)
+
+    serial = lambda: pd.DataFrame([{"grdc_no": int(g), **multi.engine(int(g)).kpis_for_range(config)} for g in multi.estaciones])
+    tabla = multi.calculate_kpis(config)
+    assert len(tabla) == 20
+    pd.testing.assert_frame_equal(tabla[serial().columns], serial())
+    assert mejor(lambda: multi.calculate_kpis(config)) <= 2 * mejor(serial) + 0.005
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.thresholds import OrderStatistics, ThresholdEngine
+
+
+# 1. Test: cuantiles exactos (incluye empates y valores fuera de la rejilla)
+def test_cuantiles_exactos():
+    rng = np.random.default_rng(0)
+    valores = np.concatenate([np.round(rng.normal(30, 15, 500), 1), [-900.0, 1200.0]])
+    estructura = OrderStatistics(vmin=-100, vmax=200, bins=512)
+    for x in valores[:100]:
+        estructura.add(x)
+    estructura.extend(valores[100:])
+    for q in (0.0, 0.1, 0.5, 0.9, 1.0):
+        assert estructura.quantile(q) == pytest.approx(np.quantile(valores, q))
+
+
+# 2. Test: ventana móvil = pandas rolling quantile
+def test_ventana_movil():
+    rng = np.random.default_rng(1)
+    valores = rng.gamma(2, 20, size=300)
+    motor = ThresholdEngine(ventana=36)
+    esperado = pd.Series(valores).rolling(36).quantile(0.10, interpolation='linear')
+    for i, x in enumerate(valores):
+        motor.update([x])
+        if i >= 35:
+            assert motor.umbrales(movil=True)[0] == pytest.approx(esperado.iloc[i])
+
+
+# 3. Test: umbrales por mes calendario y fusión de estructuras
+def test_mensual_y_fusion():
+    rng = np.random.default_rng(2)
+    valores = rng.normal(40, 10, size=240)
+    meses = np.tile(np.arange(1, 13), 20)
+    motor = ThresholdEngine().update(valores[:120], meses[:120]).update(valores[120:], meses[120:])
+
+    tabla = motor.umbrales_mensuales()
+    assert tabla[3, 1] == pytest.approx(np.quantile(valores[meses == 3], 0.90))
+    assert motor.umbrales()[0] == pytest.approx(np.quantile(valores, 0.10))
+
+    a, b = OrderStatistics(), OrderStatistics()
+    a.extend(valores[:100])
+    b.extend(valores[100:])
+    assert a.merge(b).quantile(0.9) == pytest.approx(np.quantile(valores, 0.9))
+
+
+# 4. Test: evaluación de muchos escenarios a la vez
+def test_batch():
+    rng = np.random.default_rng(3)
+    base = rng.gamma(3, 10, size=200)
+    factores = np.array([0.5, 1.0, 1.2])
+    caudales = factores[:, None] * base[None, :]
+    umbrales = ThresholdEngine.batch(caudales)
+    np.testing.assert_allclose(umbrales, ThresholdEngine.escalar(np.quantile(base, [0.1, 0.9]), factores))
+
+
+# 5. Test: la rejilla sale de los datos y se amplía; caudales > 500 no se apilan en la celda de borde
+def test_rejilla_adaptativa():
+    rng = np.random.default_rng(4)
+    valores = rng.gamma(2, 400, size=2000) # caudales de crecida muy por encima de 500 m³/s
+    estructura = OrderStatistics()
+    estructura.extend(valores[:500])
+    for x in valores[500:600]:
+        estructura.add(x)
+    estructura.extend(valores[600:] * 3) # lote fuera de la rejilla inicial
+    todos = np.concatenate([valores[:600], valores[600:] * 3])
+
+    assert estructura.vmin <= todos.min() and todos.max() < estructura.vmax
+    assert max(len(lista) for lista in estructura.celdas.values()) < 20
+    for q in (0.0, 0.1, 0.5, 0.9, 1.0):
+        assert estructura.quantile(q) == pytest.approx(np.quantile(todos, q))
+
+    motor = ThresholdEngine(ventana=12).update(valores[:100])
+    motor.update([1e5])
+    assert motor.umbrales(movil=True)[1] == pytest.approx(np.quantile(np.append(valores[89:100], 1e5), 0.9))
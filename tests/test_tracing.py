@@ -0,0 +1,83 @@
+import json
+import time
+
+from modules.tracing import Tracer, Histograma, BUCKETS_MS
+
+
+# 1. Test: Apagado, el span es un objeto nulo y no se registra nada
+def test_tracer_apagado_sin_registro():
+    tracer = Tracer(activo=False, archivo=None)
+
+    @tracer.traced()
+    def sumar(a, b):
+        return a + b
+
+    with tracer.span("etapa") as s:
+        assert s is None
+    assert sumar(2, 3) == 5
+    assert tracer.histogramas == {}
+    assert tracer.ultimo_rerun() == []
+
+    # Sobrecoste del decorador apagado: del orden de una llamada extra
+    inicio = time.perf_counter()
+    for _ in range(100_000):
+        sumar(1, 2)
+    assert (time.perf_counter() - inicio) / 100_000 < 5e-6
+
+
+# 2. Test: Spans anidados con nivel, histograma acumulado y rerun reiniciado
+def test_spans_anidados_y_histogramas():
+    tracer = Tracer(activo=True, archivo=None)
+
+    @tracer.traced("modulo.render")
+    def render():
+        return "ok"
+
+    tracer.iniciar_rerun()
+    with tracer.span("app.tab"):
+        assert render() == "ok"
+        render()
+
+    spans = tracer.ultimo_rerun()
+    assert [s["span"] for s in spans] == ["modulo.render", "modulo.render", "app.tab"]
+    assert [s["nivel"] for s in spans] == [1, 1, 0]
+    resumen = tracer.resumen()
+    assert resumen["modulo.render"]["n"] == 2 and resumen["app.tab"]["n"] == 1
+
+    tracer.iniciar_rerun()
+    assert tracer.ultimo_rerun() == []
+    assert tracer.resumen()["modulo.render"]["n"] == 2 # el histograma persiste entre reruns
+
+    # Los buckets acumulados terminan en el total (+Inf)
+    h = Histograma()
+    for ms in (0.5, 3, 3, 20000):
+        h.observar(ms)
+    acumulados = h.acumulados()
+    assert len(acumulados) == len(BUCKETS_MS) + 1
+    assert acumulados[0] == 1 and acumulados[-1] == 4 and acumulados[-2] == 3
+
+
+# 3. Test: Exportación a texto Prometheus y a JSONL
+def test_exportacion_prometheus_y_jsonl(tmp_path):
+    ruta_prom = tmp_path / "metricas.prom"
+    tracer = Tracer(activo=True, archivo=str(ruta_prom))
+    tracer.iniciar_rerun()
+    with tracer.span("app.carga_datos"):
+        pass
+    tracer.finalizar_rerun()
+
+    texto = ruta_prom.read_text()
+    assert "# TYPE pargirh_span_duration_ms histogram" in texto
+    assert 'pargirh_span_duration_ms_bucket{span="app.carga_datos",le="+Inf"} 1' in texto
+    assert 'pargirh_span_duration_ms_count{span="app.carga_datos"} 1' in texto
+
+    ruta_jsonl = tmp_path / "trazas.jsonl"
+    tracer.archivo = str(ruta_jsonl)
+    for _ in range(2):
+        tracer.iniciar_rerun()
+        with tracer.span("app.escenario"):
+            pass
+        tracer.finalizar_rerun()
+    lineas = [json.loads(l) for l in ruta_jsonl.read_text().splitlines()]
+    assert len(lineas) == 2
+    assert lineas[-1]["spans"][0]["span"] == "app.escenario"
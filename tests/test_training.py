@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.model import ModelRegistry, ruta_modelo_activo, MODELO_PATH
+from modules.training import entrenar, datos_entrenamiento, clave_entrenamiento
+
+ESPACIO = {"n_estimators": [10], "max_depth": [None, 3]}
+
+
+@pytest.fixture
+def df():
+    fechas = pd.date_range('1976-01-01', periods=96, freq='MS')
+    rng = np.random.default_rng(0)
+    pr = rng.gamma(2, 30, size=96)
+    df = pd.DataFrame({
+        'Fecha': fechas,
+        'Precipitacion': pr,
+        'Temperatura': rng.normal(25, 1, size=96),
+        'Inercia_3meses': pd.Series(pr).rolling(3, min_periods=1).mean(),
+        'Mes': fechas.month,
+    })
+    df['Caudal_Real'] = df['Inercia_3meses'] * 0.4 + rng.normal(0, 2, size=96)
+    df.loc[:11, 'Caudal_Real'] = np.nan # meses sin observación: fuera del entrenamiento
+    return df
+
+
+# 1. Test: validación cruzada temporal, registro y activación del mejor modelo
+def test_entrenar_y_registrar(df, tmp_path):
+    registro = ModelRegistry(tmp_path / "registry")
+    modelo, metricas = entrenar(df, espacio=ESPACIO, pliegues=3, n_jobs=2, registro=registro)
+    assert metricas["reentrenado"] and metricas["filas"] == 84 and metricas["candidatos"] == 2
+    assert len(metricas["cv"]["r2_pliegues"]) == 3 and metricas["cv"]["r2"] < metricas["r2_entrenamiento"]
+    assert metricas["params"]["n_estimators"] == 10 and metricas["periodo"][0] == "1977-01-01"
+    assert registro.clave_activa() == metricas["clave"]
+    assert ruta_modelo_activo(registro) == registro.ruta_modelo(metricas["clave"])
+    assert modelo.predict(df[['Precipitacion', 'Temperatura', 'Inercia_3meses', 'Mes']]).shape == (96,)
+
+
+# 2. Test: mismas entradas -> sin reentrenar; datos o parámetros nuevos -> otra clave
+def test_registro_evita_reentrenar(df, tmp_path):
+    registro = ModelRegistry(tmp_path / "registry")
+    _, primera = entrenar(df, espacio=ESPACIO, pliegues=3, registro=registro)
+    _, segunda = entrenar(df.sample(frac=1, random_state=1), espacio=ESPACIO, pliegues=3, registro=registro)
+    assert not segunda["reentrenado"] and segunda["clave"] == primera["clave"] # el orden de filas no cuenta
+    assert segunda["cv"] == primera["cv"]
+
+    X, y, _ = datos_entrenamiento(df)
+    assert clave_entrenamiento(X, y * 1.01, ESPACIO, 3, 42) != primera["clave"]
+    assert clave_entrenamiento(X, y, {**ESPACIO, "max_depth": [3]}, 3, 42) != primera["clave"]
+    assert len(registro.listar()) == 1
+
+    # Sin modelo activo se usa el artefacto del pipeline
+    assert ruta_modelo_activo(ModelRegistry(tmp_path / "vacio")) == MODELO_PATH
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.engine import HydrologyEngine
+from modules.year_index import YearIndex
+
+
+@pytest.fixture
+def serie_larga():
+    # 10 años mensuales con caudales repetidos para probar los empates
+    fechas = pd.date_range('2000-01-01', periods=120, freq='MS')
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'Fecha': fechas,
+        'Caudal_IA': np.round(rng.gamma(2, 15, size=120)),
+        'Inercia_3meses': rng.normal(50, 10, size=120),
+        'Mes': fechas.month,
+    })
+
+
+# 1. Test: medias y conteos del índice vs. filtrado directo
+def test_indice_coincide_con_filtro(serie_larga):
+    index = YearIndex(serie_larga)
+    rangos = [(2000, 2009), (2003, 2005), (2007, 2007), (1990, 1995)]
+    umbrales = [0.0, 20.0, 30.0, 1e9]
+
+    medias, inercias, n = index.medias(rangos)
+    conteos = index.meses_bajo(rangos, umbrales)
+    years = serie_larga['Fecha'].dt.year
+
+    for r, (a, b) in enumerate(rangos):
+        vista = serie_larga[(years >= a) & (years <= b)]
+        assert n[r] == len(vista)
+        if len(vista):
+            assert medias[r] == pytest.approx(vista['Caudal_IA'].mean())
+            assert inercias[r] == pytest.approx(vista['Inercia_3meses'].mean())
+        for u, umbral in enumerate(umbrales):
+            assert conteos[r, u] == (vista['Caudal_IA'] < umbral).sum()
+
+
+# 2. Test: los KPIs del índice son los mismos que los del DataFrame simulado
+def test_kpis_for_range(serie_larga):
+    engine = HydrologyEngine(serie_larga)
+    config = {"rango": (2002, 2006), "delta_lluvia": -20, "delta_temp": 1.0}
+    esperado = engine.calculate_kpis(engine.run_simulation(config))
+    obtenido = engine.kpis_for_range(config)
+    assert obtenido['promedio'] == pytest.approx(esperado['promedio'])
+    assert obtenido['inercia'] == pytest.approx(esperado['inercia'])
+    assert obtenido['meses_criticos'] == esperado['meses_criticos']
+    assert obtenido['estado_texto'] == esperado['estado_texto']
+
+
+# 3. Test: los NaN no entran en medias, conteos ni claves ordenadas
+def test_indice_con_nan(serie_larga):
+    serie_larga.loc[[5, 40, 41], 'Caudal_IA'] = np.nan
+    serie_larga.loc[[7], 'Inercia_3meses'] = np.nan
+    index = YearIndex(serie_larga)
+    rangos = [(2000, 2009), (2000, 2000), (2003, 2004)]
+    umbrales = [20.0, 1e9]
+
+    medias, inercias, _ = index.medias(rangos)
+    conteos = index.meses_bajo(rangos, umbrales)
+    years = serie_larga['Fecha'].dt.year
+    for r, (a, b) in enumerate(rangos):
+        vista = serie_larga[(years >= a) & (years <= b)]
+        assert medias[r] == pytest.approx(vista['Caudal_IA'].mean())
+        assert inercias[r] == pytest.approx(vista['Inercia_3meses'].mean())
+        for u, umbral in enumerate(umbrales):
+            assert conteos[r, u] == (vista['Caudal_IA'] < umbral).sum()
+
+    engine = HydrologyEngine(serie_larga)
+    config = {"rango": (2000, 2004), "delta_lluvia": -10, "delta_temp": 0.5}
+    esperado = engine.calculate_kpis(engine.run_simulation(config))
+    obtenido = engine.kpis_for_range(config)
+    assert obtenido['promedio'] == pytest.approx(esperado['promedio'])
+    assert obtenido['meses_criticos'] == esperado['meses_criticos']
+
+
+# 4. Test: un rango sin filas se reporta como "SIN DATOS", no como Normalidad
+def test_rango_sin_datos(serie_larga):
+    engine = HydrologyEngine(serie_larga)
+    config = {"rango": (1990, 1995), "delta_lluvia": 0, "delta_temp": 0.0}
+    for kpis in (engine.kpis_for_range(config), engine.calculate_kpis(engine.run_simulation(config))):
+        assert kpis['codigo_estado'] is None
+        assert kpis['estado_texto'] == "SIN DATOS"
+        assert np.isnan(kpis['promedio'])
+        assert kpis['meses_criticos'] == 0